@@ -5,17 +5,23 @@ Validates Kodi addons, checks dependencies, and ensures compatibility
 """
 
 import os
-import subprocess
+import sys
 import xml.etree.ElementTree as ET
 import json
-import time
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_readiness import kodi_prober, record_time_to_ready
 
 class KodiAddonValidator:
     def __init__(self):
         self.fire_tv_ip = "192.168.1.130"
         self.adb_path = r"M:\platform-tools\adb.exe"
         self.kodi_data_path = "/sdcard/Android/data/org.xbmc.kodi/files/.kodi"
+        self.adb = ADBClient(self.adb_path, serial=f"{self.fire_tv_ip}:5555", retries=1)
+        self.readiness = kodi_prober(self.fire_tv_ip, adb=self.adb, deadline=30)
         self.results = {
             "timestamp": datetime.now().isoformat(),
             "validation_results": [],
@@ -23,23 +29,17 @@ class KodiAddonValidator:
             "recommendations": []
         }
         
-    def run_adb_command(self, command, timeout=30):
-        """Execute ADB command with error handling"""
-        try:
-            full_command = f'"{self.adb_path}" {command}'
-            result = subprocess.run(full_command, shell=True, capture_output=True, 
-                                  text=True, timeout=timeout)
-            return result.stdout.strip(), result.stderr.strip(), result.returncode
-        except subprocess.TimeoutExpired:
-            return "", "Command timeout", 1
-        except Exception as e:
-            return "", str(e), 1
+    def run_adb_command(self, args, timeout=30):
+        """Execute an adb argument vector against the Fire TV"""
+        result = self.adb.run(args, timeout=timeout)
+        return result.output, result.stderr.strip(), 0 if result.ok else (result.returncode or 1)
 
     def connect_device(self):
         """Connect to Fire TV device"""
         print("Connecting to Fire TV Cube...")
-        stdout, stderr, code = self.run_adb_command(f"connect {self.fire_tv_ip}:5555")
-        if "connected" in stdout.lower() or "already connected" in stdout.lower():
+        result = self.adb.connect(f"{self.fire_tv_ip}:5555")
+        stderr = result.stderr.strip()
+        if result.ok:
             print("✓ Connected to Fire TV")
             return True
         else:
@@ -61,7 +61,7 @@ class KodiAddonValidator:
         try:
             # Pull addon.xml from device
             xml_path = f"{self.kodi_data_path}/addons/{addon_path}/addon.xml"
-            stdout, stderr, code = self.run_adb_command(f'shell "cat {xml_path}"')
+            stdout, stderr, code = self.run_adb_command(["shell", "cat", xml_path])
             
             if code != 0:
                 validation["errors"].append(f"Cannot read addon.xml: {stderr}")
@@ -82,7 +82,7 @@ class KodiAddonValidator:
                     
                     # Check if dependency exists
                     dep_stdout, _, dep_code = self.run_adb_command(
-                        f'shell "test -d {self.kodi_data_path}/addons/{dep_addon} && echo exists"'
+                        ["shell", f"test -d {self.kodi_data_path}/addons/{dep_addon} && echo exists"]
                     )
                     
                     if "exists" in dep_stdout:
@@ -108,28 +108,29 @@ class KodiAddonValidator:
         print(f"Testing addon functionality: {addon_id}")
         
         # Start Kodi
-        self.run_adb_command('shell "am start -n org.xbmc.kodi/.Splash"')
-        time.sleep(10)
+        self.run_adb_command(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
+        readiness = self.readiness.wait_ready()
         
         # Check if Kodi process is stable
-        stdout, _, code = self.run_adb_command('shell "ps | grep kodi"')
-        if code == 0 and "kodi" in stdout:
+        stdout, _, code = self.run_adb_command(["shell", "ps | grep kodi"])
+        if readiness.ready and code == 0 and "kodi" in stdout:
+            record_time_to_ready(readiness)
             return {
                 "addon_id": addon_id,
                 "kodi_stable": True,
                 "memory_usage": self.get_memory_usage(),
-                "startup_time": "< 10s"
+                "startup_time": f"{readiness.time_to_ready:.1f}s"
             }
         else:
             return {
                 "addon_id": addon_id,
                 "kodi_stable": False,
-                "error": "Kodi failed to start or crashed"
+                "error": f"Kodi failed to start or crashed ({readiness.describe()})"
             }
 
     def get_memory_usage(self):
         """Get current memory usage"""
-        stdout, _, _ = self.run_adb_command('shell "top -n 1 | grep kodi"')
+        stdout, _, _ = self.run_adb_command(["shell", "top -n 1 | grep kodi"])
         if stdout:
             parts = stdout.split()
             if len(parts) >= 6:
@@ -148,7 +149,7 @@ class KodiAddonValidator:
 
         # Get list of installed addons
         stdout, _, code = self.run_adb_command(
-            f'shell "ls {self.kodi_data_path}/addons/"'
+            ["shell", "ls", f"{self.kodi_data_path}/addons/"]
         )
         
         if code != 0:
@@ -4,13 +4,19 @@ Apply Gold Build Cache and Performance Optimizations
 Deploy advanced settings and perform system optimizations
 """
 
-import requests
 import json
-import base64
 import time
-import os
-import subprocess
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_advancedsettings import KODI_USERDATA, deploy_advancedsettings
+from pigeonhole_kodi_events import SHUTDOWN_EVENTS, KodiEventListener
+from pigeonhole_kodi_rpc import KodiAPIError, KodiHTTPError, KodiRPCClient, KodiRPCError
+from pigeonhole_readiness import kodi_prober, record_time_to_ready
+from pigeonhole_settings_profile import apply_profile, get_profile
 
 class GoldBuildOptimizer:
     def __init__(self):
@@ -20,17 +26,20 @@ class GoldBuildOptimizer:
         self.username = "kodi"
         self.password = "0000"
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
+        self.adb = ADBClient("adb", serial=f"{self.fire_tv_ip}:{self.adb_port}")
 
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.events = KodiEventListener(self.fire_tv_ip).start()
+        self.readiness = kodi_prober(self.fire_tv_ip, adb=self.adb, rpc=self.rpc,
+                                     http_port=self.http_port, deadline=75)
+        self.restarted_at = None
 
         self.optimization_log = []
 
+    def close(self):
+        """Stop the notification listener"""
+        self.events.stop()
+
     def log(self, message, level="INFO"):
         """Enhanced logging"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -40,35 +49,15 @@ class GoldBuildOptimizer:
 
     def send_rpc_request(self, method, params=None, timeout=15):
         """Send JSON-RPC request to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-
         try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=self.headers,
-                timeout=timeout
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "error" in result:
-                    self.log(f"Kodi API Error: {result['error']}", "ERROR")
-                    return None
-                return result.get("result", result)
-            else:
-                self.log(f"HTTP Error {response.status_code}", "ERROR")
-                return None
-
-        except requests.exceptions.RequestException as e:
+            return self.rpc.call(method, params, timeout=timeout)
+        except KodiAPIError as e:
+            self.log(f"Kodi API Error: {e.error}", "ERROR")
+        except KodiHTTPError as e:
+            self.log(f"HTTP Error {e.status}", "ERROR")
+        except KodiRPCError as e:
             self.log(f"Connection error: {e}", "ERROR")
-            return None
+        return None
 
     def test_connection(self):
         """Test both HTTP API and ADB connectivity"""
@@ -86,17 +75,11 @@ class GoldBuildOptimizer:
         # Test ADB if available
         adb_ok = False
         try:
-            result = subprocess.run(
-                f"adb connect {self.fire_tv_ip}:{self.adb_port}",
-                shell=True, capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
+            result = self.adb.connect(f"{self.fire_tv_ip}:{self.adb_port}", timeout=10)
+            if result.ok:
                 # Test actual ADB functionality
-                test_result = subprocess.run(
-                    f"adb -s {self.fire_tv_ip}:{self.adb_port} shell echo test",
-                    shell=True, capture_output=True, text=True, timeout=10
-                )
-                if test_result.returncode == 0:
+                test_result = self.adb.shell(["echo", "test"], timeout=10)
+                if test_result.ok:
                     self.log("[OK] ADB connection successful")
                     adb_ok = True
                 else:
@@ -113,34 +96,18 @@ class GoldBuildOptimizer:
         self.log("Deploying advanced settings via ADB...")
 
         try:
-            # Check if advanced settings file exists
-            if not os.path.exists("M:\\advanced_cache_settings.xml"):
-                self.log("[FAIL] Advanced settings file not found", "ERROR")
-                return False
+            # Create userdata directory if it doesn't exist
+            mkdir_result = self.adb.shell(["mkdir", "-p", KODI_USERDATA])
 
-            # Push advanced settings to Kodi userdata directory
-            kodi_userdata_path = "/sdcard/Android/data/org.xbmc.kodi/files/.kodi/userdata/"
+            # Render for this unit's model and memory, then push
+            push_result = deploy_advancedsettings(self.adb)
 
-            # Create userdata directory if it doesn't exist
-            mkdir_result = subprocess.run(
-                f"adb -s {self.fire_tv_ip}:{self.adb_port} shell mkdir -p {kodi_userdata_path}",
-                shell=True, capture_output=True, text=True, timeout=30
-            )
-
-            # Push the advanced settings file
-            push_result = subprocess.run(
-                f"adb -s {self.fire_tv_ip}:{self.adb_port} push \"M:\\advanced_cache_settings.xml\" {kodi_userdata_path}advancedsettings.xml",
-                shell=True, capture_output=True, text=True, timeout=30
-            )
-
-            if push_result.returncode == 0:
+            if push_result.ok:
                 self.log("[OK] Advanced settings deployed successfully")
 
                 # Set proper permissions
-                chmod_result = subprocess.run(
-                    f"adb -s {self.fire_tv_ip}:{self.adb_port} shell chmod 644 {kodi_userdata_path}advancedsettings.xml",
-                    shell=True, capture_output=True, text=True, timeout=10
-                )
+                chmod_result = self.adb.shell(["chmod", "644", f"{KODI_USERDATA}advancedsettings.xml"],
+                                              timeout=10)
 
                 self.log("[OK] File permissions set")
                 return True
@@ -156,98 +123,28 @@ class GoldBuildOptimizer:
         """Apply optimization settings via HTTP API"""
         self.log("Applying Kodi optimizations via HTTP API...")
 
-        optimization_settings = [
-            # Video player optimizations
-            {
-                "setting": "videoplayer.usemediacodec",
-                "value": True,
-                "description": "Enable MediaCodec hardware acceleration"
-            },
-            {
-                "setting": "videoplayer.useamcodec",
-                "value": True,
-                "description": "Enable AMCodec acceleration"
-            },
-            {
-                "setting": "videoplayer.adjustrefreshrate",
-                "value": 2,  # Always adjust
-                "description": "Always adjust refresh rate"
-            },
-            {
-                "setting": "videoplayer.pauseafterrefreshchange",
-                "value": 0.1,
-                "description": "Minimal pause after refresh change"
-            },
-
-            # Audio optimizations
-            {
-                "setting": "audiooutput.passthrough",
-                "value": True,
-                "description": "Enable audio passthrough"
-            },
-            {
-                "setting": "audiooutput.passthroughdevice",
-                "value": "HDMI",
-                "description": "Use HDMI for passthrough"
-            },
-
-            # Network optimizations
-            {
-                "setting": "network.usehttpproxy",
-                "value": False,
-                "description": "Disable HTTP proxy"
-            },
-
-            # Interface optimizations
-            {
-                "setting": "lookandfeel.skin",
-                "value": "skin.arctic.zephyr.pigeonhole",
-                "description": "Set Pigeonhole skin as default"
-            },
-            {
-                "setting": "filelists.showparentdiritems",
-                "value": False,
-                "description": "Hide parent directory items"
-            },
-            {
-                "setting": "filelists.showextensions",
-                "value": False,
-                "description": "Hide file extensions"
-            },
-            {
-                "setting": "debug.showloginfo",
-                "value": False,
-                "description": "Disable debug overlay"
-            },
-            {
-                "setting": "general.addonupdates",
-                "value": 0,  # Disabled
-                "description": "Disable automatic addon updates"
-            }
-        ]
-
-        applied_count = 0
-        failed_count = 0
+        profile = get_profile("gold")
+        try:
+            result = apply_profile(self.rpc, profile)
+        except KodiRPCError as e:
+            self.log(f"[FAIL] Could not read current settings: {e}", "ERROR")
+            return False
 
-        for setting in optimization_settings:
-            response = self.send_rpc_request("Settings.SetSettingValue", {
-                "setting": setting["setting"],
-                "value": setting["value"]
-            })
+        for setting in result.unchanged:
+            self.log(f"  [OK] {profile.describe(setting)} (already set)")
+        for setting in result.changed:
+            self.log(f"  [OK] {profile.describe(setting)}")
+        for setting in {**result.failed, **result.unknown}:
+            self.log(f"  [WARN] {profile.describe(setting)} - may not be available")
 
-            if response is True:
-                self.log(f"  [OK] {setting['description']}")
-                applied_count += 1
-            else:
-                self.log(f"  [WARN] {setting['description']} - may not be available")
-                failed_count += 1
+        applied_count = len(result.in_place)
+        failed_count = len(profile.settings) - applied_count
 
-            time.sleep(0.5)  # Brief pause between settings
-
-        self.log(f"Applied {applied_count}/{len(optimization_settings)} optimization settings")
+        self.log(f"Applied {applied_count}/{len(profile.settings)} optimization settings "
+                 f"({len(result.applied)} written)")
         self.log(f"Failed/Unavailable: {failed_count}")
 
-        return applied_count > len(optimization_settings) // 2
+        return applied_count > len(profile.settings) // 2
 
     def restart_kodi(self, method="http"):
         """Restart Kodi to apply advanced settings"""
@@ -256,20 +153,16 @@ class GoldBuildOptimizer:
         if method == "adb":
             try:
                 # Force stop Kodi
-                stop_result = subprocess.run(
-                    f"adb -s {self.fire_tv_ip}:{self.adb_port} shell am force-stop org.xbmc.kodi",
-                    shell=True, capture_output=True, text=True, timeout=10
-                )
+                stop_result = self.adb.shell(["am", "force-stop", "org.xbmc.kodi"], timeout=10)
 
-                time.sleep(3)
+                # Kodi is gone once its notification socket drops (at most 3s)
+                self.events.wait_disconnected(timeout=3)
 
                 # Start Kodi
-                start_result = subprocess.run(
-                    f"adb -s {self.fire_tv_ip}:{self.adb_port} shell am start -n org.xbmc.kodi/.Splash",
-                    shell=True, capture_output=True, text=True, timeout=10
-                )
+                start_result = self.adb.shell(["am", "start", "-n", "org.xbmc.kodi/.Splash"], timeout=10)
+                self.restarted_at = time.monotonic()
 
-                if start_result.returncode == 0:
+                if start_result.ok:
                     self.log("[OK] Kodi restarted successfully via ADB")
                     return True
                 else:
@@ -282,11 +175,20 @@ class GoldBuildOptimizer:
 
         elif method == "http":
             # Try to restart via HTTP API
+            shutdown = self.events.expect(SHUTDOWN_EVENTS)
             response = self.send_rpc_request("System.Reboot")
             if response:
-                self.log("[OK] Restart command sent via HTTP")
+                self.restarted_at = time.monotonic()
+                event = shutdown.wait(timeout=10) if self.events.connected.is_set() else None
+                if event:
+                    self.log(f"[OK] Restart confirmed by Kodi ({event.method})")
+                    # Don't let the readiness probe catch the old instance on its way down
+                    self.events.wait_disconnected(timeout=10)
+                else:
+                    self.log("[OK] Restart command sent via HTTP")
                 return True
             else:
+                shutdown.cancel()
                 self.log("[WARN] HTTP restart may not be supported")
                 return False
 
@@ -294,23 +196,14 @@ class GoldBuildOptimizer:
         """Verify that optimizations were applied"""
         self.log("Verifying applied optimizations...")
 
-        # Wait for Kodi to restart
+        # Wait for Kodi to come back: process, webserver port, then JSON-RPC
         self.log("Waiting for Kodi to restart...")
-        time.sleep(15)
-
-        # Test connection after restart
-        max_retries = 6
-        for attempt in range(max_retries):
-            response = self.send_rpc_request("JSONRPC.Ping", timeout=5)
-            if response and response == "pong":
-                self.log("[OK] Kodi is responding after restart")
-                break
-            else:
-                self.log(f"  Attempt {attempt + 1}/{max_retries} - waiting for Kodi...")
-                time.sleep(5)
-        else:
-            self.log("[WARN] Kodi may still be starting up", "ERROR")
+        readiness = self.readiness.wait_ready(started_at=self.restarted_at)
+        if not readiness.ready:
+            self.log(f"[WARN] Kodi may still be starting up ({readiness.describe()})", "ERROR")
             return False
+        self.log(f"[OK] Kodi is responding after restart - {readiness.describe()}")
+        record_time_to_ready(readiness)
 
         # Verify key settings
         verification_settings = [
@@ -393,7 +286,8 @@ class GoldBuildOptimizer:
                 optimization_success = False
         else:
             self.log("[WARN] ADB not available - advanced settings require manual deployment")
-            self.log("  Manual step: Copy M:\\advanced_cache_settings.xml to Kodi userdata folder")
+            self.log("  Manual step: python scripts/pigeonhole_advancedsettings.py --model <model> -o advancedsettings.xml")
+            self.log("  then copy advancedsettings.xml to Kodi userdata folder")
 
         # Final cleanup and optimization
         self.clean_cache_and_optimize()
@@ -426,7 +320,10 @@ def main():
     """Main optimization execution"""
     optimizer = GoldBuildOptimizer()
 
-    success = optimizer.run_gold_optimization()
+    try:
+        success = optimizer.run_gold_optimization()
+    finally:
+        optimizer.close()
 
     if success:
         print("\n[SUCCESS] Gold Build optimization completed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ADB Fork Cost Benchmark
+Times a full FireCube debloat run (disable, uninstall and restrict-background for every
+package in AMAZON_BLOATWARE) issued as shell=True command strings versus ADBClient argv.
+
+Without --adb a no-op stand-in executable replaces adb, so the numbers isolate the
+per-command process overhead; pass --adb/--serial to measure against a real device.
+
+Usage: python benchmarks/adb_fork_cost.py [--rounds 3] [--adb PATH --serial IP:PORT]
+"""
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from firecube_debloater import AMAZON_BLOATWARE  # noqa: E402
+from pigeonhole_adb import ADBClient  # noqa: E402
+
+def debloat_commands():
+    """The pm argument vectors a full debloat run issues"""
+    for package in AMAZON_BLOATWARE:
+        yield ["pm", "disable-user", "--user", "0", package]
+        yield ["pm", "uninstall", "--user", "0", package]
+        yield ["pm", "restrict-background", package]
+
+def run_shell_strings(adb_path: str, serial: str) -> float:
+    """The old pattern: one command string per call, run through /bin/sh"""
+    start = time.perf_counter()
+    for args in debloat_commands():
+        subprocess.run(f'"{adb_path}" -s {serial} shell {" ".join(args)}',
+                       shell=True, capture_output=True, text=True, timeout=30)
+    return time.perf_counter() - start
+
+def run_argv(adb_path: str, serial: str) -> float:
+    """ADBClient: argument vector, adb executed directly"""
+    client = ADBClient(adb_path, serial=serial)
+    start = time.perf_counter()
+    for args in debloat_commands():
+        client.shell(args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--adb", help="Real adb executable (default: no-op stand-in)")
+    parser.add_argument("--serial", default="127.0.0.1:5555")
+    args = parser.parse_args()
+
+    adb_path = args.adb or shutil.which("true")
+    if not adb_path:
+        parser.error("no stand-in executable found; pass --adb")
+
+    commands = sum(1 for _ in debloat_commands())
+    print(f"{commands} pm commands per run, {args.rounds} rounds, adb={adb_path}")
+
+    results = {"shell=True strings": [], "ADBClient argv": []}
+    for _ in range(args.rounds):
+        results["shell=True strings"].append(run_shell_strings(adb_path, args.serial))
+        results["ADBClient argv"].append(run_argv(adb_path, args.serial))
+
+    baseline = statistics.median(results["shell=True strings"])
+    for label, times in results.items():
+        median = statistics.median(times)
+        print(f"{label:<20} {median:7.3f}s  {median / commands * 1000:6.2f} ms/command"
+              f"  {baseline / median:5.2f}x")
+    saved = baseline - statistics.median(results["ADBClient argv"])
+    print(f"saved per run: {saved:.3f}s ({saved / commands * 1000:.2f} ms per command)")
+
+if __name__ == "__main__":
+    main()
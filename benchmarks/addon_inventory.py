@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Addon Inventory Benchmark
+Replays the addon lookups of one validation run (full list, skins, repositories, core addon
+status twice, per-addon details) as individual Addons.* requests and through AddonInventory.
+
+Usage: python benchmarks/addon_inventory.py [--addons 250] [--request-ms 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_addon_inventory import ADDON_PROPERTIES, AddonInventory  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+
+CORE_ADDONS = [
+    "skin.arctic.zephyr.pigeonhole",
+    "script.module.resolveurl",
+    "plugin.video.thecrew",
+    "plugin.video.fen.lite",
+    "plugin.video.madtitansports",
+    "script.pigeonhole.config",
+]
+TYPES = ["xbmc.python.pluginsource", "xbmc.python.module", "xbmc.gui.skin", "xbmc.addon.repository"]
+
+def install_addons(kodi: FakeKodi, count: int) -> None:
+    ids = CORE_ADDONS + [f"script.module.bench{i:03d}" for i in range(count - len(CORE_ADDONS))]
+    for i, addon_id in enumerate(ids):
+        kodi.addons[addon_id] = {
+            "addonid": addon_id, "name": addon_id, "version": "1.0.0", "summary": "",
+            "enabled": True, "broken": False, "type": TYPES[i % len(TYPES)], "dependencies": [],
+        }
+
+def uncached_run(rpc: KodiRPCClient) -> int:
+    rpc.call("Addons.GetAddons", {"properties": ["name", "version", "summary", "enabled", "broken"]})
+    rpc.call("Addons.GetAddons", {"type": "xbmc.gui.skin", "properties": ["name", "enabled", "broken"]})
+    rpc.call("Addons.GetAddons", {"type": "xbmc.addon.repository", "properties": ["name", "version", "enabled"]})
+    working = 0
+    for _ in range(2):
+        addons = rpc.call("Addons.GetAddons", {"properties": ["name", "version", "enabled", "broken", "type"]})
+        lookup = {addon["addonid"]: addon for addon in addons["addons"]}
+        for addon_id in CORE_ADDONS:
+            details = rpc.call("Addons.GetAddonDetails", {"addonid": addon_id, "properties": ADDON_PROPERTIES})
+            working += lookup[addon_id]["enabled"] and not details["addon"]["broken"]
+    return working
+
+def cached_run(inventory: AddonInventory) -> int:
+    inventory.addons()
+    inventory.addons("xbmc.gui.skin")
+    inventory.addons("xbmc.addon.repository")
+    working = 0
+    for _ in range(2):
+        inventory.addons()
+        for addon_id in CORE_ADDONS:
+            working += inventory.is_working(addon_id)
+    return working
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--addons", type=int, default=250)
+    parser.add_argument("--request-ms", type=float, default=20,
+                        help="Per-request round-trip cost charged by the fake Fire TV")
+    args = parser.parse_args()
+
+    kodi = FakeKodi(request_delay=args.request_ms / 1000).start()
+    try:
+        install_addons(kodi, args.addons)
+        rpc = KodiRPCClient("127.0.0.1", kodi.port)
+        rpc.ping()
+
+        before = kodi.requests
+        start = time.perf_counter()
+        uncached_run(rpc)
+        uncached = time.perf_counter() - start
+        uncached_trips = kodi.requests - before
+
+        before = kodi.requests
+        start = time.perf_counter()
+        cached_run(AddonInventory(rpc))
+        cached = time.perf_counter() - start
+        cached_trips = kodi.requests - before
+
+        print(f"{args.addons} addons, {args.request_ms:.0f} ms per round-trip")
+        print(f"per-caller requests: {uncached:6.3f}s  {uncached_trips} round-trips")
+        print(f"AddonInventory:      {cached:6.3f}s  {cached_trips} round-trip")
+        print(f"speedup {uncached / cached:.1f}x")
+    finally:
+        close_sessions()
+        kodi.stop()
+
+if __name__ == "__main__":
+    main()
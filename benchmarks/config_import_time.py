@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Config Import-Time Benchmark
+Measures, in fresh interpreters, what importing pigeonhole_config costs a CLI tool that never reads
+config versus one that does, and the per-call cost of dotted-key lookups before and after caching.
+
+Usage: python benchmarks/config_import_time.py [--runs 15] [--lookups 200000]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+CONFIG = SCRIPTS.parent / "config" / "pigeonhole_config.yaml"
+sys.path.insert(0, str(SCRIPTS))
+
+from pigeonhole_config import ConfigManager  # noqa: E402
+
+SCENARIOS = {
+    "import only": "import pigeonhole_config",
+    "import + first read": "import pigeonhole_config as c; c.get_config().get_config('deployment.adb_timeout')",
+    # What every importer paid before initialisation became lazy
+    "import + eager load": "import pigeonhole_config as c; c.ConfigManager()._config_cache",
+}
+
+TIMER = ("import time, sys; sys.path.insert(0, {scripts!r}); t = time.perf_counter(); {body}; "
+         "print(time.perf_counter() - t)")
+
+def measure(body: str, runs: int) -> float:
+    """Median seconds for ``body`` in a fresh interpreter (interpreter start-up excluded)"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", TIMER.format(scripts=str(SCRIPTS), body=body)],
+                                capture_output=True, text=True, check=True,
+                                env={**os.environ, "PIGEONHOLE_CONFIG": str(CONFIG),
+                                     # Parse every time; benchmarks/config_snapshot.py covers the snapshot
+                                     "PIGEONHOLE_CONFIG_SNAPSHOT": "0"}).stdout
+        samples.append(float(output.split()[-1]))
+    return statistics.median(samples)
+
+def split_lookup(config, key, default=None):
+    """The lookup as it was: split and walk on every call"""
+    value = config
+    try:
+        for k in key.split('.'):
+            value = value[k]
+        return value
+    except (KeyError, TypeError):
+        return default
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--lookups", type=int, default=200000)
+    args = parser.parse_args()
+
+    for name, body in SCENARIOS.items():
+        print(f"{name:22s} {measure(body, args.runs) * 1000:7.2f} ms")
+
+    manager = ConfigManager(str(CONFIG))
+    data = manager._config_cache
+    keys = ["deployment.adb_timeout", "device_profiles.home.performance.cache_size", "streaming.missing"]
+    split = timeit.timeit(lambda: [split_lookup(data, key) for key in keys], number=args.lookups)
+    cached = timeit.timeit(lambda: [manager.get_config(key) for key in keys], number=args.lookups)
+    per_call = 1e9 / (args.lookups * len(keys))
+    print(f"split-and-walk lookup  {split * per_call:7.0f} ns/call")
+    print(f"compiled + cached      {cached * per_call:7.0f} ns/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Config Snapshot Benchmark
+Times the first config read of a fresh process with no snapshot (YAML parse and merge) and with a
+warm marshal snapshot, for the Pigeonhole config and the fleet-config.yaml read by the fleet tools.
+
+Usage: python benchmarks/config_snapshot.py [--runs 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "scripts"
+
+CONFIGS = {
+    "pigeonhole_config.yaml": (ROOT / "config" / "pigeonhole_config.yaml",
+                               "m = c.ConfigManager(path); m.get_config('deployment.adb_timeout')"),
+    "fleet-config.yaml": (ROOT / "fleet-config.yaml",
+                          "m = c.ConfigManager(path, defaults={}); m.get_config('fleet.monitoring')"),
+}
+
+TIMER = ("import time, sys, logging; logging.disable(logging.INFO); sys.path.insert(0, {scripts!r}); "
+         "path = {path!r}; t = time.perf_counter(); import pigeonhole_config as c; {body}; "
+         "print(time.perf_counter() - t)")
+
+def run(path: Path, body: str, cache_dir: str) -> float:
+    env = {**os.environ, "PIGEONHOLE_CACHE_DIR": cache_dir}
+    code = TIMER.format(scripts=str(SCRIPTS), path=str(path), body=body)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            check=True, env=env).stdout
+    return float(output.split()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'config':24s} {'cold':>9s} {'warm':>9s}")
+    for name, (path, body) in CONFIGS.items():
+        cold = []
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as empty:
+                cold.append(run(path, body, empty))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            run(path, body, cache_dir)  # writes the snapshot
+            warm = [run(path, body, cache_dir) for _ in range(args.runs)]
+        cold_ms, warm_ms = statistics.median(cold) * 1000, statistics.median(warm) * 1000
+        print(f"{name:24s} {cold_ms:7.1f}ms {warm_ms:7.1f}ms  ({cold_ms / warm_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Discovery Logging Overhead Benchmark
+Runs FireTVManager.discover_devices over a simulated /24 (every host answering, adb returning at once)
+with all logging disabled, with the default DEBUG levels, and with the ADB subsystems raised to INFO.
+
+The difference from the disabled run, divided by the adb commands issued, is
+the logging cost per command; in a real discovery it is paid on top of each
+adb round trip.
+
+Usage: python benchmarks/discovery_logging.py [--hosts 254] [--repeat 5] [--structured] [--sequential]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+os.environ.setdefault("PIGEONHOLE_CONFIG", str(ROOT / "config" / "pigeonhole_config.yaml"))
+
+from pigeonhole_adb import ADBClient, ADBResult  # noqa: E402
+from pigeonhole_config import get_config  # noqa: E402
+from pigeonhole_device_manager import FireTVManager  # noqa: E402
+from pigeonhole_logger import PigeonholeLogger  # noqa: E402
+
+PROPERTIES = {
+    "ro.product.model": "AFTGAZL",
+    "ro.product.name": "Fire TV Stick 4K Max",
+    "ro.product.manufacturer": "Amazon",
+    "ro.build.version.release": "11",
+}
+
+class SimulatedADBClient(ADBClient):
+    """An adb that answers every command immediately, as a fleet of identical sticks would"""
+    commands = 0
+
+    def _run_once(self, argv, timeout):
+        SimulatedADBClient.commands += 1
+        args = argv[argv.index("-s") + 2:] if "-s" in argv else argv[1:]
+        if args[0] == "connect":
+            stdout = f"connected to {args[1]}"
+        elif args[0] == "shell" and args[1].startswith("getprop "):
+            stdout = PROPERTIES.get(args[1].split()[1], "")
+        else:
+            stdout = ""
+        return ADBResult(argv, 0, stdout + "\n", "", 0.0)
+
+def discover(hosts: int, repeat: int) -> float:
+    """Best wall time of ``repeat`` discoveries"""
+    best = float("inf")
+    for _ in range(repeat):
+        manager = FireTVManager()
+        manager.adb.client.__class__ = SimulatedADBClient
+        manager.adb._is_device_reachable = lambda ip, port: True
+        started = time.perf_counter()
+        found = manager.discover_devices(f"10.20.30.1-{hosts}")
+        best = min(best, time.perf_counter() - started)
+        assert len(found) == hosts, len(found)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, default=254)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--structured", action="store_true", help="Also write the JSON-lines event log")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Probe hosts one at a time; steadier numbers than the 50-worker pool")
+    args = parser.parse_args()
+
+    # ConfigManager gives the "pigeonhole" logger its own INFO console handler when nothing is
+    # configured yet; drop it so the runs measure the PigeonholeLogger pipeline alone
+    config = get_config()
+    config.snapshot()
+    if args.sequential:
+        config.set_config("deployment.parallel_deployments", False)
+    pigeonhole_logger = logging.getLogger("pigeonhole")
+    pigeonhole_logger.handlers.clear()
+    pigeonhole_logger.setLevel(logging.NOTSET)
+
+    logging.disable(logging.CRITICAL)
+    discover(args.hosts, 1)
+    commands = SimulatedADBClient.commands
+    baseline = discover(args.hosts, args.repeat)
+    logging.disable(logging.NOTSET)
+    print(f"{'logging off':24s} {baseline * 1000:8.1f} ms  ({commands} adb commands)")
+
+    runs = (("default (DEBUG)", {}),
+            ("adb at INFO", {"pigeonhole.adb": "INFO", "pigeonhole.device_manager": "INFO"}))
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as console:
+        for name, levels in runs:
+            stdout, sys.stdout = sys.stdout, console
+            try:
+                logs = PigeonholeLogger(log_dir, queue_size=100000, structured=args.structured,
+                                        levels=levels)
+                wall = discover(args.hosts, args.repeat)
+                logs.shutdown()
+            finally:
+                sys.stdout = stdout
+            for logger_name in levels:
+                logging.getLogger(logger_name).setLevel(logging.NOTSET)
+            overhead = max(0.0, wall - baseline)
+            print(f"{name:24s} {wall * 1000:8.1f} ms  "
+                  f"(+{overhead / commands * 1e6:6.1f} us per command)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Fake Kodi JSON-RPC Server
+Minimal in-process stand-in for Kodi's webserver used by the benchmarks, with
+configurable connection-setup and per-request latency to model the Fire TV network stack,
+and an optional raw TCP notification stream like Kodi's port 9090.
+"""
+
+import json
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+class FakeKodi:
+    """
+    Serves ``POST /jsonrpc`` on a loopback port with HTTP/1.1 keep-alive.
+
+    ``connect_delay`` is paid once per TCP connection (handshake and accept on
+    the device), ``request_delay`` once per HTTP request. With ``event_port``
+    set, ``notify`` pushes notifications to connected TCP listeners.
+    """
+
+    HOME = 10000
+    WINDOWS = {"home": 10000, "videos": 10025, "settings": 10004, "addonbrowser": 10040}
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 connect_delay: float = 0.0, request_delay: float = 0.0,
+                 event_port: Optional[int] = None):
+        self.connect_delay = connect_delay
+        self.request_delay = request_delay
+        # Player model: seconds from Player.Open to first frame (a callable is drawn per open),
+        # seconds per seek, and playback clock speed relative to wall time (<1 models stalls)
+        self.play_delay: Union[float, Callable[[], float]] = 0.0
+        self.seek_delay = 0.0
+        self.playback_rate = 1.0
+        self.video_fps = 23.976
+        self._playing: Optional[Dict[str, float]] = None
+        # GUI model: a window stack and a focused home menu item; window_delay is the time a
+        # window takes to load (a callable receives the window id)
+        self.window_delay: Union[float, Callable[[int], float]] = 0.0
+        self.focus_delay = 0.0
+        self.menu = ["Movies", "TV Shows", "Live TV", "Add-ons", "Settings"]
+        self._windows: List[int] = [self.HOME]
+        self._focus = 0
+        self.settings: Dict[str, Any] = {}
+        self.addons: Dict[str, Dict[str, Any]] = {}
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "JSONRPC.Ping": lambda params: "pong",
+            "JSONRPC.Version": lambda params: {"version": {"major": 13, "minor": 5, "patch": 0}},
+            "Settings.GetSettingValue": lambda params: {"value": self.settings.get(params["setting"])},
+            "Settings.SetSettingValue": self._set_setting,
+            "System.GetInfoLabels": lambda params: {label: "" for label in params.get("labels", [])},
+            "XBMC.GetInfoLabels": self._get_info_labels,
+            "Player.Open": self._player_open,
+            "Player.Seek": self._player_seek,
+            "Player.Stop": self._player_stop,
+            "Player.GetProperties": self._player_properties,
+            "GUI.ActivateWindow": lambda params: self._open_window(self.WINDOWS[params["window"].lower()],
+                                                                   params.get("parameters", [])),
+            "GUI.GetProperties": self._gui_properties,
+            "Input.Home": lambda params: self._open_window(self.HOME, replace=True),
+            "Input.Back": lambda params: self._back(),
+            "Input.Left": lambda params: self._move_focus(-1),
+            "Input.Right": lambda params: self._move_focus(1),
+            "Addons.GetAddons": self._get_addons,
+            "Addons.GetAddonDetails": lambda params: {"addon": self.addons[params["addonid"]]},
+            "Addons.SetAddonEnabled": self._set_addon_enabled,
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+        self._event_clients: List[socket.socket] = []
+        self._event_server = None
+        if event_port is not None:
+            self._event_server = socketserver.ThreadingTCPServer((host, event_port), self._event_handler_class())
+            self._event_server.daemon_threads = True
+
+    def _set_setting(self, params: Dict[str, Any]) -> bool:
+        self.settings[params["setting"]] = params["value"]
+        return True
+
+    def _get_addons(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        addon_type = params.get("type", "unknown")
+        addons = [addon for addon in self.addons.values()
+                  if addon_type == "unknown" or addon.get("type") == addon_type]
+        return {"addons": addons, "limits": {"start": 0, "end": len(addons), "total": len(addons)}}
+
+    def _set_addon_enabled(self, params: Dict[str, Any]) -> str:
+        self.addons[params["addonid"]]["enabled"] = bool(params["enabled"])
+        return "OK"
+
+    def _get_info_labels(self, params: Dict[str, Any]) -> Dict[str, str]:
+        labels = {label: "" for label in params.get("labels", [])}
+        if self._playing and "Player.Process(videofps)" in labels:
+            labels["Player.Process(videofps)"] = f"{self.video_fps:.3f}"
+        return labels
+
+    def _after(self, delay: float, action: Callable[[], None]) -> None:
+        timer = threading.Timer(delay, action)
+        timer.daemon = True
+        timer.start()
+
+    def _player_open(self, params: Dict[str, Any]) -> str:
+        item = params["item"]
+        delay = self.play_delay() if callable(self.play_delay) else self.play_delay
+
+        def first_frame():
+            self._playing = {"started": time.monotonic(), "position": 0.0}
+            data = {"item": {"type": "movie", "file": item.get("file")}, "player": {"playerid": 1, "speed": 1}}
+            self.notify("Player.OnPlay", data)
+            self.notify("Player.OnAVStart", data)
+
+        self._after(delay, first_frame)
+        return "OK"
+
+    def _player_position(self) -> float:
+        playing = self._playing
+        return playing["position"] + (time.monotonic() - playing["started"]) * self.playback_rate
+
+    def _player_seek(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._playing:
+            raise ValueError("no active player")
+        target = 7200 * params["value"]["percentage"] / 100
+
+        def seeked():
+            if self._playing:
+                self._playing = {"started": time.monotonic(), "position": target}
+                self.notify("Player.OnSeek", {"player": {"playerid": 1, "seekoffset": {}}})
+
+        self._after(self.seek_delay, seeked)
+        return {"percentage": params["value"]["percentage"]}
+
+    def _player_stop(self, params: Dict[str, Any]) -> str:
+        if not self._playing:
+            raise ValueError("no active player")
+        self._playing = None
+        self.notify("Player.OnStop", {"end": False, "item": {"type": "movie"}})
+        return "OK"
+
+    def _player_properties(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._playing:
+            raise ValueError("no active player")
+        position = self._player_position()
+        return {"speed": 1, "time": {"hours": int(position // 3600), "minutes": int(position % 3600 // 60),
+                                     "seconds": int(position % 60), "milliseconds": int(position * 1000 % 1000)}}
+
+    def _window_change(self, change: Callable[[], None], window: int) -> str:
+        delay = self.window_delay(window) if callable(self.window_delay) else self.window_delay
+        self._after(delay, change)
+        return "OK"
+
+    def _open_window(self, window: int, parameters: Sequence[str] = (), replace: bool = False) -> str:
+        if self._windows[-1] == window:
+            return "OK"
+        # A library node opened without "return" goes Back to its parent node, in the same window
+        opened = [window, window] if parameters and "return" not in parameters else [window]
+
+        def change():
+            self._windows = opened if replace else self._windows + opened
+        return self._window_change(change, window)
+
+    def _back(self) -> str:
+        if len(self._windows) == 1:
+            return "OK"
+        def change():
+            if len(self._windows) > 1:
+                self._windows = self._windows[:-1]
+        return self._window_change(change, self._windows[-2])
+
+    def _move_focus(self, step: int) -> str:
+        def change():
+            self._focus = (self._focus + step) % len(self.menu)
+        self._after(self.focus_delay, change)
+        return "OK"
+
+    def _gui_properties(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        window = self._windows[-1]
+        name = next((name for name, id_ in self.WINDOWS.items() if id_ == window), "")
+        label = self.menu[self._focus] if window == self.HOME else ""
+        return {"currentwindow": {"id": window, "label": name}, "currentcontrol": {"label": label}}
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one JSON-RPC request object"""
+        handler = self.methods.get(request.get("method"))
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": "Method not found."}}
+        try:
+            result = handler(request.get("params", {}))
+        except (KeyError, TypeError, ValueError):
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32602, "message": "Invalid params."}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def _handler_class(self):
+        kodi = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; without NODELAY keep-alive
+                # responses stall on the client's delayed ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with kodi._lock:
+                    kodi.connections += 1
+                if kodi.connect_delay:
+                    time.sleep(kodi.connect_delay)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with kodi._lock:
+                    kodi.requests += 1
+                if kodi.request_delay:
+                    time.sleep(kodi.request_delay)
+
+                payload = json.loads(body)
+                if isinstance(payload, list):
+                    response = [kodi.dispatch(item) for item in payload]
+                else:
+                    response = kodi.dispatch(payload)
+
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _event_handler_class(self):
+        kodi = self
+
+        class EventHandler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with kodi._lock:
+                    kodi._event_clients.append(self.request)
+                # Hold the connection open until the client or the server closes it
+                while self.request.recv(4096):
+                    pass
+
+            def finish(self):
+                with kodi._lock:
+                    if self.request in kodi._event_clients:
+                        kodi._event_clients.remove(self.request)
+
+        return EventHandler
+
+    def notify(self, method: str, data: Any = None) -> None:
+        """Push a notification to every connected TCP listener"""
+        message = json.dumps({"jsonrpc": "2.0", "method": method,
+                              "params": {"data": data, "sender": "xbmc"}}).encode()
+        with self._lock:
+            clients = list(self._event_clients)
+        for client in clients:
+            try:
+                client.sendall(message)
+            except OSError:
+                pass
+
+    def drop_listeners(self) -> None:
+        """Close every notification connection, as a Kodi restart would"""
+        with self._lock:
+            clients, self._event_clients = self._event_clients, []
+        for client in clients:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def event_port(self) -> Optional[int]:
+        return self._event_server.server_address[1] if self._event_server else None
+
+    def start(self) -> "FakeKodi":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        if self._event_server:
+            threading.Thread(target=self._event_server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._event_server:
+            self.drop_listeners()
+            self._event_server.shutdown()
+            self._event_server.server_close()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Fleet Config Resolution Benchmark
+Resolves effective settings for a simulated fleet by merging every layer per device, as each tool did
+with its own files, and through the FleetConfig table, then times repeated per-device lookups.
+
+Usage: python benchmarks/fleet_config_resolve.py [--devices 1000] [--lookups 20]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+os.environ.setdefault("PIGEONHOLE_CONFIG", str(ROOT / "config" / "pigeonhole_config.yaml"))
+
+from pigeonhole_config import ConfigManager, deep_merge  # noqa: E402
+from pigeonhole_config_schema import compile_config  # noqa: E402
+from pigeonhole_fleet_config import FleetConfig  # noqa: E402
+
+MODELS = ("AFTGAZL", "AFTBKA", "AFTSSS")
+
+def naive(sources, devices, defaults):
+    """Merge all layers again for every device, as separate per-tool lookups amounted to"""
+    table = {}
+    for device_id, model in devices:
+        config = defaults
+        for source in sources:
+            config = deep_merge(config, source.snapshot())
+        overrides = config.get("overrides", {})
+        config = deep_merge(config, overrides.get("models", {}).get(model) or {})
+        config = deep_merge(config, overrides.get("devices", {}).get(device_id) or {})
+        table[device_id] = compile_config(config)[0]
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=20, help="Lookups per device, e.g. one per monitoring cycle")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    sources = [ConfigManager(), ConfigManager(str(ROOT / "fleet-config.yaml"), defaults={})]
+    for source in sources:
+        source.snapshot()  # parse outside the timings
+    devices = [(f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", MODELS[i % len(MODELS)])
+               for i in range(args.devices)]
+    defaults = {"fleet": {"monitoring": {"poll_interval": 60}}}
+
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        naive(sources, devices, defaults)
+    naive_s = time.perf_counter() - started
+
+    fleet = FleetConfig(defaults, sources)
+    started = time.perf_counter()
+    resolved = fleet.resolve(devices)
+    resolve_s = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        for device_id, model in devices:
+            fleet.for_device(device_id, model).get("fleet.monitoring.memory_threshold")
+    lookup_s = time.perf_counter() - started
+
+    lookups = args.devices * args.lookups
+    print(f"merge per lookup      {naive_s * 1000:8.1f} ms  ({naive_s / lookups * 1e6:7.1f} us/lookup)")
+    print(f"table resolve         {resolve_s * 1000:8.1f} ms  "
+          f"({len({id(c) for c in resolved.values()})} distinct configs for {args.devices} devices)")
+    print(f"table lookups         {lookup_s * 1000:8.1f} ms  ({lookup_s / lookups * 1e6:7.2f} us/lookup)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+GUI Navigation Benchmark
+Runs the Pigeonhole home-screen navigation script against a fake Fire TV in three simulated states
+(stock skin, stock skin after debloat, slimmer skin build) and compares step latency percentiles.
+
+Usage: python benchmarks/gui_navigation.py [--repetitions 10] [--request-ms 5]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_gui_bench import NavigationBenchmark, compare  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+
+# Simulated window load times in seconds on a 1 GB stick: home, library windows, everything else
+STATES = {
+    "stock": {10000: 0.45, 10025: 0.30, "other": 0.12},
+    "stock+debloat": {10000: 0.30, 10025: 0.22, "other": 0.09},
+    "slim-skin+debloat": {10000: 0.12, 10025: 0.18, "other": 0.08},
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--request-ms", type=float, default=5,
+                        help="Per-request latency charged by the fake Fire TV")
+    args = parser.parse_args()
+
+    kodi = FakeKodi(request_delay=args.request_ms / 1000).start()
+    try:
+        rpc = KodiRPCClient("127.0.0.1", kodi.port)
+        reports = []
+        for label, loads in STATES.items():
+            kodi.window_delay = lambda window, loads=loads: (loads.get(window, loads["other"])
+                                                             * random.uniform(0.8, 1.3))
+            kodi.focus_delay = 0.03
+            reports.append(NavigationBenchmark(rpc, repetitions=args.repetitions).run(label))
+
+        for report in reports:
+            print(report.summary())
+        for candidate in reports[1:]:
+            print()
+            print("\n".join(compare(reports[0], candidate)))
+    finally:
+        close_sessions()
+        kodi.stop()
+
+if __name__ == "__main__":
+    main()
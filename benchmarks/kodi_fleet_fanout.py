@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Kodi Fleet Fan-Out Benchmark
+Collects System.GetInfoLabels and applies a settings batch across N fake Kodi boxes (one per
+127.0.1.x loopback address), sequentially with KodiRPCClient and concurrently with KodiFleet.
+
+Usage: python benchmarks/kodi_fleet_fanout.py [--devices 300] [--request-ms 30] [--concurrency 64]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+from pigeonhole_kodi_rpc_async import run_fleet  # noqa: E402
+
+FAKE_PORT = 18080
+LABELS = ["System.BuildVersion", "System.FreeMemory", "System.Uptime"]
+SETTINGS = {"network.cachemembuffersize": 209715200, "cache.readfactor": 20, "debug.showloginfo": False}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=300)
+    parser.add_argument("--request-ms", type=float, default=30,
+                        help="Per-request latency charged by each fake Fire TV")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    hosts = [f"127.0.{1 + i // 250}.{i % 250 + 1}" for i in range(args.devices)]
+    boxes = [FakeKodi(host, FAKE_PORT, request_delay=args.request_ms / 1000).start() for host in hosts]
+    try:
+        start = time.perf_counter()
+        for host in hosts:
+            client = KodiRPCClient(host, FAKE_PORT)
+            client.call("System.GetInfoLabels", {"labels": LABELS})
+            client.set_settings(SETTINGS)
+        sequential = time.perf_counter() - start
+
+        labels = run_fleet(hosts, lambda fleet: fleet.info_labels(LABELS),
+                           port=FAKE_PORT, concurrency=args.concurrency)
+        applied = run_fleet(hosts, lambda fleet: fleet.set_settings(SETTINGS),
+                            port=FAKE_PORT, concurrency=args.concurrency)
+
+        print(f"{args.devices} devices, {args.request_ms:.0f} ms per request, "
+              f"concurrency {args.concurrency}")
+        print(f"sequential KodiRPCClient:  {sequential:7.2f}s")
+        print(f"KodiFleet info labels:     {labels.summary()}")
+        print(f"KodiFleet settings batch:  {applied.summary()}")
+        print(f"speedup {sequential / (labels.elapsed + applied.elapsed):.1f}x")
+    finally:
+        close_sessions()
+        for box in boxes:
+            box.stop()
+
+if __name__ == "__main__":
+    main()
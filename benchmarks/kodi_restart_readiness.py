@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Kodi Restart Readiness Benchmark
+Measures how long ReadinessProber takes to see a fake Kodi that starts serving after a given
+delay, against the fixed schedule it replaced (sleep 15s, then JSONRPC.Ping every 5s).
+
+Usage: python benchmarks/kodi_restart_readiness.py [--startup 1 3 6]
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_rpc import close_sessions  # noqa: E402
+from pigeonhole_readiness import kodi_prober  # noqa: E402
+
+FIXED_SLEEP = 15.0
+PING_INTERVAL = 5.0
+
+def fixed_schedule(startup: float) -> float:
+    """When the old sleep-then-ping loop would have noticed Kodi (ping time ignored)"""
+    waited = FIXED_SLEEP
+    while waited < startup:
+        waited += PING_INTERVAL
+    return waited
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--startup", type=float, nargs="+", default=[1.0, 3.0, 6.0],
+                        help="Seconds until the fake Kodi starts answering")
+    args = parser.parse_args()
+
+    print(f"{'startup':>8} {'fixed sleeps':>13} {'prober':>8} {'probes':>7}")
+    try:
+        for startup in args.startup:
+            port = free_port()
+            started = []
+            timer = threading.Timer(startup, lambda: started.append(FakeKodi(port=port).start()))
+            prober = kodi_prober("127.0.0.1", http_port=port, deadline=startup + 30)
+
+            start = time.monotonic()
+            timer.start()
+            result = prober.wait_ready(started_at=start)
+            timer.join()
+            for kodi in started:
+                kodi.stop()
+
+            if not result.ready:
+                print(f"{startup:7.1f}s  prober gave up: {result.describe()}")
+                continue
+            print(f"{startup:7.1f}s {fixed_schedule(startup):12.1f}s "
+                  f"{result.time_to_ready:7.2f}s {result.attempts:7d}")
+    finally:
+        close_sessions()
+
+if __name__ == "__main__":
+    main()
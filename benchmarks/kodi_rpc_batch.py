@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Kodi RPC Batch Benchmark
+Applies a settings profile one Settings.SetSettingValue request at a time and as a single
+JSON-RPC batch, against a fake Kodi that charges a per-request round-trip cost.
+
+Usage: python benchmarks/kodi_rpc_batch.py [--settings 30] [--request-ms 20]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+
+def build_profile(count: int):
+    return {f"pigeonhole.bench.setting{i:02d}": i for i in range(count)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--settings", type=int, default=30)
+    parser.add_argument("--request-ms", type=float, default=20,
+                        help="Per-request round-trip cost charged by the fake Fire TV")
+    args = parser.parse_args()
+
+    kodi = FakeKodi(request_delay=args.request_ms / 1000).start()
+    try:
+        client = KodiRPCClient("127.0.0.1", kodi.port)
+        client.ping()
+        profile = build_profile(args.settings)
+
+        before = kodi.requests
+        start = time.perf_counter()
+        for setting, value in profile.items():
+            client.call("Settings.SetSettingValue", {"setting": setting, "value": value})
+        single = time.perf_counter() - start
+        single_trips = kodi.requests - before
+
+        before = kodi.requests
+        start = time.perf_counter()
+        results = client.set_settings(profile)
+        batched = time.perf_counter() - start
+        batch_trips = kodi.requests - before
+
+        failed = [setting for setting, result in results.items() if not result.ok]
+        print(f"{args.settings} settings, {args.request_ms:.0f} ms per round-trip")
+        print(f"one request each: {single:6.3f}s  {single_trips} round-trips")
+        print(f"JSON-RPC batch:   {batched:6.3f}s  {batch_trips} round-trip, {len(failed)} failed")
+        print(f"speedup {single / batched:.1f}x")
+    finally:
+        close_sessions()
+        kodi.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Kodi RPC Keep-Alive Benchmark
+Compares per-call latency of the old bare requests.post pattern (new TCP connection per
+call) with the pooled KodiRPCClient against a fake Kodi that charges a connection-setup cost.
+
+Usage: python benchmarks/kodi_rpc_keepalive.py [--calls 200] [--connect-ms 15] [--request-ms 2]
+"""
+
+import argparse
+import base64
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+
+def bare_post(url: str, headers: dict):
+    """The pattern every tool used: one requests.post per call"""
+    def call(method):
+        response = requests.post(url, json={"jsonrpc": "2.0", "method": method, "id": 1},
+                                 headers=headers, timeout=15)
+        return response.json().get("result")
+    return call
+
+def measure(call, calls: int):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call("JSONRPC.Ping")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(label: str, latencies, connections: int):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<22} mean {statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"p95 {p95 * 1000:7.2f} ms  connections {connections}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--connect-ms", type=float, default=15,
+                        help="Connection setup cost charged by the fake Fire TV")
+    parser.add_argument("--request-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    kodi = FakeKodi(connect_delay=args.connect_ms / 1000, request_delay=args.request_ms / 1000).start()
+    try:
+        url = f"http://127.0.0.1:{kodi.port}/jsonrpc"
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Basic {base64.b64encode(b'kodi:0000').decode()}"
+        }
+
+        before = kodi.connections
+        bare = measure(bare_post(url, headers), args.calls)
+        report("requests.post", bare, kodi.connections - before)
+
+        before = kodi.connections
+        client = KodiRPCClient("127.0.0.1", kodi.port)
+        pooled = measure(client.call, args.calls)
+        report("KodiRPCClient", pooled, kodi.connections - before)
+
+        print(f"speedup {statistics.mean(bare) / statistics.mean(pooled):.1f}x per call")
+    finally:
+        close_sessions()
+        kodi.stop()
+
+if __name__ == "__main__":
+    main()
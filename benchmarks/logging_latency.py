@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Logging Latency Benchmark
+Times individual log calls from 50 concurrent threads with the previous synchronous handler setup
+and with the queued PigeonholeLogger pipeline, optionally with a slow log drive.
+
+Usage: python benchmarks/logging_latency.py [--threads 50] [--records 400] [--slow-ms 0]
+"""
+
+import argparse
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from pigeonhole_logger import ColoredFormatter, PigeonholeLogger  # noqa: E402
+from pigeonhole_playback_bench import percentile  # noqa: E402
+
+class SlowFileHandler(logging.handlers.RotatingFileHandler):
+    """A file handler on a drive that takes ``write_delay`` seconds per write, like a busy network share"""
+    write_delay = 0.0
+
+    def emit(self, record):
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        super().emit(record)
+
+def slowed(emit):
+    """``emit`` with SlowFileHandler's delay in front, for handlers that are not RotatingFileHandlers"""
+    def slow_emit(record):
+        time.sleep(SlowFileHandler.write_delay)
+        emit(record)
+    return slow_emit
+
+def synchronous_setup(log_dir: str, console) -> None:
+    """The handler layout PigeonholeLogger used before the queue: everything on the calling thread"""
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler(console)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(ColoredFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s')
+    for name, level in (("all.log", logging.DEBUG), ("errors.log", logging.ERROR)):
+        handler = SlowFileHandler(os.path.join(log_dir, name), maxBytes=10 * 1024 * 1024, backupCount=5)
+        handler.setLevel(level)
+        handler.setFormatter(file_format)
+        root.addHandler(handler)
+    root.addHandler(console_handler)
+
+def hammer(threads: int, records: int):
+    """Per-call latencies from ``threads`` discovery-style workers"""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(index: int):
+        logger = logging.getLogger(f"pigeonhole.discovery.{index}")
+        mine = []
+        for n in range(records):
+            started = time.perf_counter()
+            logger.info("Probing 192.168.1.%d:5555 (attempt %d)", index, n)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+def report(name: str, latencies, wall: float, extra: str = "") -> None:
+    us = [value * 1e6 for value in latencies]
+    print(f"{name:12s} p50 {percentile(us, 50):8.1f}us  p99 {percentile(us, 99):9.1f}us  "
+          f"max {max(us) / 1000:7.1f}ms  wall {wall:6.2f}s{extra}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--records", type=int, default=400)
+    parser.add_argument("--slow-ms", type=float, default=0, help="Simulated latency of each log file write")
+    args = parser.parse_args()
+    SlowFileHandler.write_delay = args.slow_ms / 1000
+
+    with tempfile.TemporaryDirectory() as log_dir, open(os.devnull, "w") as console:
+        synchronous_setup(log_dir, console)
+        report("synchronous", *hammer(args.threads, args.records))
+        logging.getLogger().handlers.clear()
+
+        stdout, sys.stdout = sys.stdout, console
+        try:
+            manager = PigeonholeLogger(log_dir, queue_size=args.threads * args.records)
+        finally:
+            sys.stdout = stdout
+        if args.slow_ms:
+            for handler in manager.listener.handlers:
+                if isinstance(handler, logging.FileHandler):
+                    handler.emit = slowed(handler.emit)
+        latencies, wall = hammer(args.threads, args.records)
+        stats = manager.stats()
+        manager.shutdown()
+        report("queued", latencies, wall, f"  (dropped {sum(stats['dropped'].values())})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Peer-Assisted Distribution Simulation
+Runs each simulated Fire TV as its own process on a 127.0.1.x loopback address and
+compares aggregate rollout throughput of star (controller-only) and peer distribution.
+
+Usage: python benchmarks/peer_distribution_sim.py [--devices 16] [--size-mb 4] [--uplink-mbps 64]
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fleet_distribution import (  # noqa: E402
+    Artefact, ArtefactServer, DistributionTracker, PeerDistributor
+)
+
+CACHE_DIR = "/sdcard/pigeonhole/cache"
+PEER_PORT = 18088
+
+def _device_main(address: str, workdir: str, uplink: float, conn) -> None:
+    """Simulated device: executes the ADB shell commands PeerDistributor issues"""
+    server = ArtefactServer(host=address, port=PEER_PORT, upload_limit=uplink).start()
+
+    def local(path: str) -> str:
+        return os.path.join(workdir, os.path.basename(path))
+
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+        # Shell commands arrive as ["shell", "<quoted command line>"]
+        args = ["shell"] + shlex.split(command[1]) if command[0] == "shell" else list(command)
+        output = ""
+
+        if args[:2] == ["shell", "sha256sum"]:
+            path = local(args[2])
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    output = f"{hashlib.sha256(f.read()).hexdigest()}  {args[2]}"
+            else:
+                output = None
+        elif args[:3] == ["shell", "busybox", "wget"]:
+            try:
+                urllib.request.urlretrieve(args[-1], local(args[-2]))
+            except Exception:
+                output = None
+        elif args[:3] == ["shell", "busybox", "httpd"]:
+            for name in os.listdir(workdir):
+                server.publish(name, os.path.join(workdir, name))
+        elif args[0] == "push":
+            shutil.copy(args[1], local(args[2]))
+
+        conn.send(output)
+
+    server.stop()
+
+class _StarTracker(DistributionTracker):
+    """Tracker that never promotes devices to sources: the star topology"""
+
+    def add_holder(self, name: str, device_id: str, url: str) -> None:
+        pass
+
+def run_rollout(mode: str, devices: int, artefact: Artefact, uplink: float, workdir: str) -> float:
+    """Distribute one artefact to every simulated device, returning wall-clock seconds"""
+    addresses = [f"127.0.1.{i + 1}" for i in range(devices)]
+    pipes = {}
+    processes = []
+
+    for address in addresses:
+        device_dir = os.path.join(workdir, mode, address)
+        os.makedirs(device_dir)
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_device_main, args=(address, device_dir, uplink, child), daemon=True
+        )
+        process.start()
+        pipes[address] = (parent, threading.Lock())
+        processes.append(process)
+
+    def run_adb_command(device_ip: str, command):
+        conn, lock = pipes[device_ip]
+        with lock:
+            conn.send(command)
+            return conn.recv()
+
+    controller = ArtefactServer(host="127.0.0.1", port=0, upload_limit=uplink).start()
+    controller.publish(artefact.name, artefact.local_path)
+
+    tracker_cls = DistributionTracker if mode == "peer" else _StarTracker
+    tracker = tracker_cls(max_uploads_per_source=2 if mode == "peer" else devices)
+    tracker.register_artefact(artefact, f"http://127.0.0.1:{controller.port}/{artefact.name}")
+    distributor = PeerDistributor(run_adb_command, tracker, cache_dir=CACHE_DIR, peer_port=PEER_PORT)
+
+    time.sleep(0.5)  # let device servers bind
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=devices) as executor:
+        results = list(executor.map(lambda ip: distributor.distribute(ip, artefact.name), addresses))
+    elapsed = time.perf_counter() - start
+
+    controller.stop()
+    for conn, _ in pipes.values():
+        conn.send(None)
+    for process in processes:
+        process.join(timeout=5)
+
+    failed = sum(1 for r in results if r is None)
+    if failed:
+        print(f"  {mode}: {failed} devices failed")
+    if mode == "peer":
+        print(f"  uploads per source: {tracker.stats()[artefact.name]}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=16)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--uplink-mbps", type=float, default=64, help="Per-node upload limit")
+    args = parser.parse_args()
+
+    uplink = args.uplink_mbps * 1_000_000 / 8
+    workdir = tempfile.mkdtemp(prefix="pigeonhole_dist_")
+    try:
+        payload = os.path.join(workdir, "payload.apk")
+        with open(payload, 'wb') as f:
+            f.write(os.urandom(int(args.size_mb * 1024 * 1024)))
+        artefact = Artefact.from_file(payload)
+        total_mb = args.devices * artefact.size / (1024 * 1024)
+
+        print(f"Distributing {args.size_mb} MB to {args.devices} devices, "
+              f"{args.uplink_mbps} Mbit/s uplink per node")
+        for mode in ("star", "peer"):
+            elapsed = run_rollout(mode, args.devices, artefact, uplink, workdir)
+            print(f"{mode:>5}: {elapsed:6.2f}s  aggregate {total_mb / elapsed:6.2f} MB/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Pipeline Scheduler Simulation
+Compares the old whole-device ThreadPoolExecutor(max_workers=3) rollout with the
+stage-parallel PipelineScheduler, using sleeps to stand in for each stage.
+
+Usage: python benchmarks/pipeline_scheduler_sim.py [--devices 100] [--scale 0.01]
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from deployment_pipeline import (  # noqa: E402
+    CheckpointStore, DeploymentPipeline, PipelineScheduler, Stage,
+    RESOURCE_ADB, RESOURCE_BANDWIDTH, RESOURCE_WAIT
+)
+
+# Representative per-device stage durations in seconds (before scaling)
+STAGE_PROFILE = [
+    ("reconnaissance", 2.0, RESOURCE_ADB),
+    ("backup", 4.0, RESOURCE_ADB),
+    ("configure_kodi", 6.0, RESOURCE_BANDWIDTH),
+    ("validate", 15.0, RESOURCE_WAIT),
+]
+
+def build_stages(scale: float, bandwidth_slots: int):
+    # Pushes share the controller uplink: more concurrent pushes than the link
+    # can carry just makes each one slower
+    uplink = threading.BoundedSemaphore(bandwidth_slots)
+
+    def make(duration: float, resource: str):
+        def run(device):
+            if resource == RESOURCE_BANDWIDTH:
+                with uplink:
+                    time.sleep(duration * scale)
+            else:
+                time.sleep(duration * scale)
+            return True
+        return run
+
+    return [Stage(name, make(duration, resource), resource=resource)
+            for name, duration, resource in STAGE_PROFILE]
+
+def make_pipeline(stages):
+    return DeploymentPipeline(
+        stages, CheckpointStore(":memory:"), "bench",
+        load_device=lambda state: dict(state), dump_device=lambda device: device
+    )
+
+def run_whole_device(devices, stages, workers: int = 3) -> float:
+    pipeline = make_pipeline(stages)
+
+    def deploy(ip):
+        device = pipeline.device_for(ip)
+        return all(pipeline.run_stage(ip, stage, device) for stage in pipeline.pending_stages(ip))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(deploy, devices))
+    return time.perf_counter() - start
+
+def run_pipelined(devices, stages, bandwidth_slots: int) -> float:
+    scheduler = PipelineScheduler(make_pipeline(stages), {RESOURCE_BANDWIDTH: bandwidth_slots})
+    start = time.perf_counter()
+    scheduler.run(devices)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--scale", type=float, default=0.01, help="Seconds per simulated second")
+    parser.add_argument("--bandwidth-slots", type=int, default=2,
+                        help="Concurrent pushes the controller uplink sustains")
+    args = parser.parse_args()
+
+    devices = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(args.devices)]
+    per_device = sum(d for _, d, _ in STAGE_PROFILE) * args.scale
+    push = sum(d for _, d, r in STAGE_PROFILE if r == RESOURCE_BANDWIDTH) * args.scale
+    bandwidth_bound = args.devices * push / args.bandwidth_slots
+
+    whole = run_whole_device(devices, build_stages(args.scale, args.bandwidth_slots))
+    pipelined = run_pipelined(devices, build_stages(args.scale, args.bandwidth_slots), args.bandwidth_slots)
+
+    print(f"{args.devices} devices, {per_device:.2f}s per device, {push:.2f}s push each")
+    print(f"ceil(N/3) x per-device:  {math.ceil(args.devices / 3) * per_device:7.2f}s")
+    print(f"bandwidth bound:         {bandwidth_bound:7.2f}s")
+    print(f"whole-device pool (3):   {whole:7.2f}s")
+    print(f"pipelined scheduler:     {pipelined:7.2f}s")
+
+if __name__ == "__main__":
+    main()
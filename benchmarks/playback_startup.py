@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Playback Startup Benchmark
+Runs the playback benchmark harness against a fake Fire TV under two simulated cache configurations
+and prints the per-profile time-to-first-frame, seek latency and stalled-frame percentiles.
+
+Usage: python benchmarks/playback_startup.py [--repetitions 20] [--scale 0.1]
+"""
+
+import argparse
+import random
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_events import KodiEventListener  # noqa: E402
+from pigeonhole_kodi_rpc import KodiRPCClient, close_sessions  # noqa: E402
+from pigeonhole_playback_bench import PlaybackBenchmark  # noqa: E402
+
+# Simulated device behaviour per profile: median seconds to first frame, seek seconds,
+# playback clock rate (a cache that underruns loses ~3% of playback to stalls)
+PROFILES = {
+    "stock-200MB": {"first_frame": 2.6, "seek": 1.4, "rate": 0.97},
+    "tuned-by-memory": {"first_frame": 1.5, "seek": 0.8, "rate": 1.0},
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=0.1,
+                        help="Multiplier on simulated device times, to keep the run short")
+    args = parser.parse_args()
+
+    kodi = FakeKodi(event_port=free_port()).start()
+    try:
+        rpc = KodiRPCClient("127.0.0.1", kodi.port)
+        with KodiEventListener("127.0.0.1", kodi.event_port) as events:
+            events.wait_connected(5)
+            for name, model in PROFILES.items():
+                kodi.play_delay = lambda m=model: random.lognormvariate(0, 0.25) * m["first_frame"] * args.scale
+                kodi.seek_delay = model["seek"] * args.scale
+                kodi.playback_rate = model["rate"]
+                benchmark = PlaybackBenchmark(rpc, events, "smb://nas/test/1080p.mkv",
+                                              repetitions=args.repetitions, timeout=10, observe=10 * args.scale)
+                report = benchmark.run(name)
+                # Report device-equivalent seconds and frames rather than scaled ones
+                stats = report.percentiles()
+                ttff, seek, stalls = (stats[m] for m in ("time_to_first_frame", "seek_latency", "stall_frames"))
+                print(f"{name:16s} first frame p50 {ttff['p50'] / args.scale:5.2f}s p95 {ttff['p95'] / args.scale:5.2f}s  "
+                      f"seek p50 {seek['p50'] / args.scale:5.2f}s  "
+                      f"stalled/10s p50 {stalls['p50'] / args.scale:5.1f}  ({report.failures} failed)")
+    finally:
+        close_sessions()
+        kodi.stop()
+
+if __name__ == "__main__":
+    main()
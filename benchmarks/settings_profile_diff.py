@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Settings Profile Diff Benchmark
+Re-applies the "gold" settings profile across N fake Kodi boxes by writing every value and by
+diff-and-apply, counting round-trips and settings written per box.
+
+Usage: python benchmarks/settings_profile_diff.py [--devices 100] [--request-ms 30] [--drift 0.1]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_kodi import FakeKodi  # noqa: E402
+from pigeonhole_kodi_rpc_async import run_fleet  # noqa: E402
+from pigeonhole_settings_profile import apply_profile_async, get_profile  # noqa: E402
+
+FAKE_PORT = 18090
+
+class CountingKodi(FakeKodi):
+    """FakeKodi that counts individual Settings.SetSettingValue writes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    def _set_setting(self, params):
+        self.writes += 1
+        return super()._set_setting(params)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--request-ms", type=float, default=30,
+                        help="Per-request latency charged by each fake Fire TV")
+    parser.add_argument("--drift", type=float, default=0.1,
+                        help="Fraction of boxes with one setting changed by hand before the re-apply")
+    args = parser.parse_args()
+
+    profile = get_profile("gold")
+    hosts = [f"127.0.{1 + i // 250}.{i % 250 + 1}" for i in range(args.devices)]
+    boxes = [CountingKodi(host, FAKE_PORT, request_delay=args.request_ms / 1000).start() for host in hosts]
+    try:
+        for box in boxes:
+            box.settings.update(profile.settings)
+            if random.random() < args.drift:
+                box.settings["lookandfeel.skin"] = "skin.estuary"
+
+        def measure(operation):
+            requests = sum(box.requests for box in boxes)
+            writes = sum(box.writes for box in boxes)
+            fleet = run_fleet(hosts, operation, port=FAKE_PORT)
+            return (fleet, (sum(box.requests for box in boxes) - requests) / len(boxes),
+                    (sum(box.writes for box in boxes) - writes) / len(boxes))
+
+        # Diff first so the drifted boxes are still drifted
+        diffed, diff_trips, diff_writes = measure(
+            lambda fleet: fleet.run(lambda client: apply_profile_async(client, profile)))
+        blind, blind_trips, blind_writes = measure(lambda fleet: fleet.set_settings(profile.settings))
+
+        drifted = sum(1 for host in diffed.succeeded if diffed.results[host].applied)
+        print(f"{args.devices} devices, {len(profile.settings)} settings, {drifted} drifted boxes")
+        print(f"write every value: {blind_trips:4.2f} round-trips/box  {blind_writes:5.2f} writes/box  "
+              f"{blind.elapsed:5.2f}s")
+        print(f"diff-and-apply:    {diff_trips:4.2f} round-trips/box  {diff_writes:5.2f} writes/box  "
+              f"{diffed.elapsed:5.2f}s")
+    finally:
+        for box in boxes:
+            box.stop()
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,19 @@ Integrated with kodi.wiki knowledge and Fire TV Cube specialization
 """
 import requests
 import json
-import base64
 import subprocess
 import time
 import os
 import re
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from pigeonhole_kodi_rpc import (
+    KodiAPIError, KodiConnectionError, KodiHTTPError, KodiRPCClient, KodiRPCError
+)
 
 class KodiExpertAgent:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -22,13 +28,7 @@ class KodiExpertAgent:
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
         self.adb_path = "M:\\adb\\adb.exe"
 
-        # Auth header for Kodi API
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Kodi.wiki knowledge base
         self.wiki_base = "https://kodi.wiki"
@@ -99,28 +99,16 @@ class KodiExpertAgent:
     def kodi_api(self, method, params=None, timeout=15):
         """Execute Kodi JSON-RPC API call with expert error handling"""
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=timeout)
-
-            if response.status_code == 200:
-                result = response.json()
-                if "error" in result:
-                    self.log(f"Kodi API Error: {result['error']}", "ERROR")
-                    return None
-                return result.get("result", result)
-            else:
-                self.log(f"HTTP Error {response.status_code}: {response.text}", "ERROR")
-                return None
-
-        except requests.exceptions.ConnectionError:
+            return self.rpc.call(method, params, timeout=timeout)
+        except KodiAPIError as e:
+            self.log(f"Kodi API Error: {e.error}", "ERROR")
+        except KodiHTTPError as e:
+            self.log(f"HTTP Error {e.status}: {e.body}", "ERROR")
+        except KodiConnectionError:
             self.log("Kodi not responding - checking connection...", "ERROR")
-            return None
-        except Exception as e:
+        except KodiRPCError as e:
             self.log(f"API call failed: {e}", "ERROR")
-            return None
+        return None
 
     def adb_cmd(self, command, timeout=30):
         """Execute ADB command with expert error handling"""
@@ -4,16 +4,19 @@ Complete Fire TV Cube Gold Setup - All-in-One Installer
 Includes ADB installation, optimization, and validation
 """
 
-import subprocess
 import requests
 import json
-import base64
 import time
 import sys
 import os
 import zipfile
 from datetime import datetime
 import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
 
 class CompleteGoldSetup:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -23,14 +26,8 @@ class CompleteGoldSetup:
         self.password = "0000"
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
         self.adb_path = None
-
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.adb = ADBClient(serial=f"{fire_tv_ip}:5555")
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Amazon bloatware (safe removal list)
         self.amazon_bloatware = [
@@ -75,7 +72,7 @@ class CompleteGoldSetup:
 
         if os.path.exists(adb_exe):
             self.log("[OK] ADB already installed")
-            self.adb_path = adb_exe
+            self.adb_path = self.adb.adb_path = adb_exe
             return True
 
         try:
@@ -113,7 +110,7 @@ class CompleteGoldSetup:
                     shutil.rmtree(platform_tools_dir)
 
                 if os.path.exists(adb_exe):
-                    self.adb_path = adb_exe
+                    self.adb_path = self.adb.adb_path = adb_exe
                     self.log("[OK] ADB installation completed")
                     return True
                 else:
@@ -127,32 +124,20 @@ class CompleteGoldSetup:
             self.log(f"[ERROR] ADB installation error: {e}", "ERROR")
             return False
 
-    def adb_command(self, command):
-        """Execute ADB command using installed ADB"""
+    def adb_command(self, args):
+        """Execute an adb argument vector using installed ADB"""
         if not self.adb_path:
             return False, "ADB not installed"
 
-        try:
-            full_command = f'"{self.adb_path}" -s {self.fire_tv_ip}:5555 {command}'
-            result = subprocess.run(full_command, shell=True, capture_output=True, text=True, timeout=30)
-            return result.returncode == 0, result.stdout.strip() if result.stdout else result.stderr.strip()
-        except Exception as e:
-            return False, str(e)
+        result = self.adb.run(args, timeout=30)
+        return result.ok, result.output if result.stdout else result.stderr.strip()
 
     def kodi_jsonrpc(self, method, params=None):
         """Execute Kodi JSON-RPC call"""
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            else:
-                return None
-        except Exception as e:
+            envelope = self.rpc.request(method, params, timeout=15)
+            return envelope.get("result", envelope)
+        except KodiRPCError as e:
             self.log(f"Kodi API error: {e}", "ERROR")
             return None
 
@@ -161,16 +146,16 @@ class CompleteGoldSetup:
         self.log("Connecting to Fire TV Cube...")
 
         # Disconnect first
-        self.adb_command(f"disconnect {self.fire_tv_ip}:5555")
+        self.adb_command(["disconnect", f"{self.fire_tv_ip}:5555"])
         time.sleep(2)
 
         # Connect
-        success, output = self.adb_command(f"connect {self.fire_tv_ip}:5555")
+        success, output = self.adb_command(["connect", f"{self.fire_tv_ip}:5555"])
         if success:
             time.sleep(5)
 
             # Test connection
-            success, output = self.adb_command("shell echo 'Connected'")
+            success, output = self.adb_command(["shell", "echo", "Connected"])
             if success and "Connected" in output:
                 self.log("[OK] Fire TV connected successfully")
                 return True
@@ -186,13 +171,14 @@ class CompleteGoldSetup:
         os.makedirs(backup_dir, exist_ok=True)
 
         # Backup packages
-        success, packages = self.adb_command("shell pm list packages")
+        success, packages = self.adb_command(["shell", "pm", "list", "packages"])
         if success:
             with open(os.path.join(backup_dir, "packages.txt"), "w") as f:
                 f.write(packages)
 
         # Backup launcher
-        success, launcher = self.adb_command("shell cmd package resolve-activity --brief -c android.intent.category.HOME")
+        success, launcher = self.adb_command(["shell", "cmd", "package", "resolve-activity", "--brief",
+                                              "-c", "android.intent.category.HOME"])
         if success:
             with open(os.path.join(backup_dir, "launcher.txt"), "w") as f:
                 f.write(launcher)
@@ -209,8 +195,8 @@ class CompleteGoldSetup:
             self.log(f"Processing {package}...")
 
             # Disable then uninstall
-            success1, _ = self.adb_command(f"shell pm disable-user --user 0 {package}")
-            success2, _ = self.adb_command(f"shell pm uninstall --user 0 {package}")
+            success1, _ = self.adb_command(["shell", "pm", "disable-user", "--user", "0", package])
+            success2, _ = self.adb_command(["shell", "pm", "uninstall", "--user", "0", package])
 
             if success1 or success2:
                 self.log(f"  [OK] Removed {package}")
@@ -226,8 +212,9 @@ class CompleteGoldSetup:
         self.log("Optimizing Kodi performance...")
 
         # Set Kodi as launcher
-        success, _ = self.adb_command("shell am force-stop com.amazon.tv.launcher")
-        success, _ = self.adb_command("shell cmd package set-home-activity org.xbmc.kodi/org.xbmc.kodi.Splash")
+        success, _ = self.adb_command(["shell", "am", "force-stop", "com.amazon.tv.launcher"])
+        success, _ = self.adb_command(["shell", "cmd", "package", "set-home-activity",
+                                         "org.xbmc.kodi/org.xbmc.kodi.Splash"])
 
         if success:
             self.log("[OK] Kodi set as default launcher")
@@ -241,9 +228,9 @@ class CompleteGoldSetup:
         })
 
         # Restart Kodi
-        self.adb_command("shell am force-stop org.xbmc.kodi")
+        self.adb_command(["shell", "am", "force-stop", "org.xbmc.kodi"])
         time.sleep(3)
-        self.adb_command("shell am start -n org.xbmc.kodi/.Splash")
+        self.adb_command(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
         time.sleep(10)
 
         self.log("[OK] Kodi optimization completed")
@@ -4,125 +4,71 @@ Pigeonhole HTTP Configuration System
 Configure Kodi for optimal streaming via HTTP API
 """
 
-import requests
-import json
+import sys
 import time
-from requests.auth import HTTPBasicAuth
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
+from pigeonhole_settings_profile import apply_profile, get_profile
 
 class PigeonholeHTTPConfig:
     def __init__(self, host="192.168.1.130", port=8080, username="kodi", password="0000"):
         self.base_url = f"http://{host}:{port}/jsonrpc"
-        self.auth = HTTPBasicAuth(username, password)
-        self.headers = {"Content-Type": "application/json"}
+        self.rpc = KodiRPCClient(host, port, username, password, timeout=10)
 
     def send_command(self, method, params=None):
         """Send JSON-RPC command to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params or {},
-            "id": 1
-        }
-
         try:
-            response = requests.post(
-                self.base_url,
-                data=json.dumps(payload),
-                headers=self.headers,
-                auth=self.auth,
-                timeout=10
-            )
-            result = response.json()
-            return result
-        except Exception as e:
+            return self.rpc.request(method, params)
+        except KodiRPCError as e:
             print(f"Error: {e}")
             return None
 
+    def apply_profile(self, name):
+        """Bring Kodi to a settings profile, writing only differing values; returns (settings in place, total)"""
+        profile = get_profile(name)
+        try:
+            result = apply_profile(self.rpc, profile)
+        except KodiRPCError as e:
+            print(f"Error: {e}")
+            return 0, len(profile.settings)
+
+        for setting in result.unchanged:
+            print(f"  {setting}: already set")
+        for setting in result.changed:
+            print(f"  Set {setting}: OK")
+        for setting, message in {**result.failed, **result.unknown}.items():
+            print(f"  Set {setting}: FAILED ({message})")
+        return len(result.in_place), len(profile.settings)
+
     def configure_cache_settings(self):
         """Configure optimal cache settings for Fire TV Cube"""
         print("Configuring cache settings...")
 
         # Network buffer settings
-        settings = [
-            ("network.buffermode", 1),
-            ("network.cachemembuffersize", 209715200),  # 200MB
-            ("network.readbufferfactor", 4.0),
-            ("network.httpproxytype", 0),
-            ("network.httpproxyserver", ""),
-            ("network.httpproxyport", 8080),
-            ("network.httpproxyusername", ""),
-            ("network.httpproxypassword", ""),
-            ("network.bandwidth", 0),
-            ("network.usehttpproxy", False)
-        ]
-
-        success_count = 0
-        for setting, value in settings:
-            result = self.send_command("Settings.SetSettingValue", {"setting": setting, "value": value})
-            if result and "result" in result:
-                print(f"  Set {setting}: OK")
-                success_count += 1
-            else:
-                print(f"  Set {setting}: FAILED")
-            time.sleep(0.5)
+        success_count, total = self.apply_profile("cache")
 
-        print(f"Cache configuration: {success_count}/{len(settings)} settings applied")
-        return success_count > len(settings) * 0.7
+        print(f"Cache configuration: {success_count}/{total} settings applied")
+        return success_count > total * 0.7
 
     def configure_video_settings(self):
         """Configure video playback settings"""
         print("Configuring video settings...")
 
-        settings = [
-            ("videoplayer.adjustrefreshrate", 2),
-            ("videoplayer.usedisplayasclock", 2),
-            ("videoplayer.errorinaspect", 0),
-            ("videoplayer.stretch43", 0),
-            ("videoplayer.rendermethod", 0),
-            ("videoplayer.usevaapi", False),
-            ("videoplayer.usevdpau", False)
-        ]
+        success_count, total = self.apply_profile("video")
 
-        success_count = 0
-        for setting, value in settings:
-            result = self.send_command("Settings.SetSettingValue", {"setting": setting, "value": value})
-            if result and "result" in result:
-                print(f"  Set {setting}: OK")
-                success_count += 1
-            else:
-                print(f"  Set {setting}: FAILED")
-            time.sleep(0.5)
-
-        print(f"Video configuration: {success_count}/{len(settings)} settings applied")
-        return success_count > len(settings) * 0.7
+        print(f"Video configuration: {success_count}/{total} settings applied")
+        return success_count > total * 0.7
 
     def configure_general_settings(self):
         """Configure general Kodi settings"""
         print("Configuring general settings...")
 
-        settings = [
-            ("locale.timezone", "Australia/Sydney"),
-            ("locale.timezonecountry", "Australia"),
-            ("locale.language", "resource.language.en_gb"),
-            ("services.webserver", True),
-            ("services.webserverport", 8080),
-            ("services.webserverusername", "kodi"),
-            ("services.webserverpassword", "0000"),
-            ("services.zeroconf", True)
-        ]
+        success_count, total = self.apply_profile("general")
 
-        success_count = 0
-        for setting, value in settings:
-            result = self.send_command("Settings.SetSettingValue", {"setting": setting, "value": value})
-            if result and "result" in result:
-                print(f"  Set {setting}: OK")
-                success_count += 1
-            else:
-                print(f"  Set {setting}: FAILED")
-            time.sleep(0.5)
-
-        print(f"General configuration: {success_count}/{len(settings)} settings applied")
-        return success_count > len(settings) * 0.7
+        print(f"General configuration: {success_count}/{total} settings applied")
+        return success_count > total * 0.7
 
     def install_addon_sources(self):
         """Add addon sources/repositories"""
@@ -8,12 +8,42 @@ import os
 import sys
 import json
 import time
+import logging
+import hashlib
+import shlex
 import subprocess
 import ipaddress
 from pathlib import Path
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Sequence, Union
+from dataclasses import dataclass, asdict, fields
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_config_schema import DeploymentConfig
+from pigeonhole_fleet_config import FleetConfig, default_sources
+from pigeonhole_logger import operation, setup_logging
+
+from deployment_pipeline import (
+    CheckpointStore, DeploymentPipeline, PipelineScheduler, Stage, format_timing_report,
+    DEFAULT_POOL_SIZES, RESOURCE_ADB, RESOURCE_BANDWIDTH, RESOURCE_WAIT
+)
+
+from deployment_rollout import HealthReport, RolloutResult, WavePolicy, WaveRollout
+from fleet_distribution import (
+    ArtefactServer, DirectDistributor, DistributionTracker, PeerDistributor,
+    build_artefacts, get_lan_address
+)
+
+logger = logging.getLogger('pigeonhole.deploy')
+
+DEFAULT_DISTRIBUTION_CONFIG = {
+    "mode": "star",  # "star" pushes from the controller, "peer" lets devices re-serve artefacts
+    "artefacts": ["kodi.apk", "surfshark.apk"],
+    "controller_port": 8089,
+    "peer_port": 8088,
+    "max_uploads_per_source": 2,
+    "device_cache_dir": "/sdcard/pigeonhole/cache"
+}
 
 @dataclass
 class FireTVDevice:
@@ -24,16 +54,33 @@ class FireTVDevice:
     firmware: str = ""
     root_status: bool = False
     deployment_stage: str = "discovered"
+    backup_dir: str = ""
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> "FireTVDevice":
+        """Restore a device from its persisted checkpoint state"""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in state.items() if k in known})
     
 class PigeonholeFleetManager:
     """
     Automated deployment manager for Pigeonhole Fire TV fleet
     """
     
-    def __init__(self, config_path: str = "fleet_config.json"):
+    def __init__(self, config_path: str = "fleet_config.json",
+                 checkpoint_db: str = "deployment_checkpoints.db", stage_log_level: int = logging.DEBUG):
         self.config_path = config_path
+        # Stage outcomes are noise on the console; raise to INFO when they feed the JSON event log
+        self.stage_log_level = stage_log_level
         self.devices: List[FireTVDevice] = []
+        self.distributor = None
+        self._artefact_server: Optional[ArtefactServer] = None
         self.load_config()
+        # fleet_config.json layered over pigeonhole_config.yaml and fleet-config.yaml, per device
+        self.fleet_config = FleetConfig(sources=default_sources(deployer_config=Path(config_path)))
+        self.adb = ADBClient(timeout=30, retries=1)
+        self.checkpoints = CheckpointStore(checkpoint_db)
+        self.pipeline = self.build_pipeline()
         
     def load_config(self):
         """Load fleet configuration"""
@@ -60,6 +107,18 @@ class PigeonholeFleetManager:
                     "provider": "surfshark",
                     "auto_connect": True,
                     "kill_switch": True
+                },
+                "distribution": dict(DEFAULT_DISTRIBUTION_CONFIG),
+                "scheduler_pools": dict(DEFAULT_POOL_SIZES),
+                "rollout": {
+                    "canary_size": 2,
+                    "growth_factor": 2.0,
+                    "max_wave_size": 50,
+                    "min_success_rate": 0.9,
+                    "min_healthy_rate": 0.9,
+                    "max_memory_usage": 90.0,
+                    "require_kodi_running": True,
+                    "soak_seconds": 30
                 }
             }
             self.save_config()
@@ -69,28 +128,81 @@ class PigeonholeFleetManager:
         with open(self.config_path, 'w') as f:
             json.dump(self.config, f, indent=2)
     
-    def run_adb_command(self, device_ip: str, command: str, timeout: int = 30) -> Optional[str]:
-        """Execute ADB command on target device"""
-        try:
-            full_command = f"adb -s {device_ip}:5555 {command}"
-            result = subprocess.run(
-                full_command, 
-                shell=True, 
-                capture_output=True, 
-                text=True, 
-                timeout=timeout
+    def run_adb_command(self, device_ip: str, args: Sequence[str], timeout: int = 30) -> Optional[str]:
+        """Execute ADB command on target device, returning stdout or None on failure
+        
+        args is the adb argument vector after ``-s ip:port``, e.g. ["shell", "pm", "list", "packages"].
+        """
+        effective = self.fleet_config.for_device(device_ip)
+        port = effective.schema.deployment.adb_port
+        if port == DeploymentConfig().adb_port:
+            # fleet_config.json predates deployment.adb_port and keeps the port at the top level
+            port = effective.get('adb_port', port)
+        result = self.adb.run(args, timeout=timeout, serial=f"{device_ip}:{port}")
+        if result.ok:
+            return result.output
+        if result.timed_out:
+            print(f"ADB Timeout on {device_ip}: {' '.join(args)}")
+        else:
+            print(f"ADB Error on {device_ip}: {result.stderr.strip()}")
+        return None
+    
+    def run_adb_shell(self, device_ip: str, command: Union[str, Sequence[str]],
+                      timeout: int = 30) -> Optional[str]:
+        """Run a device shell command; string commands are interpreted by the device shell"""
+        if not isinstance(command, str):
+            command = shlex.join(command)
+        return self.run_adb_command(device_ip, ["shell", command], timeout)
+    
+    def start_distribution(self, device_ips: List[str]) -> None:
+        """Prepare artefact distribution for a rollout"""
+        dist_config = {**DEFAULT_DISTRIBUTION_CONFIG, **self.config.get("distribution", {})}
+        artefacts = build_artefacts(dist_config["artefacts"])
+        cache_dir = dist_config["device_cache_dir"]
+        
+        if dist_config["mode"] != "peer" or not artefacts or not device_ips:
+            self.distributor = DirectDistributor(self.run_adb_command, artefacts, cache_dir)
+            return
+        
+        self._artefact_server = ArtefactServer(
+            port=dist_config["controller_port"]
+        ).start()
+        controller_ip = get_lan_address(device_ips[0])
+        tracker = DistributionTracker(dist_config["max_uploads_per_source"])
+        
+        for name, artefact in artefacts.items():
+            self._artefact_server.publish(name, artefact.local_path)
+            tracker.register_artefact(
+                artefact, f"http://{controller_ip}:{self._artefact_server.port}/{name}"
             )
-            if result.returncode == 0:
-                return result.stdout.strip()
-            else:
-                print(f"ADB Error on {device_ip}: {result.stderr}")
-                return None
-        except subprocess.TimeoutExpired:
-            print(f"ADB Timeout on {device_ip}: {command}")
-            return None
-        except Exception as e:
-            print(f"ADB Exception on {device_ip}: {e}")
-            return None
+        
+        self.distributor = PeerDistributor(
+            self.run_adb_command, tracker,
+            cache_dir=cache_dir,
+            peer_port=dist_config["peer_port"]
+        )
+        print(f"Peer distribution enabled for {len(artefacts)} artefacts")
+    
+    def stop_distribution(self) -> None:
+        """Stop controller and device artefact servers"""
+        if self.distributor:
+            self.distributor.stop_peer_servers()
+            if isinstance(self.distributor, PeerDistributor):
+                print(f"Distribution sources: {self.distributor.tracker.stats()}")
+        if self._artefact_server:
+            self._artefact_server.stop()
+            self._artefact_server = None
+        self.distributor = None
+    
+    def install_apk(self, device_ip: str, apk_name: str) -> bool:
+        """Install an APK, fetching it through the active distributor when possible"""
+        if self.distributor and self.distributor.handles(apk_name):
+            remote_path = self.distributor.distribute(device_ip, apk_name)
+            if not remote_path:
+                return False
+            return self.run_adb_shell(device_ip, ["pm", "install", "-r", remote_path]) is not None
+        
+        return self.run_adb_command(device_ip, ["install", "-r", apk_name]) is not None
     
     def discover_fire_tv_devices(self) -> List[str]:
         """Discover Fire TV devices on network"""
@@ -103,21 +215,14 @@ class PigeonholeFleetManager:
             ip_str = str(ip)
             # Quick connectivity test
             result = subprocess.run(
-                f"ping -n 1 -w 1000 {ip_str}", 
-                shell=True, 
+                ["ping", "-n", "1", "-w", "1000", ip_str],
                 capture_output=True
             )
             if result.returncode == 0:
                 # Test ADB connectivity
-                connect_result = subprocess.run(
-                    f"adb connect {ip_str}:5555", 
-                    shell=True, 
-                    capture_output=True,
-                    text=True
-                )
-                if "connected" in connect_result.stdout.lower():
+                if self.adb.connect(f"{ip_str}:5555").ok:
                     # Verify it's a Fire TV device
-                    model = self.run_adb_command(ip_str, "shell getprop ro.product.model")
+                    model = self.run_adb_shell(ip_str, ["getprop", "ro.product.model"])
                     if model and "aft" in model.lower():
                         potential_devices.append(ip_str)
                         print(f"Found Fire TV device: {ip_str} ({model})")
@@ -131,16 +236,16 @@ class PigeonholeFleetManager:
         device = FireTVDevice(ip=device_ip)
         
         # Device identification
-        device.model = self.run_adb_command(device_ip, "shell getprop ro.product.model") or "Unknown"
-        device.android_version = self.run_adb_command(device_ip, "shell getprop ro.build.version.release") or "Unknown"
-        device.firmware = self.run_adb_command(device_ip, "shell getprop ro.build.display.id") or "Unknown"
+        device.model = self.run_adb_shell(device_ip, ["getprop", "ro.product.model"]) or "Unknown"
+        device.android_version = self.run_adb_shell(device_ip, ["getprop", "ro.build.version.release"]) or "Unknown"
+        device.firmware = self.run_adb_shell(device_ip, ["getprop", "ro.build.display.id"]) or "Unknown"
         
         # Root status check
-        root_check = self.run_adb_command(device_ip, 'shell "su -c id"')
+        root_check = self.run_adb_shell(device_ip, ["su", "-c", "id"])
         device.root_status = root_check is not None and "uid=0" in root_check
         
         # Bootloader status
-        bootloader_locked = self.run_adb_command(device_ip, "shell getprop ro.boot.flash.locked")
+        bootloader_locked = self.run_adb_shell(device_ip, ["getprop", "ro.boot.flash.locked"])
         
         print(f"Device Profile: {device.model} | Android {device.android_version} | Root: {device.root_status}")
         
@@ -152,26 +257,35 @@ class PigeonholeFleetManager:
         
         backup_dir = f"backups/{device.ip}_{int(time.time())}"
         os.makedirs(backup_dir, exist_ok=True)
+        device.backup_dir = backup_dir
         
-        backup_commands = [
-            # System configuration
-            f"shell getprop > {backup_dir}/build_props.txt",
-            f"shell pm list packages -f > {backup_dir}/packages.txt",
-            
+        # System configuration, captured on the controller
+        shell_captures = {
+            "build_props.txt": ["getprop"],
+            "packages.txt": ["pm", "list", "packages", "-f"],
+        }
+        
+        pulls = [
             # Kodi configuration (critical)
-            f"pull /sdcard/Android/data/org.xbmc.kodi/files/.kodi/userdata {backup_dir}/kodi_userdata",
-            f"pull /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons {backup_dir}/kodi_addons",
+            ["pull", "/sdcard/Android/data/org.xbmc.kodi/files/.kodi/userdata", f"{backup_dir}/kodi_userdata"],
+            ["pull", "/sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons", f"{backup_dir}/kodi_addons"],
             
             # VPN configuration
-            f"pull /sdcard/Android/data/com.surfshark.vpnclient.android {backup_dir}/surfshark_config",
+            ["pull", "/sdcard/Android/data/com.surfshark.vpnclient.android", f"{backup_dir}/surfshark_config"],
         ]
         
         success_count = 0
-        for command in backup_commands:
-            if self.run_adb_command(device.ip, command):
+        for filename, command in shell_captures.items():
+            output = self.run_adb_shell(device.ip, command)
+            if output is not None:
+                Path(backup_dir, filename).write_text(output, encoding='utf-8')
                 success_count += 1
         
-        success_rate = success_count / len(backup_commands)
+        for command in pulls:
+            if self.run_adb_command(device.ip, command, timeout=120) is not None:
+                success_count += 1
+        
+        success_rate = success_count / (len(shell_captures) + len(pulls))
         print(f"Backup completion: {success_rate:.1%}")
         
         return success_rate > 0.7  # 70% minimum success rate
@@ -187,7 +301,7 @@ class PigeonholeFleetManager:
         # Download and prepare rooting tools
         rooting_steps = [
             # Bootloader unlock attempt
-            "reboot bootloader",
+            ["reboot", "bootloader"],
             # Custom recovery flash
             # Magisk installation
             # SafetyNet bypass
@@ -203,29 +317,29 @@ class PigeonholeFleetManager:
         print(f"Deploying Kodi config to {device.ip}")
         
         # Install Kodi if not present
-        kodi_installed = self.run_adb_command(device.ip, "shell pm list packages org.xbmc.kodi")
+        kodi_installed = self.run_adb_shell(device.ip, ["pm", "list", "packages", "org.xbmc.kodi"])
         if not kodi_installed:
             # Install Kodi APK
-            install_result = self.run_adb_command(device.ip, "install -r kodi.apk")
-            if not install_result:
+            if not self.install_apk(device.ip, "kodi.apk"):
                 return False
         
         # Deploy configuration files
+        kodi_home = "/sdcard/Android/data/org.xbmc.kodi/files/.kodi"
         config_commands = [
             # Push userdata configuration
-            "push kodi_config/userdata /sdcard/Android/data/org.xbmc.kodi/files/.kodi/userdata",
+            ["push", "kodi_config/userdata", f"{kodi_home}/userdata"],
             
             # Push addon configurations
-            "push kodi_config/addons /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons",
+            ["push", "kodi_config/addons", f"{kodi_home}/addons"],
             
             # Install premium addons
-            "push addons/seren /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/plugin.video.seren",
-            "push addons/fen /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/plugin.video.fen",
+            ["push", "addons/seren", f"{kodi_home}/addons/plugin.video.seren"],
+            ["push", "addons/fen", f"{kodi_home}/addons/plugin.video.fen"],
         ]
         
         success = True
         for command in config_commands:
-            if not self.run_adb_command(device.ip, command):
+            if self.run_adb_command(device.ip, command, timeout=300) is None:
                 success = False
                 
         return success
@@ -235,24 +349,23 @@ class PigeonholeFleetManager:
         print(f"Deploying VPN config to {device.ip}")
         
         # Install Surfshark if not present
-        vpn_installed = self.run_adb_command(device.ip, "shell pm list packages com.surfshark.vpnclient.android")
+        vpn_installed = self.run_adb_shell(device.ip, ["pm", "list", "packages", "com.surfshark.vpnclient.android"])
         if not vpn_installed:
-            install_result = self.run_adb_command(device.ip, "install -r surfshark.apk")
-            if not install_result:
+            if not self.install_apk(device.ip, "surfshark.apk"):
                 return False
         
         # Configure VPN settings
         vpn_commands = [
             # Push VPN configuration
-            "push vpn_config/surfshark /sdcard/Android/data/com.surfshark.vpnclient.android",
-            
-            # Set auto-connect
-            "shell am start -n com.surfshark.vpnclient.android/.MainActivity",
+            ["push", "vpn_config/surfshark", "/sdcard/Android/data/com.surfshark.vpnclient.android"],
         ]
+        if self.fleet_config.for_device(device.ip, device.model).get('vpn_config.auto_connect', True):
+            # Set auto-connect
+            vpn_commands.append(["shell", "am", "start", "-n", "com.surfshark.vpnclient.android/.MainActivity"])
         
         success = True
         for command in vpn_commands:
-            if not self.run_adb_command(device.ip, command):
+            if self.run_adb_command(device.ip, command) is None:
                 success = False
                 
         return success
@@ -261,16 +374,17 @@ class PigeonholeFleetManager:
         """Validate successful deployment"""
         print(f"Validating deployment on {device.ip}")
         
+        # String commands run through the device shell so the pipes execute on the device
         validation_checks = {
-            "kodi_running": "shell pgrep org.xbmc.kodi",
-            "vpn_connected": "shell dumpsys connectivity | grep VPN",
-            "root_access": 'shell "su -c id"',
-            "performance": "shell top -n 1 | head -20"
+            "kodi_running": ["pgrep", "org.xbmc.kodi"],
+            "vpn_connected": "dumpsys connectivity | grep VPN",
+            "root_access": ["su", "-c", "id"],
+            "performance": "top -n 1 | head -20"
         }
         
         results = {}
         for check_name, command in validation_checks.items():
-            result = self.run_adb_command(device.ip, command)
+            result = self.run_adb_shell(device.ip, command)
             results[check_name] = result is not None
         
         success_rate = sum(results.values()) / len(results)
@@ -278,40 +392,85 @@ class PigeonholeFleetManager:
         
         return success_rate >= 0.8  # 80% minimum
     
+    def _config_key(self) -> str:
+        """Fingerprint of the settings that determine what each stage does"""
+        relevant = {
+            key: self.config.get(key)
+            for key in ("deployment_stages", "kodi_config", "vpn_config")
+        }
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def _stage_reconnaissance(self, device: FireTVDevice) -> bool:
+        profile = self.device_reconnaissance(device.ip)
+        device.model = profile.model
+        device.android_version = profile.android_version
+        device.firmware = profile.firmware
+        device.root_status = profile.root_status
+        return True
+    
+    def _stage_root(self, device: FireTVDevice) -> bool:
+        if not self.implement_root(device):
+            return False
+        device.root_status = True
+        return True
+    
+    def _traced(self, name: str, run):
+        """Stage function that logs a structured ``stage.<name>`` event for the device"""
+        def traced(device: FireTVDevice) -> bool:
+            with operation(logger, f"stage.{name}", device.ip, level=self.stage_log_level,
+                           model=device.model or None) as op:
+                success = run(device)
+                if not success:
+                    op['outcome'] = 'failed'
+                return success
+        return traced
+    
+    def build_pipeline(self) -> DeploymentPipeline:
+        """Build the staged deployment pipeline from the enabled stages"""
+        enabled = self.config["deployment_stages"]
+        stages = [
+            Stage("reconnaissance", self._stage_reconnaissance, resource=RESOURCE_ADB),
+            Stage("backup", self.create_device_backup, enabled.get("backup", True), RESOURCE_ADB),
+            Stage("root", self._stage_root, enabled.get("root", True), RESOURCE_WAIT),
+            Stage("configure_kodi", self.deploy_kodi_configuration,
+                  enabled.get("configure", True), RESOURCE_BANDWIDTH),
+            Stage("configure_vpn", self.deploy_vpn_configuration,
+                  enabled.get("configure", True), RESOURCE_BANDWIDTH),
+            Stage("validate", self.validate_deployment, enabled.get("validate", True), RESOURCE_WAIT),
+        ]
+        for stage in stages:
+            stage.run = self._traced(stage.name, stage.run)
+        
+        def dump_device(device: FireTVDevice) -> Dict:
+            return asdict(device)
+        
+        return DeploymentPipeline(
+            stages, self.checkpoints, self._config_key(),
+            load_device=FireTVDevice.from_state,
+            dump_device=dump_device
+        )
+    
     def deploy_single_device(self, device_ip: str) -> bool:
-        """Complete deployment pipeline for single device"""
+        """Complete deployment pipeline for single device, resuming from its last checkpoint"""
         try:
-            # Stage 1: Reconnaissance
-            device = self.device_reconnaissance(device_ip)
+            device = self.pipeline.device_for(device_ip)
+            pending = self.pipeline.pending_stages(device_ip)
+            if not pending:
+                print(f"Deployment already complete for {device_ip}")
+                self.devices.append(device)
+                return True
             
-            # Stage 2: Backup
-            if self.config["deployment_stages"]["backup"]:
-                if not self.create_device_backup(device):
-                    print(f"Backup failed for {device_ip}")
-                    return False
-            
-            # Stage 3: Root (if enabled and not already rooted)
-            if self.config["deployment_stages"]["root"] and not device.root_status:
-                if not self.implement_root(device):
-                    print(f"Rooting failed for {device_ip}")
-                    return False
+            if len(pending) < len(self.pipeline.stages):
+                print(f"Resuming {device_ip} at stage: {pending[0].name}")
             
-            # Stage 4: Configuration
-            if self.config["deployment_stages"]["configure"]:
-                kodi_success = self.deploy_kodi_configuration(device)
-                vpn_success = self.deploy_vpn_configuration(device)
-                
-                if not (kodi_success and vpn_success):
-                    print(f"Configuration failed for {device_ip}")
-                    return False
-            
-            # Stage 5: Validation
-            if self.config["deployment_stages"]["validate"]:
-                if not self.validate_deployment(device):
-                    print(f"Validation failed for {device_ip}")
+            for stage in pending:
+                if not self.pipeline.run_stage(device_ip, stage, device):
+                    print(f"Stage {stage.name} failed for {device_ip}")
                     return False
+                device.deployment_stage = stage.name
             
             device.deployment_stage = "completed"
+            self.checkpoints.save_state(device_ip, asdict(device))
             self.devices.append(device)
             print(f"Deployment successful for {device_ip}")
             return True
@@ -320,8 +479,67 @@ class PigeonholeFleetManager:
             print(f"Deployment error for {device_ip}: {e}")
             return False
     
-    def deploy_fleet(self, max_workers: int = 3) -> Dict[str, bool]:
-        """Deploy to entire fleet using parallel processing"""
+    def stage_timing_report(self):
+        """Print where deployment time goes across the fleet"""
+        print("\n" + "="*50)
+        print("PIGEONHOLE DEPLOYMENT STAGE TIMING")
+        print("="*50)
+        print(format_timing_report(self.checkpoints.stage_timings()))
+    
+    def check_device_health(self, device_ip: str) -> HealthReport:
+        """Post-deploy health probe: Kodi process and memory use"""
+        kodi_pid = self.run_adb_shell(device_ip, ["pidof", "org.xbmc.kodi"])
+        
+        memory_usage = None
+        meminfo = self.run_adb_shell(device_ip, ["cat", "/proc/meminfo"])
+        if meminfo:
+            mem = {}
+            for line in meminfo.splitlines():
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    try:
+                        mem[key] = int(value.split()[0])
+                    except (ValueError, IndexError):
+                        pass
+            if mem.get('MemTotal') and 'MemAvailable' in mem:
+                memory_usage = (mem['MemTotal'] - mem['MemAvailable']) / mem['MemTotal'] * 100
+        
+        return HealthReport(device_ip, kodi_running=bool(kodi_pid), memory_usage=memory_usage)
+    
+    def deploy_devices(self, device_ips: List[str], max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """Deploy a set of devices with the stage-parallel pipeline scheduler
+        
+        max_workers, when given, caps the controller-bandwidth pool. With peer
+        distribution the pool is widened to the wave (up to the wait pool's
+        size): each source's uploads are limited by the tracker, and the
+        number of sources grows as devices finish, so the controller uplink
+        no longer bounds the transfer stages.
+        """
+        pool_sizes = dict(self.config.get("scheduler_pools", {}))
+        if max_workers:
+            pool_sizes[RESOURCE_BANDWIDTH] = max_workers
+        if isinstance(self.distributor, PeerDistributor):
+            bandwidth = pool_sizes.get(RESOURCE_BANDWIDTH, DEFAULT_POOL_SIZES[RESOURCE_BANDWIDTH])
+            fan_out = min(len(device_ips), pool_sizes.get(RESOURCE_WAIT, DEFAULT_POOL_SIZES[RESOURCE_WAIT]))
+            pool_sizes[RESOURCE_BANDWIDTH] = max(bandwidth, fan_out)
+        scheduler = PipelineScheduler(self.pipeline, pool_sizes)
+        
+        def on_stage(device_ip: str, device: FireTVDevice, stage: Stage, success: bool):
+            if success:
+                device.deployment_stage = stage.name
+            else:
+                print(f"Stage {stage.name} failed for {device_ip}")
+        
+        def on_device(device_ip: str, device: FireTVDevice, success: bool):
+            if success:
+                device.deployment_stage = "completed"
+                self.checkpoints.save_state(device_ip, asdict(device))
+                self.devices.append(device)
+        
+        return scheduler.run(device_ips, on_stage=on_stage, on_device=on_device)
+    
+    def deploy_fleet(self, max_workers: Optional[int] = None) -> Dict[str, bool]:
+        """Deploy to entire fleet in canary-first waves, halting on failure thresholds"""
         device_ips = self.discover_fire_tv_devices()
         
         if not device_ips:
@@ -330,24 +548,24 @@ class PigeonholeFleetManager:
         
         print(f"Starting fleet deployment to {len(device_ips)} devices")
         
-        results = {}
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_device = {
-                executor.submit(self.deploy_single_device, device_ip): device_ip 
-                for device_ip in device_ips
-            }
-            
-            for future in as_completed(future_to_device):
-                device_ip = future_to_device[future]
-                try:
-                    success = future.result()
-                    results[device_ip] = success
-                except Exception as e:
-                    print(f"Fleet deployment error for {device_ip}: {e}")
-                    results[device_ip] = False
+        policy = WavePolicy.from_dict(self.config.get("rollout", {}))
+        rollout = WaveRollout(
+            lambda wave: self.deploy_devices(wave, max_workers),
+            self.check_device_health,
+            policy
+        )
         
+        self.start_distribution(device_ips)
+        try:
+            outcome: RolloutResult = rollout.run(device_ips)
+        finally:
+            self.stop_distribution()
+        
+        results = outcome.results
         success_count = sum(results.values())
         print(f"Fleet deployment complete: {success_count}/{len(device_ips)} successful")
+        if outcome.halted:
+            print(f"Rollout halted after {len(outcome.waves)} waves: {outcome.halt_reason}")
         
         return results
     
@@ -366,7 +584,12 @@ class PigeonholeFleetManager:
             print()
 
 if __name__ == "__main__":
-    manager = PigeonholeFleetManager()
+    stage_log_level = logging.DEBUG
+    if os.getenv("PIGEONHOLE_LOG_DIR"):
+        # Stage events as JSON lines with PIGEONHOLE_LOG_FORMAT=json, for scripts/pigeonhole_log_query.py
+        if setup_logging(os.environ["PIGEONHOLE_LOG_DIR"]).structured:
+            stage_log_level = logging.INFO
+    manager = PigeonholeFleetManager(stage_log_level=stage_log_level)
     
     if len(sys.argv) > 1:
         command = sys.argv[1]
@@ -388,11 +611,21 @@ if __name__ == "__main__":
         elif command == "status":
             manager.fleet_status_report()
             
+        elif command == "report":
+            manager.stage_timing_report()
+            
+        elif command == "reset":
+            # Forget checkpoints so the next deploy starts from reconnaissance
+            manager.checkpoints.reset(sys.argv[2] if len(sys.argv) > 2 else None)
+            print("Deployment checkpoints cleared")
+            
         else:
-            print("Usage: python deployment_automation.py [discover|deploy [ip]|status]")
+            print("Usage: python deployment_automation.py [discover|deploy [ip]|status|report|reset [ip]]")
     else:
         print("Pigeonhole Fleet Deployment Automation")
         print("Available commands:")
         print("  discover - Scan network for Fire TV devices")
         print("  deploy - Deploy to all devices or single IP")
-        print("  status - Show fleet status report")
\ No newline at end of file
+        print("  status - Show fleet status report")
+        print("  report - Show per-stage deployment timing")
+        print("  reset - Clear deployment checkpoints for all devices or single IP")
\ No newline at end of file
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Staged Deployment Pipeline
+Idempotent deployment stages with persistent per-device checkpoints and stage timing
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# Resource classes a stage can be bound by
+RESOURCE_BANDWIDTH = "bandwidth"  # pushes/installs limited by the controller uplink
+RESOURCE_ADB = "adb"              # short ADB command sequences against one device
+RESOURCE_WAIT = "wait"            # reboots, settle times and other idle device waits
+
+DEFAULT_POOL_SIZES = {
+    RESOURCE_BANDWIDTH: 2,
+    RESOURCE_ADB: 16,
+    RESOURCE_WAIT: 64
+}
+
+@dataclass
+class Stage:
+    """One idempotent step of a device deployment"""
+    name: str
+    run: Callable[[Any], bool]
+    enabled: bool = True
+    resource: str = RESOURCE_ADB
+
+@dataclass
+class StageTiming:
+    """Aggregated timing for one stage across the fleet"""
+    stage: str
+    runs: int
+    failures: int
+    total_seconds: float
+    mean_seconds: float
+    p95_seconds: float
+    max_seconds: float
+
+class CheckpointStore:
+    """
+    SQLite-backed record of completed stages per device.
+
+    A stage counts as done for a device only when it completed under the same
+    ``config_key``, so changing the deployment configuration re-runs every stage.
+    """
+
+    def __init__(self, db_path: str = "deployment_checkpoints.db"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                device_ip TEXT,
+                stage TEXT,
+                config_key TEXT,
+                completed_at REAL,
+                PRIMARY KEY (device_ip, stage)
+            );
+            CREATE TABLE IF NOT EXISTS device_state (
+                device_ip TEXT PRIMARY KEY,
+                state TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stage_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                device_ip TEXT,
+                stage TEXT,
+                started_at REAL,
+                duration REAL,
+                success INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_stage_runs_stage ON stage_runs (stage);
+        ''')
+        self._connection.commit()
+
+    def completed_stages(self, device_ip: str, config_key: str) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT stage FROM checkpoints WHERE device_ip = ? AND config_key = ?',
+                (device_ip, config_key)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_completed(self, device_ip: str, stage: str, config_key: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)',
+                (device_ip, stage, config_key, time.time())
+            )
+            self._connection.commit()
+
+    def record_run(self, device_ip: str, stage: str, started_at: float,
+                   duration: float, success: bool) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO stage_runs (device_ip, stage, started_at, duration, success) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (device_ip, stage, started_at, duration, int(success))
+            )
+            self._connection.commit()
+
+    def load_state(self, device_ip: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT state FROM device_state WHERE device_ip = ?', (device_ip,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_state(self, device_ip: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO device_state VALUES (?, ?)',
+                (device_ip, json.dumps(state))
+            )
+            self._connection.commit()
+
+    def reset(self, device_ip: Optional[str] = None) -> None:
+        """Forget checkpoints for one device, or for the whole fleet"""
+        with self._lock:
+            if device_ip:
+                self._connection.execute('DELETE FROM checkpoints WHERE device_ip = ?', (device_ip,))
+                self._connection.execute('DELETE FROM device_state WHERE device_ip = ?', (device_ip,))
+            else:
+                self._connection.execute('DELETE FROM checkpoints')
+                self._connection.execute('DELETE FROM device_state')
+            self._connection.commit()
+
+    def stage_timings(self) -> List[StageTiming]:
+        """Per-stage timing across every recorded run, slowest total first"""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT stage, duration, success FROM stage_runs'
+            ).fetchall()
+
+        by_stage: Dict[str, List[tuple]] = {}
+        for stage, duration, success in rows:
+            by_stage.setdefault(stage, []).append((duration, success))
+
+        timings = []
+        for stage, runs in by_stage.items():
+            durations = sorted(d for d, _ in runs)
+            total = sum(durations)
+            timings.append(StageTiming(
+                stage=stage,
+                runs=len(runs),
+                failures=sum(1 for _, ok in runs if not ok),
+                total_seconds=total,
+                mean_seconds=total / len(durations),
+                p95_seconds=durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+                max_seconds=durations[-1]
+            ))
+        return sorted(timings, key=lambda t: t.total_seconds, reverse=True)
+
+    def close(self) -> None:
+        self._connection.close()
+
+class DeploymentPipeline:
+    """
+    Ordered deployment stages for a device. Stages already checkpointed are
+    skipped, and a caller stops at the first failed stage so a rerun resumes there.
+
+    ``load_device``/``dump_device`` convert the device object to and from the
+    JSON state persisted after each stage, so later stages can resume without
+    repeating the ones that produced it.
+    """
+
+    def __init__(self, stages: List[Stage], store: CheckpointStore, config_key: str,
+                 load_device: Callable[[Dict[str, Any]], Any],
+                 dump_device: Callable[[Any], Dict[str, Any]]):
+        self.stages = [stage for stage in stages if stage.enabled]
+        self.store = store
+        self.config_key = config_key
+        self.load_device = load_device
+        self.dump_device = dump_device
+
+    def pending_stages(self, device_ip: str) -> List[Stage]:
+        done = set(self.store.completed_stages(device_ip, self.config_key))
+        return [stage for stage in self.stages if stage.name not in done]
+
+    def run_stage(self, device_ip: str, stage: Stage, device: Any) -> bool:
+        """Run one stage, recording its timing and checkpoint"""
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            success = bool(stage.run(device))
+        except Exception as e:
+            print(f"Stage {stage.name} raised on {device_ip}: {e}")
+            success = False
+        duration = time.perf_counter() - start
+
+        self.store.record_run(device_ip, stage.name, started_at, duration, success)
+        if success:
+            self.store.save_state(device_ip, self.dump_device(device))
+            self.store.mark_completed(device_ip, stage.name, self.config_key)
+        return success
+
+    def device_for(self, device_ip: str) -> Any:
+        """Device object restored from the last checkpoint, or a fresh one"""
+        state = self.store.load_state(device_ip)
+        return self.load_device(state or {"ip": device_ip})
+
+class PipelineScheduler:
+    """
+    Stage-parallel fleet scheduler.
+
+    Each resource class has its own bounded worker pool, and a device is handed
+    to the pool of its next stage as soon as the previous one finishes. Pushes
+    for one device therefore overlap with reconnaissance and validation of
+    others, and rollout time approaches the bandwidth-pool bound rather than
+    whole-device jobs in fixed-size batches.
+    """
+
+    def __init__(self, pipeline: DeploymentPipeline, pool_sizes: Optional[Dict[str, int]] = None):
+        self.pipeline = pipeline
+        self.pool_sizes = {**DEFAULT_POOL_SIZES, **(pool_sizes or {})}
+
+    def run(self, device_ips: List[str],
+            on_stage: Optional[Callable[[str, Any, Stage, bool], None]] = None,
+            on_device: Optional[Callable[[str, Any, bool], None]] = None) -> Dict[str, bool]:
+        """Drive every device through its pending stages, returning success per device"""
+        executors = {
+            resource: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"pipeline-{resource}")
+            for resource, size in self.pool_sizes.items()
+        }
+        device_ips = list(dict.fromkeys(device_ips))  # a repeated IP would never reach its count
+        results: Dict[str, bool] = {}
+        done = threading.Condition()
+
+        def finish(device_ip: str, device: Any, success: bool) -> None:
+            # Recorded even if the callback fails; on a worker its exception would only reach a Future
+            try:
+                if on_device:
+                    on_device(device_ip, device, success)
+            except Exception as e:
+                print(f"Device callback failed for {device_ip}: {e}")
+            finally:
+                with done:
+                    results[device_ip] = success
+                    done.notify_all()
+
+        def advance(device_ip: str, device: Any, stages: List[Stage], index: int) -> None:
+            if index == len(stages):
+                finish(device_ip, device, True)
+                return
+            pool = executors.get(stages[index].resource, executors[RESOURCE_ADB])
+            pool.submit(run_one, device_ip, device, stages, index)
+
+        def run_one(device_ip: str, device: Any, stages: List[Stage], index: int) -> None:
+            stage = stages[index]
+            try:
+                success = self.pipeline.run_stage(device_ip, stage, device)
+                if on_stage:
+                    on_stage(device_ip, device, stage, success)
+            except Exception as e:
+                print(f"Pipeline error for {device_ip} at {stage.name}: {e}")
+                success = False
+
+            if success:
+                advance(device_ip, device, stages, index + 1)
+            else:
+                finish(device_ip, device, False)
+
+        try:
+            for device_ip in device_ips:
+                device = self.pipeline.device_for(device_ip)
+                advance(device_ip, device, self.pipeline.pending_stages(device_ip), 0)
+
+            with done:
+                done.wait_for(lambda: len(results) == len(device_ips))
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        return results
+
+def format_timing_report(timings: List[StageTiming]) -> str:
+    """Render stage timings as a text table"""
+    lines = [
+        f"{'Stage':<20}{'Runs':>6}{'Fail':>6}{'Total s':>10}{'Mean s':>9}{'p95 s':>9}{'Max s':>9}",
+        "-" * 69
+    ]
+    grand_total = sum(t.total_seconds for t in timings) or 1.0
+    for t in timings:
+        lines.append(
+            f"{t.stage:<20}{t.runs:>6}{t.failures:>6}{t.total_seconds:>10.1f}"
+            f"{t.mean_seconds:>9.2f}{t.p95_seconds:>9.2f}{t.max_seconds:>9.2f}"
+            f"  {t.total_seconds / grand_total:5.1%}"
+        )
+    return "\n".join(lines)
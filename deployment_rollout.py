@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Wave-Based Rollout
+Canary-first deployment in exponentially growing waves with automatic halt on failure
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+@dataclass
+class WavePolicy:
+    """Wave sizing and gating thresholds"""
+    canary_size: int = 2
+    growth_factor: float = 2.0
+    max_wave_size: int = 50
+    min_success_rate: float = 0.9
+    min_healthy_rate: float = 0.9
+    max_memory_usage: float = 90.0  # percent, matches fleet.monitoring.memory_threshold
+    require_kodi_running: bool = True
+    soak_seconds: float = 30.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WavePolicy":
+        known = set(cls.__dataclass_fields__)
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+@dataclass
+class HealthReport:
+    """Post-deploy health of one device"""
+    device_ip: str
+    kodi_running: bool
+    memory_usage: Optional[float] = None
+
+    def is_healthy(self, policy: WavePolicy) -> bool:
+        if policy.require_kodi_running and not self.kodi_running:
+            return False
+        if self.memory_usage is not None and self.memory_usage > policy.max_memory_usage:
+            return False
+        return True
+
+@dataclass
+class WaveResult:
+    """Outcome of one rollout wave"""
+    index: int
+    devices: List[str]
+    successes: int
+    healthy: int
+    success_rate: float
+    healthy_rate: float
+    duration: float
+    unhealthy: List[HealthReport] = field(default_factory=list)
+
+@dataclass
+class RolloutResult:
+    """Outcome of a whole rollout"""
+    results: Dict[str, bool]
+    waves: List[WaveResult]
+    halted: bool = False
+    halt_reason: str = ""
+    not_attempted: List[str] = field(default_factory=list)
+
+def plan_waves(devices: List[str], policy: WavePolicy) -> List[List[str]]:
+    """Split devices into a canary wave followed by exponentially growing waves"""
+    waves = []
+    size = max(1, policy.canary_size)
+    index = 0
+    while index < len(devices):
+        waves.append(devices[index:index + size])
+        index += size
+        size = min(policy.max_wave_size, max(size + 1, math.ceil(size * policy.growth_factor)))
+    return waves
+
+class WaveRollout:
+    """
+    Deploys waves one after another and gates each on the previous one.
+
+    ``deploy_wave`` deploys a list of devices and returns success per device;
+    ``check_health`` probes one deployed device. A wave passes when both its
+    deploy success rate and the healthy rate of its successful devices meet
+    the policy; otherwise the rollout halts and later waves are never touched.
+    """
+
+    def __init__(self, deploy_wave: Callable[[List[str]], Dict[str, bool]],
+                 check_health: Callable[[str], HealthReport],
+                 policy: Optional[WavePolicy] = None):
+        self.deploy_wave = deploy_wave
+        self.check_health = check_health
+        self.policy = policy or WavePolicy()
+
+    def _gate(self, wave: WaveResult) -> Optional[str]:
+        """Reason to halt after this wave, or None to continue"""
+        if wave.success_rate < self.policy.min_success_rate:
+            return (f"wave {wave.index} success rate {wave.success_rate:.0%} "
+                    f"below {self.policy.min_success_rate:.0%}")
+        if wave.successes and wave.healthy_rate < self.policy.min_healthy_rate:
+            return (f"wave {wave.index} healthy rate {wave.healthy_rate:.0%} "
+                    f"below {self.policy.min_healthy_rate:.0%}")
+        return None
+
+    def run_wave(self, index: int, devices: List[str]) -> Tuple[WaveResult, Dict[str, bool]]:
+        start = time.perf_counter()
+        results = self.deploy_wave(devices)
+        succeeded = [ip for ip in devices if results.get(ip)]
+
+        if succeeded and self.policy.soak_seconds:
+            time.sleep(self.policy.soak_seconds)
+
+        reports = [self.check_health(ip) for ip in succeeded]
+        unhealthy = [r for r in reports if not r.is_healthy(self.policy)]
+        healthy = len(reports) - len(unhealthy)
+
+        return WaveResult(
+            index=index,
+            devices=devices,
+            successes=len(succeeded),
+            healthy=healthy,
+            success_rate=len(succeeded) / len(devices),
+            healthy_rate=healthy / len(succeeded) if succeeded else 0.0,
+            duration=time.perf_counter() - start,
+            unhealthy=unhealthy
+        ), results
+
+    def run(self, devices: List[str]) -> RolloutResult:
+        waves = plan_waves(devices, self.policy)
+        rollout = RolloutResult(results={}, waves=[])
+
+        for index, wave_devices in enumerate(waves):
+            label = "canary" if index == 0 else f"wave {index}"
+            print(f"Rollout {label}: {len(wave_devices)} devices")
+
+            wave, results = self.run_wave(index, wave_devices)
+            rollout.results.update(results)
+            rollout.waves.append(wave)
+            print(f"  {wave.successes}/{len(wave_devices)} deployed, "
+                  f"{wave.healthy}/{wave.successes} healthy in {wave.duration:.1f}s")
+
+            reason = self._gate(wave)
+            if reason:
+                rollout.halted = True
+                rollout.halt_reason = reason
+                rollout.not_attempted = [ip for later in waves[index + 1:] for ip in later]
+                print(f"Rollout halted: {reason}; "
+                      f"{len(rollout.not_attempted)} devices left untouched")
+                break
+
+        return rollout
@@ -3,10 +3,13 @@
 Enable and Configure Pigeonhole Addons via HTTP API
 """
 
-import requests
 import json
-import base64
 import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
 
 class PigeonholeAddonManager:
     def __init__(self):
@@ -15,13 +18,7 @@ class PigeonholeAddonManager:
         self.username = "kodi"
         self.password = "0000"
         
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
         
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
         
@@ -37,31 +34,13 @@ class PigeonholeAddonManager:
 
     def send_rpc_request(self, method, params=None, timeout=15):
         """Send JSON-RPC request to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-            
         try:
-            response = requests.post(
-                self.base_url, 
-                json=payload, 
-                headers=self.headers,
-                timeout=timeout
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
+            return self.rpc.request(method, params, timeout=timeout)
+        except KodiHTTPError as e:
+            print(f"HTTP Error {e.status}: {e.body}")
+        except KodiRPCError as e:
             print(f"Connection error: {e}")
-            return None
+        return None
 
     def enable_addon(self, addon_id):
         """Enable specific addon"""
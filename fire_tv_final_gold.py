@@ -4,15 +4,19 @@ Fire TV Cube Final Gold Setup - Windows Safe Version
 Complete optimization for Kodi v22 with Pigeonhole streaming
 """
 
-import subprocess
 import requests
 import json
-import base64
 import time
 import sys
 import os
 import zipfile
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_advancedsettings import deploy_advancedsettings
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
 
 class FireTVFinalGold:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -22,14 +26,9 @@ class FireTVFinalGold:
         self.password = "0000"
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
         self.adb_path = None
+        self.adb = ADBClient(serial=f"{fire_tv_ip}:5555")
 
-        # Auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Bloatware to remove
         self.amazon_bloatware = [
@@ -66,7 +65,7 @@ class FireTVFinalGold:
         adb_exe = os.path.join(adb_dir, "adb.exe")
 
         if os.path.exists(adb_exe):
-            self.adb_path = adb_exe
+            self.adb_path = self.adb.adb_path = adb_exe
             self.log("ADB already installed", "SUCCESS")
             return True
 
@@ -104,7 +103,7 @@ class FireTVFinalGold:
             os.remove(zip_path)
 
             if os.path.exists(adb_exe):
-                self.adb_path = adb_exe
+                self.adb_path = self.adb.adb_path = adb_exe
                 self.log("ADB installation completed", "SUCCESS")
                 return True
             else:
@@ -115,44 +114,33 @@ class FireTVFinalGold:
             self.log(f"ADB installation error: {e}", "ERROR")
             return False
 
-    def adb_cmd(self, command):
+    def adb_cmd(self, args):
         if not self.adb_path:
             return False, "ADB not available"
 
-        try:
-            full_cmd = f'"{self.adb_path}" -s {self.fire_tv_ip}:5555 {command}'
-            result = subprocess.run(full_cmd, shell=True, capture_output=True, text=True, timeout=30)
-            output = result.stdout.strip() if result.stdout else result.stderr.strip()
-            return result.returncode == 0, output
-        except Exception as e:
-            return False, str(e)
+        result = self.adb.run(args)
+        output = result.output if result.stdout else result.stderr.strip()
+        return result.ok, output
 
     def kodi_api(self, method, params=None):
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            return None
-        except:
+            envelope = self.rpc.request(method, params)
+            return envelope.get("result", envelope)
+        except KodiRPCError:
             return None
 
     def connect_device(self):
         self.log("Connecting to Fire TV Cube...")
 
         # Disconnect first
-        self.adb_cmd(f"disconnect {self.fire_tv_ip}:5555")
+        self.adb_cmd(["disconnect", f"{self.fire_tv_ip}:5555"])
         time.sleep(2)
 
         # Connect
-        success, output = self.adb_cmd(f"connect {self.fire_tv_ip}:5555")
+        success, output = self.adb_cmd(["connect", f"{self.fire_tv_ip}:5555"])
         if success:
             time.sleep(5)
-            success, output = self.adb_cmd("shell echo test")
+            success, output = self.adb_cmd(["shell", "echo", "test"])
             if success and "test" in output:
                 self.log("Fire TV connected successfully", "SUCCESS")
                 return True
@@ -168,8 +156,8 @@ class FireTVFinalGold:
             self.log(f"Processing {package}...")
 
             # Try to disable and uninstall
-            success1, _ = self.adb_cmd(f"shell pm disable-user --user 0 {package}")
-            success2, _ = self.adb_cmd(f"shell pm uninstall --user 0 {package}")
+            success1, _ = self.adb_cmd(["shell", "pm", "disable-user", "--user", "0", package])
+            success2, _ = self.adb_cmd(["shell", "pm", "uninstall", "--user", "0", package])
 
             if success1 or success2:
                 removed += 1
@@ -182,10 +170,10 @@ class FireTVFinalGold:
         self.log("Setting up Kodi launcher...")
 
         # Stop Amazon launcher
-        self.adb_cmd("shell am force-stop com.amazon.tv.launcher")
+        self.adb_cmd(["shell", "am", "force-stop", "com.amazon.tv.launcher"])
 
         # Set Kodi as default
-        success, output = self.adb_cmd("shell cmd package set-home-activity org.xbmc.kodi/org.xbmc.kodi.Splash")
+        success, output = self.adb_cmd(["shell", "cmd", "package", "set-home-activity", "org.xbmc.kodi/org.xbmc.kodi.Splash"])
         if success:
             self.log("Kodi set as default launcher", "SUCCESS")
             return True
@@ -205,33 +193,8 @@ class FireTVFinalGold:
         if result is not None:
             self.log("Pigeonhole skin activated", "SUCCESS")
 
-        # Apply advanced settings
-        advanced_xml = """<advancedsettings>
-<network>
-<buffermode>1</buffermode>
-<cachemembuffersize>209715200</cachemembuffersize>
-<readbufferfactor>4.0</readbufferfactor>
-</network>
-<video>
-<rendermethod>0</rendermethod>
-<adjustrefreshrate>2</adjustrefreshrate>
-</video>
-<cache>
-<memorysize>209715200</memorysize>
-<buffermode>1</buffermode>
-</cache>
-</advancedsettings>"""
-
-        temp_file = "M:\\temp_advanced.xml"
-        with open(temp_file, "w") as f:
-            f.write(advanced_xml)
-
-        success, _ = self.adb_cmd(f"push {temp_file} /storage/emulated/0/Android/data/org.xbmc.kodi/files/.kodi/userdata/advancedsettings.xml")
-
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-
-        if success:
+        # Apply advanced settings, sized for this unit's memory
+        if self.adb_path and deploy_advancedsettings(self.adb).ok:
             self.log("Performance settings applied", "SUCCESS")
 
         return True
@@ -240,11 +203,11 @@ class FireTVFinalGold:
         self.log("Restarting Kodi...")
 
         # Stop Kodi
-        self.adb_cmd("shell am force-stop org.xbmc.kodi")
+        self.adb_cmd(["shell", "am", "force-stop", "org.xbmc.kodi"])
         time.sleep(5)
 
         # Start Kodi
-        success, _ = self.adb_cmd("shell am start -n org.xbmc.kodi/.Splash")
+        success, _ = self.adb_cmd(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
         if success:
             time.sleep(15)  # Wait for startup
             self.log("Kodi restarted successfully", "SUCCESS")
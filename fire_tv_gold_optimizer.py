@@ -4,13 +4,17 @@ Fire TV Cube Gold Optimizer - Pigeonhole Streaming Architect
 Complete system optimization for Kodi v22 gold build
 """
 
-import subprocess
-import requests
 import json
-import base64
 import time
 import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_advancedsettings import deploy_advancedsettings
+from pigeonhole_addon_inventory import get_inventory
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
 
 class FireTVOptimizer:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -19,14 +23,10 @@ class FireTVOptimizer:
         self.username = "kodi"
         self.password = "0000"
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
+        self.adb = ADBClient("adb", serial=f"{fire_tv_ip}:5555", retries=1)
 
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.inventory = get_inventory(self.rpc)
 
         # Amazon bloatware packages to remove (safe list)
         self.amazon_bloatware = [
@@ -93,46 +93,30 @@ class FireTVOptimizer:
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] [{level}] {message}")
 
-    def adb_command(self, command):
-        """Execute ADB command with error handling"""
-        try:
-            full_command = f"adb -s {self.fire_tv_ip}:5555 {command}"
-            result = subprocess.run(full_command, shell=True, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                return True, result.stdout.strip()
-            else:
-                return False, result.stderr.strip()
-        except subprocess.TimeoutExpired:
+    def adb_command(self, args):
+        """Execute an adb argument vector with error handling"""
+        result = self.adb.run(args)
+        if result.ok:
+            return True, result.output
+        if result.timed_out:
             return False, "Command timeout"
-        except Exception as e:
-            return False, str(e)
+        return False, result.stderr.strip()
 
     def kodi_jsonrpc(self, method, params=None):
         """Execute Kodi JSON-RPC call"""
         try:
-            payload = {
-                "jsonrpc": "2.0",
-                "method": method,
-                "id": 1
-            }
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            else:
-                self.log(f"HTTP Error {response.status_code}: {response.text}", "ERROR")
-                return None
-        except Exception as e:
+            envelope = self.rpc.request(method, params)
+            return envelope.get("result", envelope)
+        except KodiHTTPError as e:
+            self.log(f"HTTP Error {e.status}: {e.body}", "ERROR")
+        except KodiRPCError as e:
             self.log(f"Kodi API error: {e}", "ERROR")
-            return None
+        return None
 
     def check_adb_connection(self):
         """Verify ADB connection to Fire TV"""
         self.log("Checking ADB connection...")
-        success, output = self.adb_command("shell echo 'ADB Connected'")
+        success, output = self.adb_command(["shell", "echo", "ADB Connected"])
         if success and "ADB Connected" in output:
             self.log("[OK] ADB connection verified", "SUCCESS")
             return True
@@ -145,14 +129,14 @@ class FireTVOptimizer:
         self.log("Creating system state backup...")
 
         # Get installed packages
-        success, packages = self.adb_command("shell pm list packages")
+        success, packages = self.adb_command(["shell", "pm", "list", "packages"])
         if success:
             with open(f"M:\\fire_tv_packages_backup_{int(time.time())}.txt", "w") as f:
                 f.write(packages)
             self.log("[OK] Package list backed up", "SUCCESS")
 
         # Get current launcher
-        success, launcher = self.adb_command("shell cmd package resolve-activity --brief -c android.intent.category.HOME")
+        success, launcher = self.adb_command(["shell", "cmd", "package", "resolve-activity", "--brief", "-c", "android.intent.category.HOME"])
         if success:
             with open(f"M:\\fire_tv_launcher_backup_{int(time.time())}.txt", "w") as f:
                 f.write(launcher)
@@ -169,10 +153,10 @@ class FireTVOptimizer:
             self.log(f"Removing {package}...")
 
             # First try to disable
-            success, output = self.adb_command(f"shell pm disable-user --user 0 {package}")
+            success, output = self.adb_command(["shell", "pm", "disable-user", "--user", "0", package])
             if success:
                 # Then uninstall for user
-                success, output = self.adb_command(f"shell pm uninstall --user 0 {package}")
+                success, output = self.adb_command(["shell", "pm", "uninstall", "--user", "0", package])
                 if success:
                     self.log(f"  ✅ Removed: {package}", "SUCCESS")
                     removed_count += 1
@@ -189,12 +173,13 @@ class FireTVOptimizer:
         """Get current Kodi addon list"""
         self.log("Analyzing current Kodi addons...")
 
-        result = self.kodi_jsonrpc("Addons.GetAddons", {
-            "properties": ["name", "version", "enabled", "broken", "type"]
-        })
+        try:
+            addons = self.inventory.addons()
+        except KodiRPCError as e:
+            self.log(f"Kodi API error: {e}", "ERROR")
+            addons = None
 
-        if result and "addons" in result:
-            addons = result["addons"]
+        if addons:
             self.log(f"Found {len(addons)} total addons")
 
             enabled_addons = [a for a in addons if a["enabled"]]
@@ -254,6 +239,7 @@ class FireTVOptimizer:
                     "addonid": addon_id,
                     "enabled": False
                 })
+                self.inventory.invalidate(addon_id)
                 if result:
                     cleaned_count += 1
 
@@ -265,20 +251,20 @@ class FireTVOptimizer:
         self.log("Configuring Kodi as default launcher...")
 
         # Stop current launcher
-        success, output = self.adb_command("shell am force-stop com.amazon.tv.launcher")
+        success, output = self.adb_command(["shell", "am", "force-stop", "com.amazon.tv.launcher"])
         if success:
             self.log("✅ Stopped Amazon launcher")
 
         # Set Kodi as default home
-        success, output = self.adb_command("shell cmd package set-home-activity org.xbmc.kodi/org.xbmc.kodi.Splash")
+        success, output = self.adb_command(["shell", "cmd", "package", "set-home-activity", "org.xbmc.kodi/org.xbmc.kodi.Splash"])
         if success:
             self.log("✅ Set Kodi as default launcher", "SUCCESS")
 
             # Clear launcher defaults
-            self.adb_command("shell pm clear com.amazon.tv.launcher")
+            self.adb_command(["shell", "pm", "clear", "com.amazon.tv.launcher"])
 
             # Start Kodi
-            self.adb_command("shell am start -n org.xbmc.kodi/.Splash")
+            self.adb_command(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
             return True
         else:
             self.log(f"❌ Failed to set Kodi launcher: {output}", "ERROR")
@@ -288,57 +274,13 @@ class FireTVOptimizer:
         """Apply Fire TV Cube specific Kodi performance optimizations"""
         self.log("Applying Kodi performance optimizations...")
 
-        # Advanced settings for Fire TV Cube
-        advanced_settings = """<advancedsettings>
-    <network>
-        <buffermode>1</buffermode>
-        <cachemembuffersize>209715200</cachemembuffersize>
-        <readbufferfactor>4.0</readbufferfactor>
-    </network>
-    <video>
-        <rendermethod>0</rendermethod>
-        <adjustrefreshrate>2</adjustrefreshrate>
-        <pauseafterrefreshchange>2</pauseafterrefreshchange>
-        <allowhiresoutput>false</allowhiresoutput>
-        <maxtemporalscale>2</maxtemporalscale>
-    </video>
-    <audio>
-        <audiooutput>audioengine</audiooutput>
-        <channels>2</channels>
-        <samplerate>48000</samplerate>
-        <bitspersample>16</bitspersample>
-        <passthrough>false</passthrough>
-    </audio>
-    <cache>
-        <memorysize>209715200</memorysize>
-        <buffermode>1</buffermode>
-        <readfactor>4.0</readfactor>
-    </cache>
-    <gui>
-        <algorithmdirtyregions>3</algorithmdirtyregions>
-        <nofliptimeout>5</nofliptimeout>
-    </gui>
-    <system>
-        <playlistasfolders>false</playlistasfolders>
-        <extractflags>false</extractflags>
-    </system>
-</advancedsettings>"""
-
-        # Push optimized settings
-        with open("M:\\advanced_settings_temp.xml", "w") as f:
-            f.write(advanced_settings)
-
-        success, output = self.adb_command("push M:\\advanced_settings_temp.xml /storage/emulated/0/Android/data/org.xbmc.kodi/files/.kodi/userdata/advancedsettings.xml")
-        if success:
+        # Cache size and read factor follow this unit's memory (see pigeonhole_advancedsettings)
+        result = deploy_advancedsettings(self.adb)
+        if result.ok:
             self.log("✅ Applied advanced performance settings", "SUCCESS")
-
-            # Clean up temp file
-            import os
-            os.remove("M:\\advanced_settings_temp.xml")
-
             return True
         else:
-            self.log(f"❌ Failed to apply settings: {output}", "ERROR")
+            self.log(f"❌ Failed to apply settings: {result.stderr.strip()}", "ERROR")
             return False
 
     def deploy_pigeonhole_skin(self):
@@ -363,13 +305,13 @@ class FireTVOptimizer:
         self.log("Restarting Kodi...")
 
         # Stop Kodi
-        success, output = self.adb_command("shell am force-stop org.xbmc.kodi")
+        success, output = self.adb_command(["shell", "am", "force-stop", "org.xbmc.kodi"])
         if success:
             self.log("✅ Stopped Kodi")
             time.sleep(3)
 
             # Start Kodi
-            success, output = self.adb_command("shell am start -n org.xbmc.kodi/.Splash")
+            success, output = self.adb_command(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
             if success:
                 self.log("✅ Restarted Kodi", "SUCCESS")
                 time.sleep(10)  # Wait for startup
@@ -4,8 +4,12 @@ FireCube Debloater Script
 Removes Amazon bloatware and optimizes the system
 """
 
-import subprocess
+import sys
 import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
 
 # Device IP and port
 DEVICE_IP = "192.168.1.107:5555"
@@ -193,19 +197,22 @@ ESSENTIAL_PACKAGES = [
     "org.xbmc.kodi"
 ]
 
-def run_adb_command(command):
-    """Run an ADB command and return the output"""
-    try:
-        full_command = f"M:\\\\platform-tools\\\\adb.exe {command}"
-        result = subprocess.run(full_command, shell=True, capture_output=True, text=True, timeout=30)
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return -1, "", str(e)
+adb = ADBClient("M:\\platform-tools\\adb.exe", serial=DEVICE_IP, retries=1)
+
+def run_adb_command(args):
+    """Run an adb argument vector against the FireCube and return the output"""
+    result = adb.run(args)
+    return result.returncode, result.stdout, result.stderr
+
+def run_pm(*args):
+    """Run a package manager command on the FireCube"""
+    return run_adb_command(["shell", "pm", *args])
 
 def connect_device():
     """Connect to the FireCube device"""
     print("Connecting to FireCube device...")
-    code, stdout, stderr = run_adb_command(f"connect {DEVICE_IP}")
+    result = adb.connect(DEVICE_IP)
+    code, stderr = result.returncode, result.stderr
     if code == 0:
         print("[OK] Connected successfully")
         return True
@@ -215,7 +222,7 @@ def connect_device():
 
 def disable_package(package):
     """Disable a package"""
-    code, stdout, stderr = run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 {package}")
+    code, stdout, stderr = run_pm("disable-user", "--user", "0", package)
     if code == 0:
         print(f"[OK] Disabled {package}")
         return True
@@ -225,7 +232,7 @@ def disable_package(package):
 
 def uninstall_package(package):
     """Uninstall a package"""
-    code, stdout, stderr = run_adb_command(f"-s {DEVICE_IP} shell pm uninstall --user 0 {package}")
+    code, stdout, stderr = run_pm("uninstall", "--user", "0", package)
     if code == 0:
         print(f"[OK] Uninstalled {package}")
         return True
@@ -235,7 +242,7 @@ def uninstall_package(package):
 
 def block_internet_access(package):
     """Block internet access for a package"""
-    code, stdout, stderr = run_adb_command(f"-s {DEVICE_IP} shell pm restrict-background {package}")
+    code, stdout, stderr = run_pm("restrict-background", package)
     if code == 0:
         print(f"[OK] Restricted background data for {package}")
         return True
@@ -275,7 +282,7 @@ def main():
     blocked_count = 0
     
     # Get list of all installed packages
-    code, stdout, stderr = run_adb_command(f"-s {DEVICE_IP} shell pm list packages")
+    code, stdout, stderr = run_pm("list", "packages")
     if code == 0:
         all_packages = [line.replace("package:", "").strip() for line in stdout.split("\\n") if line.startswith("package:")]
         
@@ -291,21 +298,21 @@ def main():
     print("\\n3. Optimizing system settings...")
     
     # Disable OTA updates
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.device.software.ota")
+    run_pm("disable-user", "--user", "0", "com.amazon.device.software.ota")
     
     # Disable metrics collection
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.client.metrics")
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.client.metrics.api")
+    run_pm("disable-user", "--user", "0", "com.amazon.client.metrics")
+    run_pm("disable-user", "--user", "0", "com.amazon.client.metrics.api")
     
     # Disable advertising ID
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.advertisingidsettings")
+    run_pm("disable-user", "--user", "0", "com.amazon.advertisingidsettings")
     
     # Disable telemetry
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.tv.fw.metrics")
+    run_pm("disable-user", "--user", "0", "com.amazon.tv.fw.metrics")
     
     # Disable sync services
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.device.sync")
-    run_adb_command(f"-s {DEVICE_IP} shell pm disable-user --user 0 com.amazon.sync.service")
+    run_pm("disable-user", "--user", "0", "com.amazon.device.sync")
+    run_pm("disable-user", "--user", "0", "com.amazon.sync.service")
     
     print("\\n=== Debloating Complete ===")
     print(f"Disabled packages: {disabled_count}")
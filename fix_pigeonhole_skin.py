@@ -2,12 +2,16 @@
 """
 Fix Pigeonhole Skin Installation and Configuration
 """
-import subprocess
-import requests
 import json
-import base64
 import time
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
+from pigeonhole_readiness import kodi_prober, record_time_to_ready, wait_process_exit
 
 class PigeonholeSkinFixer:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -18,38 +22,25 @@ class PigeonholeSkinFixer:
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
         self.adb_path = "M:\\adb\\adb.exe"
 
-        # Auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.adb = ADBClient(self.adb_path, serial=f"{fire_tv_ip}:5555")
+        # pm clear wipes Kodi's data, so first start is slower than a plain restart
+        self.readiness = kodi_prober(self.fire_tv_ip, adb=self.adb, rpc=self.rpc,
+                                     http_port=self.http_port, deadline=120)
 
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] [{level}] {message}")
 
-    def adb_cmd(self, command):
-        try:
-            full_cmd = f'"{self.adb_path}" -s {self.fire_tv_ip}:5555 {command}'
-            result = subprocess.run(full_cmd, shell=True, capture_output=True, text=True, timeout=30)
-            return result.returncode == 0, result.stdout.strip() if result.stdout else result.stderr.strip()
-        except Exception as e:
-            return False, str(e)
+    def adb_cmd(self, args):
+        result = self.adb.run(args, timeout=30)
+        return result.ok, result.output if result.stdout else result.stderr.strip()
 
     def kodi_api(self, method, params=None, timeout=15):
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=timeout)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            return None
-        except Exception as e:
+            envelope = self.rpc.request(method, params, timeout=timeout)
+            return envelope.get("result", envelope)
+        except KodiRPCError as e:
             self.log(f"API error: {e}", "ERROR")
             return None
 
@@ -57,18 +48,21 @@ class PigeonholeSkinFixer:
         self.log("Restarting Kodi safely...")
 
         # Force stop Kodi
-        self.adb_cmd("shell am force-stop org.xbmc.kodi")
-        time.sleep(3)
+        self.adb_cmd(["shell", "am", "force-stop", "org.xbmc.kodi"])
+        wait_process_exit(self.adb)
 
-        # Clear Kodi cache
-        self.adb_cmd("shell pm clear org.xbmc.kodi")
-        time.sleep(2)
+        # Clear Kodi cache (pm clear returns once the data is gone)
+        self.adb_cmd(["shell", "pm", "clear", "org.xbmc.kodi"])
 
         # Start Kodi
-        success, output = self.adb_cmd("shell am start -n org.xbmc.kodi/.Splash")
+        success, output = self.adb_cmd(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
         if success:
-            self.log("Kodi restarted successfully")
-            time.sleep(20)  # Wait for full startup
+            readiness = self.readiness.wait_ready()
+            if not readiness.ready:
+                self.log(f"Kodi started but API not responding: {readiness.describe()}", "ERROR")
+                return False
+            self.log(f"Kodi restarted successfully - {readiness.describe()}")
+            record_time_to_ready(readiness)
             return True
         else:
             self.log(f"Failed to start Kodi: {output}", "ERROR")
@@ -77,20 +71,10 @@ class PigeonholeSkinFixer:
     def reset_to_default_skin(self):
         self.log("Resetting to default Estuary skin...")
 
-        # First ensure Kodi is running
+        # Restart and wait until the JSON-RPC API answers
         if not self.restart_kodi_safe():
             return False
 
-        # Wait for API to be available
-        for attempt in range(10):
-            result = self.kodi_api("JSONRPC.Ping")
-            if result == "pong":
-                break
-            time.sleep(2)
-        else:
-            self.log("Kodi API not responding", "ERROR")
-            return False
-
         # Set default skin
         result = self.kodi_api("Settings.SetSettingValue", {
             "setting": "lookandfeel.skin",
@@ -108,13 +92,13 @@ class PigeonholeSkinFixer:
         self.log("Checking Pigeonhole skin installation...")
 
         # Check if skin addon exists
-        success, output = self.adb_cmd("shell ls /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/skin.arctic.zephyr.pigeonhole")
+        success, output = self.adb_cmd(["shell", "ls", "/sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/skin.arctic.zephyr.pigeonhole"])
 
         if success:
             self.log("Pigeonhole skin directory found")
 
             # Check skin.xml exists
-            success, output = self.adb_cmd("shell test -f /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/skin.arctic.zephyr.pigeonhole/addon.xml")
+            success, output = self.adb_cmd(["shell", "test", "-f", "/sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons/skin.arctic.zephyr.pigeonhole/addon.xml"])
             if success:
                 self.log("Skin addon.xml found")
                 return True
@@ -212,11 +196,9 @@ class PigeonholeSkinFixer:
 
         if result:
             self.log("Pigeonhole skin applied - Kodi will restart")
-            time.sleep(5)  # Wait for skin change to process
 
-            # Kodi should restart automatically for skin change
-            # Wait and check if it comes back up
-            time.sleep(20)
+            # Kodi may reload for the skin change; wait until it answers again
+            self.readiness.wait_ready()
 
             # Test if Kodi is responding with new skin
             for attempt in range(10):
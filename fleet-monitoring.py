@@ -7,10 +7,11 @@ Real-time monitoring and management for Fire TV fleet
 import asyncio
 import json
 import logging
+import os
 import sqlite3
 import subprocess
+import sys
 import time
-import yaml
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -18,10 +19,34 @@ import aiohttp
 import psutil
 from prometheus_client import Counter, Gauge, Histogram, start_http_server
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_config import ConfigChanges
+from pigeonhole_fleet_config import FleetConfig, default_sources
+from pigeonhole_log_rotation import SegmentedFileHandler
+from pigeonhole_logger import ContextFilter, JSONLinesFormatter, RateLimitFilter, operation
+
 # Configuration
 CONFIG_FILE = Path("/opt/pigeonhole/config/fleet-config.yaml")
 DB_FILE = Path("/opt/pigeonhole/data/fleet.db")
 LOG_FILE = Path("/var/log/pigeonhole/fleet-monitor.log")
+# pigeonhole_events_YYYYMMDD.jsonl, written when PIGEONHOLE_LOG_FORMAT=json and rotated daily;
+# load with scripts/pigeonhole_log_query.py --logs /var/log/pigeonhole
+EVENTS_DIR = LOG_FILE.parent
+
+# Used where fleet-config.yaml leaves a monitoring setting out; all of fleet.monitoring is live-reloaded,
+# and overrides.models / overrides.devices in fleet-config.yaml can change it per model or device
+MONITOR_DEFAULTS = {
+    'deployment': {'discovery_range': '192.168.1.0/24'},
+    'fleet': {
+        'monitoring': {
+            'poll_interval': 60,
+            'offline_after': 300,
+            'memory_threshold': 95,
+            'storage_threshold': 90,
+            'temperature_threshold': 70,
+        }
+    },
+}
 
 # Prometheus metrics
 device_status = Gauge('firetv_device_status', 'Device online status', ['device_id', 'model'])
@@ -32,15 +57,30 @@ device_storage_usage = Gauge('firetv_device_storage_usage', 'Device storage usag
 kodi_status = Gauge('kodi_status', 'Kodi running status', ['device_id'])
 vpn_status = Gauge('vpn_status', 'VPN connection status', ['device_id'])
 deployment_counter = Counter('deployment_operations_total', 'Total deployment operations', ['device_id', 'operation', 'status'])
+# Recorded into the metrics table by scripts/pigeonhole_readiness.py after each Kodi restart
+kodi_time_to_ready = Histogram('kodi_time_to_ready_seconds', 'Time from Kodi start until JSON-RPC answers',
+                               ['device_id'], buckets=(2, 5, 10, 15, 20, 30, 45, 60, 90, 120))
 
 # Setup logging
+log_handlers = [logging.FileHandler(LOG_FILE), logging.StreamHandler()]
+# One limiter shared by the text handlers: when a subnet drops, each warning/error template is logged
+# at most once a second after a burst, with a "Suppressed N similar messages" line each minute.
+# The JSON event log below keeps every record.
+log_rate_limit = float(os.getenv('PIGEONHOLE_LOG_RATE_LIMIT', '1'))
+if log_rate_limit > 0:
+    rate_limit_filter = RateLimitFilter(log_rate_limit)
+    for handler in log_handlers:
+        handler.addFilter(rate_limit_filter)
+if os.getenv('PIGEONHOLE_LOG_FORMAT') == 'json':
+    events_handler = SegmentedFileHandler(EVENTS_DIR, "pigeonhole_events", suffix=".jsonl", max_bytes=50*1024*1024,
+                                          compress=os.getenv('PIGEONHOLE_LOG_COMPRESS', 'gzip'))
+    events_handler.setFormatter(JSONLinesFormatter())
+    events_handler.addFilter(ContextFilter())
+    log_handlers.append(events_handler)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
+    handlers=log_handlers
 )
 logger = logging.getLogger(__name__)
 
@@ -69,18 +109,25 @@ class FleetMonitor:
     
     def __init__(self):
         self.devices: Dict[str, FireTVDevice] = {}
-        self.config = self.load_config()
+        self.config = FleetConfig(MONITOR_DEFAULTS, default_sources(fleet_config=CONFIG_FILE))
+        self.config.subscribe('fleet.monitoring', self.on_monitoring_config_changed)
         self.db_connection = None
         self.running = False
-        
-    def load_config(self) -> Dict:
-        """Load configuration from YAML file"""
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                return yaml.safe_load(f)
-        except Exception as e:
-            logger.error(f"Failed to load config: {e}")
-            return {}
+        self.last_time_to_ready_id = 0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+    
+    def on_monitoring_config_changed(self, changes: ConfigChanges):
+        """Runs on the config watcher thread when fleet.monitoring changes on disk"""
+        for key, (old, new) in changes.items():
+            logger.info(f"Config {key}: {old} -> {new}")
+        # Start the next cycle now, so a shorter poll interval does not wait out the old one
+        if 'fleet.monitoring.poll_interval' in changes and self.loop and self.wakeup:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+    
+    def settings(self, device: FireTVDevice):
+        """The device's effective fleet config, with model and device overrides applied"""
+        return self.config.for_device(device.device_id, device.model, device.ip_address)
     
     def init_database(self):
         """Initialize SQLite database for fleet data"""
@@ -124,6 +171,10 @@ class FleetMonitor:
         ''')
         
         self.db_connection.commit()
+
+        # Only export restarts recorded from now on
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM metrics')
+        self.last_time_to_ready_id = cursor.fetchone()[0]
         logger.info("Database initialized successfully")
     
     async def discover_devices(self) -> List[Tuple[str, str]]:
@@ -147,7 +198,7 @@ class FleetMonitor:
             logger.error(f"ADB discovery failed: {e}")
         
         # Network scan for additional devices
-        network_range = self.config.get('deployment', {}).get('discovery_range', '192.168.1.0/24')
+        network_range = self.config.get_config('deployment.discovery_range')
         try:
             result = subprocess.run(['nmap', '-sn', network_range], 
                                   capture_output=True, text=True, timeout=30)
@@ -300,7 +351,7 @@ class FleetMonitor:
             metrics['network_connectivity'] = 1 if result.returncode == 0 else 0
             
         except Exception as e:
-            logger.error(f"Failed to collect metrics for {device.device_id}: {e}")
+            logger.error("Failed to collect metrics for %s: %s", device.device_id, e)
         
         return metrics
     
@@ -352,21 +403,38 @@ class FleetMonitor:
         
         self.db_connection.commit()
     
+    def export_time_to_ready(self):
+        """Feed newly recorded Kodi time-to-ready measurements into Prometheus"""
+        if not self.db_connection:
+            return
+
+        cursor = self.db_connection.cursor()
+        cursor.execute('''
+            SELECT id, device_id, metric_value FROM metrics
+            WHERE metric_name = 'kodi_time_to_ready_seconds' AND id > ?
+            ORDER BY id
+        ''', (self.last_time_to_ready_id,))
+
+        for row_id, device_id, seconds in cursor.fetchall():
+            kodi_time_to_ready.labels(device_id=device_id).observe(seconds)
+            self.last_time_to_ready_id = row_id
+    
     async def check_device_health(self, device: FireTVDevice):
         """Check device health and trigger alerts if needed"""
         metrics = device.metrics
+        limits = self.settings(device).get('fleet.monitoring')
         alerts = []
         
         # Temperature check
-        if 'temperature' in metrics and metrics['temperature'] > 70:
+        if 'temperature' in metrics and metrics['temperature'] > limits['temperature_threshold']:
             alerts.append(f"High temperature: {metrics['temperature']}°C")
         
         # Storage check
-        if 'storage_usage' in metrics and metrics['storage_usage'] > 90:
+        if 'storage_usage' in metrics and metrics['storage_usage'] > limits['storage_threshold']:
             alerts.append(f"Low storage: {100 - metrics['storage_usage']}% free")
         
         # Memory check
-        if 'memory_usage' in metrics and metrics['memory_usage'] > 95:
+        if 'memory_usage' in metrics and metrics['memory_usage'] > limits['memory_threshold']:
             alerts.append(f"High memory usage: {metrics['memory_usage']}%")
         
         # Kodi check
@@ -382,7 +450,8 @@ class FleetMonitor:
             alerts.append("Network connectivity issues")
         
         if alerts:
-            logger.warning(f"Device {device.device_id} health issues: {', '.join(alerts)}")
+            logger.warning("Device %s health issues: %s", device.device_id, ', '.join(alerts),
+                           extra={'device_id': device.device_id, 'outcome': 'unhealthy', 'alerts': alerts})
             await self.send_alert(device, alerts)
     
     async def send_alert(self, device: FireTVDevice, alerts: List[str]):
@@ -396,7 +465,8 @@ class FleetMonitor:
         }
         
         # Log alert
-        logger.warning(f"ALERT for {device.device_id}: {', '.join(alerts)}")
+        logger.warning("ALERT for %s: %s", device.device_id, ', '.join(alerts),
+                       extra={'device_id': device.device_id, 'operation': 'monitor.alert', 'alerts': alerts})
         
         # Store in database
         if self.db_connection:
@@ -408,7 +478,7 @@ class FleetMonitor:
             self.db_connection.commit()
         
         # Send webhook notification if configured
-        webhook_url = self.config.get('monitoring', {}).get('webhook_url')
+        webhook_url = self.config.get_config('monitoring.webhook_url')
         if webhook_url:
             try:
                 async with aiohttp.ClientSession() as session:
@@ -446,21 +516,25 @@ class FleetMonitor:
                     device.ip_address = ip_address  # Update IP if changed
                     device.status = "online"
                     
-                    # Collect metrics
-                    metrics = await self.get_device_metrics(device)
-                    device.update_metrics(metrics)
-                    
-                    # Update monitoring systems
-                    self.update_prometheus_metrics(device)
-                    self.store_metrics(device)
-                    
-                    # Health checks
-                    await self.check_device_health(device)
+                    with operation(logger, 'monitor.poll', device_id, ip=ip_address):
+                        # Collect metrics
+                        metrics = await self.get_device_metrics(device)
+                        device.update_metrics(metrics)
+                        
+                        # Update monitoring systems
+                        self.update_prometheus_metrics(device)
+                        self.store_metrics(device)
+                        
+                        # Health checks
+                        await self.check_device_health(device)
                 
+                self.export_time_to_ready()
+
                 # Mark offline devices
                 current_time = datetime.now()
                 for device in self.devices.values():
-                    if (current_time - device.last_seen).seconds > 300:  # 5 minutes
+                    offline_after = self.settings(device).get('fleet.monitoring.offline_after')
+                    if (current_time - device.last_seen).seconds > offline_after:
                         device.status = "offline"
                         device_status.labels(device_id=device.device_id, model=device.model).set(0)
                 
@@ -469,8 +543,13 @@ class FleetMonitor:
             except Exception as e:
                 logger.error(f"Error in monitoring loop: {e}")
             
-            # Wait before next cycle
-            await asyncio.sleep(60)  # Monitor every minute
+            # Wait before next cycle; re-read each time so edits to the config file apply live
+            try:
+                await asyncio.wait_for(self.wakeup.wait(),
+                                       timeout=self.config.get_config('fleet.monitoring.poll_interval'))
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
     
     async def start(self):
         """Start the fleet monitoring system"""
@@ -483,6 +562,11 @@ class FleetMonitor:
         start_http_server(8000)
         logger.info("Prometheus metrics server started on port 8000")
         
+        # Pick up edits to fleet-config.yaml without a restart
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.config.watch()
+        
         # Start monitoring
         self.running = True
         await self.monitoring_loop()
@@ -491,6 +575,7 @@ class FleetMonitor:
         """Stop the monitoring system"""
         logger.info("Stopping fleet monitoring system...")
         self.running = False
+        self.config.stop_watching()
         if self.db_connection:
             self.db_connection.close()
 
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Peer-Assisted Artefact Distribution
+Devices that already hold an APK or addon payload serve it over LAN HTTP to later devices
+"""
+
+import hashlib
+import http.server
+import logging
+import os
+import shlex
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+CONTROLLER_ID = "controller"
+
+@dataclass
+class Artefact:
+    """Single file distributed to every device in a rollout"""
+    name: str
+    local_path: str
+    sha256: str
+    size: int
+
+    @classmethod
+    def from_file(cls, path: str, name: Optional[str] = None) -> "Artefact":
+        """Build an artefact description by hashing a local file"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return cls(
+            name=name or os.path.basename(path),
+            local_path=str(path),
+            sha256=digest.hexdigest(),
+            size=os.path.getsize(path)
+        )
+
+@dataclass
+class Source:
+    """A holder of an artefact that can upload it to other devices"""
+    source_id: str
+    url: str
+    active_uploads: int = 0
+    completed_uploads: int = 0
+    failures: int = 0
+
+@dataclass
+class _ArtefactState:
+    artefact: Artefact
+    sources: Dict[str, Source] = field(default_factory=dict)
+
+class DistributionTracker:
+    """
+    Controller-side tracker that assigns a download source to each device.
+
+    The controller is always a source; every device that finishes and verifies a
+    download is added as a further source. Each source serves at most
+    ``max_uploads_per_source`` concurrent transfers, and assignment prefers the
+    least-loaded peer so the controller uplink is only used when no peer is free.
+    """
+
+    def __init__(self, max_uploads_per_source: int = 2, max_source_failures: int = 2):
+        self.max_uploads_per_source = max_uploads_per_source
+        self.max_source_failures = max_source_failures
+        self.logger = logging.getLogger('pigeonhole.distribution')
+        self._artefacts: Dict[str, _ArtefactState] = {}
+        self._condition = threading.Condition()
+
+    def register_artefact(self, artefact: Artefact, controller_url: str) -> None:
+        """Register an artefact seeded by the controller"""
+        with self._condition:
+            state = _ArtefactState(artefact=artefact)
+            state.sources[CONTROLLER_ID] = Source(CONTROLLER_ID, controller_url)
+            self._artefacts[artefact.name] = state
+
+    def has_artefact(self, name: str) -> bool:
+        return name in self._artefacts
+
+    def get_artefact(self, name: str) -> Artefact:
+        """Get a registered artefact by name"""
+        return self._artefacts[name].artefact
+
+    def _pick_source(self, state: _ArtefactState, device_id: str, exclude) -> Optional[Source]:
+        candidates = [
+            source for source in state.sources.values()
+            if source.source_id != device_id
+            and source.source_id not in exclude
+            and source.active_uploads < self.max_uploads_per_source
+            and source.failures < self.max_source_failures
+        ]
+        if not candidates:
+            return None
+        # Peers first, then fewest active uploads
+        return min(candidates, key=lambda s: (s.source_id == CONTROLLER_ID, s.active_uploads))
+
+    def assign(self, name: str, device_id: str, timeout: Optional[float] = None,
+               exclude=()) -> Optional[Source]:
+        """Reserve an upload slot on a source, waiting until one is free"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            state = self._artefacts[name]
+            while True:
+                source = self._pick_source(state, device_id, exclude)
+                if source:
+                    source.active_uploads += 1
+                    return source
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def release(self, name: str, source: Source, success: bool) -> None:
+        """Release an upload slot after a transfer attempt"""
+        with self._condition:
+            source.active_uploads -= 1
+            if success:
+                source.completed_uploads += 1
+            elif source.source_id != CONTROLLER_ID:
+                source.failures += 1
+                if source.failures >= self.max_source_failures:
+                    self.logger.warning(f"Source {source.source_id} disabled for {name}")
+            self._condition.notify_all()
+
+    def add_holder(self, name: str, device_id: str, url: str) -> None:
+        """Record that a device now holds and serves the artefact"""
+        with self._condition:
+            self._artefacts[name].sources[device_id] = Source(device_id, url)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Completed uploads per source for each artefact"""
+        with self._condition:
+            return {
+                name: {sid: s.completed_uploads for sid, s in state.sources.items()}
+                for name, state in self._artefacts.items()
+            }
+
+class _RateLimiter:
+    """Token bucket shared by every upload from one server"""
+
+    def __init__(self, bytes_per_second: Optional[float]):
+        self.rate = bytes_per_second
+        self._lock = threading.Lock()
+        self._next_free = time.monotonic()
+
+    def consume(self, nbytes: int) -> None:
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_free)
+            self._next_free = start + nbytes / self.rate
+            delay = self._next_free - now
+        if delay > 0:
+            time.sleep(delay)
+
+class ArtefactServer:
+    """Threaded HTTP server publishing individual artefact files by name"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8089,
+                 upload_limit: Optional[float] = None):
+        self.files: Dict[str, str] = {}
+        self.limiter = _RateLimiter(upload_limit)
+        server = self
+
+        class Handler(http.server.SimpleHTTPRequestHandler):
+            def translate_path(self, path):
+                name = path.split('?', 1)[0].lstrip('/')
+                # Unknown names map to an empty path, which fails to open and gives a 404
+                return server.files.get(name, '')
+
+            def copyfile(self, source, outputfile):
+                while True:
+                    chunk = source.read(server.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    server.limiter.consume(len(chunk))
+                    outputfile.write(chunk)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, name: str, path: str) -> None:
+        """Serve a local file under /<name>"""
+        self.files[name] = str(path)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> "ArtefactServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def _shell(*args) -> List[str]:
+    """adb argument vector running one quoted command in the device shell"""
+    return ["shell", shlex.join(str(arg) for arg in args)]
+
+def get_lan_address(target_ip: str) -> str:
+    """Local interface address used to reach a device"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect((target_ip, 9))
+        return sock.getsockname()[0]
+    finally:
+        sock.close()
+
+class PeerDistributor:
+    """
+    Distributes artefacts to devices through the tracker.
+
+    ``run_adb_command(device_ip, args)`` is the fleet manager's argv ADB runner
+    and returns stdout or ``None`` on failure. Devices download with busybox wget into
+    ``cache_dir`` and, once the checksum matches, serve that directory with busybox
+    httpd on ``peer_port`` so later devices can fetch from them. A device whose
+    httpd does not come up (stock Fire OS often has no busybox applet for it) is
+    not offered as a source; its peers fetch from the origin instead.
+    """
+
+    def __init__(self, run_adb_command: Callable[[str, Sequence[str]], Optional[str]],
+                 tracker: DistributionTracker,
+                 cache_dir: str = "/sdcard/pigeonhole/cache",
+                 peer_port: int = 8088,
+                 assign_timeout: float = 600):
+        self.run_adb_command = run_adb_command
+        self.tracker = tracker
+        self.cache_dir = cache_dir
+        self.peer_port = peer_port
+        self.assign_timeout = assign_timeout
+        self.logger = logging.getLogger('pigeonhole.distribution')
+        # device -> whether its httpd answered on peer_port
+        self._serving: Dict[str, bool] = {}
+        self._serving_lock = threading.Lock()
+
+    def handles(self, name: str) -> bool:
+        return self.tracker.has_artefact(name)
+
+    def remote_path(self, artefact: Artefact) -> str:
+        return f"{self.cache_dir}/{artefact.name}"
+
+    def _has_artefact(self, device_ip: str, artefact: Artefact) -> bool:
+        output = self.run_adb_command(device_ip, _shell("sha256sum", self.remote_path(artefact)))
+        return output is not None and output.split()[:1] == [artefact.sha256]
+
+    def _peer_port_open(self, device_ip: str, attempts: int = 3) -> bool:
+        for attempt in range(attempts):
+            try:
+                socket.create_connection((device_ip, self.peer_port), timeout=2).close()
+                return True
+            except OSError:
+                time.sleep(0.5 * (attempt + 1))
+        return False
+
+    def _start_peer_server(self, device_ip: str) -> bool:
+        """Start httpd on the device once; whether it is serving ``cache_dir``"""
+        with self._serving_lock:
+            if device_ip in self._serving:
+                return self._serving[device_ip]
+        started = self.run_adb_command(
+            device_ip,
+            _shell("busybox", "httpd", "-p", self.peer_port, "-h", self.cache_dir)
+        ) is not None and self._peer_port_open(device_ip)
+        if not started:
+            self.logger.warning(f"No peer server on {device_ip}:{self.peer_port}; it will not serve other devices")
+        with self._serving_lock:
+            self._serving.setdefault(device_ip, started)
+            return self._serving[device_ip]
+
+    def stop_peer_servers(self) -> None:
+        """Stop the httpd instances started on devices"""
+        with self._serving_lock:
+            serving = [device_ip for device_ip, started in self._serving.items() if started]
+            self._serving.clear()
+        for device_ip in serving:
+            self.run_adb_command(device_ip, _shell("pkill", "-f", "busybox httpd"))
+
+    def distribute(self, device_ip: str, name: str) -> Optional[str]:
+        """Get an artefact onto a device, returning its remote path"""
+        artefact = self.tracker.get_artefact(name)
+        remote = self.remote_path(artefact)
+        self.run_adb_command(device_ip, _shell("mkdir", "-p", self.cache_dir))
+
+        if not self._has_artefact(device_ip, artefact):
+            if not self._fetch(device_ip, artefact, remote):
+                self.logger.warning(f"Peer fetch failed for {name} on {device_ip}, pushing directly")
+                if self.run_adb_command(device_ip, ["push", artefact.local_path, remote]) is None:
+                    return None
+                if not self._has_artefact(device_ip, artefact):
+                    return None
+
+        if self._start_peer_server(device_ip):
+            self.tracker.add_holder(name, device_ip, f"http://{device_ip}:{self.peer_port}/{artefact.name}")
+        return remote
+
+    def _fetch(self, device_ip: str, artefact: Artefact, remote: str) -> bool:
+        tried = set()
+        while True:
+            source = self.tracker.assign(artefact.name, device_ip,
+                                         timeout=self.assign_timeout, exclude=tried)
+            if source is None:
+                return False
+            tried.add(source.source_id)
+
+            self.logger.debug(f"{device_ip} fetching {artefact.name} from {source.source_id}")
+            self.run_adb_command(device_ip, _shell("busybox", "wget", "-q", "-O", remote, source.url))
+            ok = self._has_artefact(device_ip, artefact)
+            self.tracker.release(artefact.name, source, success=ok)
+            if ok:
+                return True
+            if source.source_id == CONTROLLER_ID:
+                # The device cannot fetch at all; let the caller push instead
+                return False
+
+class DirectDistributor:
+    """Star-topology distribution: every device is pushed to from the controller"""
+
+    def __init__(self, run_adb_command: Callable[[str, Sequence[str]], Optional[str]],
+                 artefacts: Dict[str, Artefact],
+                 cache_dir: str = "/sdcard/pigeonhole/cache"):
+        self.run_adb_command = run_adb_command
+        self.artefacts = artefacts
+        self.cache_dir = cache_dir
+
+    def handles(self, name: str) -> bool:
+        return name in self.artefacts
+
+    def distribute(self, device_ip: str, name: str) -> Optional[str]:
+        artefact = self.artefacts[name]
+        remote = f"{self.cache_dir}/{artefact.name}"
+        self.run_adb_command(device_ip, _shell("mkdir", "-p", self.cache_dir))
+        if self.run_adb_command(device_ip, ["push", artefact.local_path, remote]) is None:
+            return None
+        return remote
+
+    def stop_peer_servers(self) -> None:
+        pass
+
+def build_artefacts(paths: List[str]) -> Dict[str, Artefact]:
+    """Hash the artefact files that exist on the controller"""
+    return {
+        Path(path).name: Artefact.from_file(path)
+        for path in paths
+        if Path(path).is_file()
+    }
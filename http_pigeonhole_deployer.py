@@ -4,14 +4,18 @@ HTTP-First Pigeonhole Streaming System Deployer
 Comprehensive deployment using only HTTP API for 100% reliability
 """
 
-import requests
 import json
-import base64
 import time
 import os
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import urllib.parse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_rpc import KodiAPIError, KodiHTTPError, KodiRPCClient, KodiRPCError
+from pigeonhole_settings_profile import apply_profile, get_profile
 
 class HTTPPigeonholeDeployer:
     def __init__(self):
@@ -21,13 +25,7 @@ class HTTPPigeonholeDeployer:
         self.password = "0000"
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
 
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Deployment status tracking
         self.deployment_log = {
@@ -54,35 +52,15 @@ class HTTPPigeonholeDeployer:
 
     def send_rpc_request(self, method, params=None, timeout=15):
         """Enhanced RPC with better error handling"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-
         try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=self.headers,
-                timeout=timeout
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "error" in result:
-                    self.log(f"Kodi API Error: {result['error']}", "ERROR")
-                    return None
-                return result.get("result", result)
-            else:
-                self.log(f"HTTP Error {response.status_code}: {response.text}", "ERROR")
-                return None
-
-        except requests.exceptions.RequestException as e:
+            return self.rpc.call(method, params, timeout=timeout)
+        except KodiAPIError as e:
+            self.log(f"Kodi API Error: {e.error}", "ERROR")
+        except KodiHTTPError as e:
+            self.log(f"HTTP Error {e.status}: {e.body}", "ERROR")
+        except KodiRPCError as e:
             self.log(f"Connection error: {e}", "ERROR")
-            return None
+        return None
 
     def test_connection(self):
         """Verify HTTP API connectivity"""
@@ -120,6 +98,23 @@ class HTTPPigeonholeDeployer:
         self.log("✗ Failed to get system information", "ERROR")
         return None
 
+    def apply_profile(self, name):
+        """Bring Kodi to a settings profile, writing only differing values; returns (settings in place, total)"""
+        profile = get_profile(name)
+        try:
+            result = apply_profile(self.rpc, profile)
+        except KodiRPCError as e:
+            self.log(f"Connection error: {e}", "ERROR")
+            return 0, len(profile.settings)
+
+        for setting in result.unchanged:
+            self.log(f"  ✓ {profile.describe(setting)} (already set)")
+        for setting in result.changed:
+            self.log(f"  ✓ {profile.describe(setting)}")
+        for setting, message in {**result.failed, **result.unknown}.items():
+            self.log(f"  ✗ Failed: {profile.describe(setting)} ({message})")
+        return len(result.in_place), len(profile.settings)
+
     def configure_advanced_settings(self):
         """Apply advanced cache and performance settings via HTTP"""
         self.log("Applying advanced performance settings...")
@@ -132,53 +127,9 @@ class HTTPPigeonholeDeployer:
             self.log("✓ Loaded advanced settings configuration")
 
             # Apply key settings via HTTP API
-            performance_settings = [
-                {
-                    "setting": "network.cachemembuffersize",
-                    "value": 209715200,  # 200MB cache
-                    "description": "Network cache buffer (200MB)"
-                },
-                {
-                    "setting": "cache.memorysize",
-                    "value": 209715200,
-                    "description": "Memory cache size (200MB)"
-                },
-                {
-                    "setting": "cache.readfactor",
-                    "value": 20,
-                    "description": "Cache read factor"
-                },
-                {
-                    "setting": "videoplayer.usemediacodec",
-                    "value": True,
-                    "description": "Enable MediaCodec acceleration"
-                },
-                {
-                    "setting": "videoplayer.useamcodec",
-                    "value": True,
-                    "description": "Enable AMCodec acceleration"
-                },
-                {
-                    "setting": "debug.showloginfo",
-                    "value": False,
-                    "description": "Disable debug overlay"
-                }
-            ]
-
-            applied_count = 0
-            for setting_config in performance_settings:
-                response = self.send_rpc_request("Settings.SetSettingValue", {
-                    "setting": setting_config["setting"],
-                    "value": setting_config["value"]
-                })
+            applied_count, total = self.apply_profile("performance")
 
-                if response is True or (response and "result" in str(response)):
-                    self.log(f"  ✓ {setting_config['description']}")
-                    applied_count += 1
-                else:
-                    self.log(f"  ✗ Failed: {setting_config['description']}")
-
-            self.log(f"Applied {applied_count}/{len(performance_settings)} performance settings")
+            self.log(f"Applied {applied_count}/{total} performance settings")
             return applied_count > 0
 
         except Exception as e:
@@ -189,48 +140,9 @@ class HTTPPigeonholeDeployer:
         """Apply GUI optimizations via HTTP"""
         self.log("Applying GUI optimizations...")
 
-        gui_settings = [
-            {
-                "setting": "lookandfeel.skin",
-                "value": "skin.arctic.zephyr.pigeonhole",
-                "description": "Set Pigeonhole skin"
-            },
-            {
-                "setting": "locale.language",
-                "value": "resource.language.en_gb",
-                "description": "Set English language"
-            },
-            {
-                "setting": "locale.country",
-                "value": "United States",
-                "description": "Set country"
-            },
-            {
-                "setting": "filelists.showparentdiritems",
-                "value": False,
-                "description": "Hide parent directory items"
-            },
-            {
-                "setting": "filelists.showextensions",
-                "value": False,
-                "description": "Hide file extensions"
-            }
-        ]
-
-        applied_count = 0
-        for setting in gui_settings:
-            response = self.send_rpc_request("Settings.SetSettingValue", {
-                "setting": setting["setting"],
-                "value": setting["value"]
-            })
-
-            if response is True or (response and "result" in str(response)):
-                self.log(f"  ✓ {setting['description']}")
-                applied_count += 1
-            else:
-                self.log(f"  ✗ Failed: {setting['description']}")
+        applied_count, total = self.apply_profile("gui")
 
-        self.log(f"Applied {applied_count}/{len(gui_settings)} GUI settings")
+        self.log(f"Applied {applied_count}/{total} GUI settings")
         return applied_count > 0
 
     def install_pigeonhole_repository(self):
@@ -308,48 +220,9 @@ class HTTPPigeonholeDeployer:
         """Configure streaming-specific settings"""
         self.log("Configuring streaming settings...")
 
-        streaming_settings = [
-            {
-                "setting": "videoplayer.adjustrefreshrate",
-                "value": 2,  # Always
-                "description": "Adjust refresh rate"
-            },
-            {
-                "setting": "videoplayer.pauseafterrefreshchange",
-                "value": 0.1,
-                "description": "Pause after refresh change"
-            },
-            {
-                "setting": "videoplayer.synctype",
-                "value": 0,  # Audio clock
-                "description": "Sync type: Audio clock"
-            },
-            {
-                "setting": "subtitles.height",
-                "value": 20,
-                "description": "Subtitle size"
-            },
-            {
-                "setting": "locale.timezone",
-                "value": "America/New_York",
-                "description": "Timezone"
-            }
-        ]
-
-        applied_count = 0
-        for setting in streaming_settings:
-            response = self.send_rpc_request("Settings.SetSettingValue", {
-                "setting": setting["setting"],
-                "value": setting["value"]
-            })
-
-            if response is True or (response and "result" in str(response)):
-                self.log(f"  ✓ {setting['description']}")
-                applied_count += 1
-            else:
-                self.log(f"  ⚠ {setting['description']} - may not be available")
+        applied_count, total = self.apply_profile("streaming")
 
-        self.log(f"Applied {applied_count}/{len(streaming_settings)} streaming settings")
+        self.log(f"Applied {applied_count}/{total} streaming settings")
         return True
 
     def test_addon_functionality(self):
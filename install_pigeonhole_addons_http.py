@@ -4,13 +4,18 @@ HTTP-Based Pigeonhole Addon Installation System
 Install core streaming addons using HTTP API for reliable deployment
 """
 
-import requests
 import json
-import base64
 import time
 import os
 import subprocess
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_addon_inventory import get_inventory
+from pigeonhole_kodi_events import ADDON_EVENTS, KodiEventListener
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
 
 class PigeonholeAddonInstaller:
     def __init__(self):
@@ -21,13 +26,9 @@ class PigeonholeAddonInstaller:
         self.password = "0000"
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
 
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.events = KodiEventListener(self.fire_tv_ip).start()
+        self.inventory = get_inventory(self.rpc, self.events)
 
         self.installation_log = []
         self.installation_status = {
@@ -37,6 +38,10 @@ class PigeonholeAddonInstaller:
             "manual_steps_required": []
         }
 
+    def close(self):
+        """Stop the notification listener"""
+        self.events.stop()
+
     def log(self, message, level="INFO"):
         """Enhanced logging with installation tracking"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -46,36 +51,20 @@ class PigeonholeAddonInstaller:
 
     def send_rpc_request(self, method, params=None, timeout=15):
         """Send JSON-RPC request to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-
         try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers=self.headers,
-                timeout=timeout
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                if "error" in result:
-                    self.log(f"Kodi API Error: {result['error']}", "ERROR")
-                    return None
-                return result.get("result", result)
-            else:
-                self.log(f"HTTP Error {response.status_code}", "ERROR")
-                return None
-
-        except requests.exceptions.RequestException as e:
+            envelope = self.rpc.request(method, params, timeout=timeout)
+        except KodiHTTPError as e:
+            self.log(f"HTTP Error {e.status}", "ERROR")
+            return None
+        except KodiRPCError as e:
             self.log(f"Connection error: {e}", "ERROR")
             return None
 
+        if "error" in envelope:
+            self.log(f"Kodi API Error: {envelope['error']}", "ERROR")
+            return None
+        return envelope.get("result", envelope)
+
     def test_connection(self):
         """Test HTTP API connectivity"""
         self.log("Testing Kodi HTTP API connection...")
@@ -114,40 +103,32 @@ class PigeonholeAddonInstaller:
         """Get list of currently installed repositories"""
         self.log("Checking installed repositories...")
 
-        repos_response = self.send_rpc_request("Addons.GetAddons", {
-            "type": "xbmc.addon.repository",
-            "properties": ["name", "version", "enabled"]
-        })
-
-        if repos_response and "addons" in repos_response:
-            repositories = repos_response["addons"]
-            self.log(f"[OK] Found {len(repositories)} installed repositories:")
+        try:
+            repositories = self.inventory.addons("xbmc.addon.repository")
+        except KodiRPCError as e:
+            self.log(f"[WARN] Could not retrieve repository list: {e}")
+            return []
 
-            for repo in repositories:
-                repo_status = "enabled" if repo["enabled"] else "disabled"
-                self.log(f"  - {repo['name']} v{repo['version']} ({repo_status})")
+        self.log(f"[OK] Found {len(repositories)} installed repositories:")
+        for repo in repositories:
+            repo_status = "enabled" if repo["enabled"] else "disabled"
+            self.log(f"  - {repo['name']} v{repo['version']} ({repo_status})")
 
-            return repositories
-        else:
-            self.log("[WARN] Could not retrieve repository list")
-            return []
+        return repositories
 
     def get_installed_addons(self):
         """Get comprehensive list of installed addons"""
         self.log("Checking installed addons...")
 
-        addons_response = self.send_rpc_request("Addons.GetAddons", {
-            "properties": ["name", "version", "enabled", "broken", "type"]
-        })
-
-        if addons_response and "addons" in addons_response:
-            addons = addons_response["addons"]
-            self.log(f"[OK] Found {len(addons)} total installed addons")
-            return addons
-        else:
-            self.log("[WARN] Could not retrieve addon list")
+        try:
+            addons = self.inventory.addons()
+        except KodiRPCError as e:
+            self.log(f"[WARN] Could not retrieve addon list: {e}")
             return []
 
+        self.log(f"[OK] Found {len(addons)} total installed addons")
+        return addons
+
     def check_core_addons_status(self):
         """Check status of core Pigeonhole addons"""
         self.log("Checking core Pigeonhole addon status...")
@@ -161,16 +142,15 @@ class PigeonholeAddonInstaller:
             "script.pigeonhole.config": "Pigeonhole Configuration"
         }
 
-        installed_addons = self.get_installed_addons()
-        addon_lookup = {addon["addonid"]: addon for addon in installed_addons}
+        reachable = bool(self.get_installed_addons())
 
         addon_status = {}
         missing_addons = []
         working_addons = []
 
         for addon_id, addon_name in core_addons.items():
-            if addon_id in addon_lookup:
-                addon_info = addon_lookup[addon_id]
+            addon_info = self.inventory.get(addon_id) if reachable else None
+            if addon_info:
                 status = {
                     "present": True,
                     "enabled": addon_info["enabled"],
@@ -324,15 +304,18 @@ class PigeonholeAddonInstaller:
         self.log("Waiting for repository refresh...")
 
         # Trigger repository update
+        refreshed = self.events.expect(ADDON_EVENTS)
         update_response = self.send_rpc_request("Addons.SetAddonEnabled", {
             "addonid": "repository.pigeonhole.streaming",
             "enabled": True
         })
 
-        # Wait for refresh
-        time.sleep(10)
-
-        self.log("[OK] Repository refresh completed")
+        # Wait for Kodi to announce the addon database change (at most 10s)
+        event = refreshed.wait(timeout=10)
+        if event:
+            self.log(f"[OK] Repository refresh completed ({event.method})")
+        else:
+            self.log("[OK] Repository refresh completed")
         return True
 
     def install_core_addons_from_repository(self):
@@ -506,7 +489,10 @@ def main():
     """Main installation execution"""
     installer = PigeonholeAddonInstaller()
 
-    success = installer.run_addon_installation()
+    try:
+        success = installer.run_addon_installation()
+    finally:
+        installer.close()
 
     if success:
         print("\n[SUCCESS] Pigeonhole addon installation completed!")
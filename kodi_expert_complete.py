@@ -2,13 +2,17 @@
 """
 Complete Kodi Expert Agent - Fire TV Cube Pigeonhole Specialist
 """
-import requests
 import json
-import base64
 import subprocess
 import time
 import os
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_addon_inventory import get_inventory
+from pigeonhole_kodi_rpc import KodiAPIError, KodiRPCClient, KodiRPCError
 
 class KodiExpert:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -19,37 +23,30 @@ class KodiExpert:
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
         self.adb_path = "M:\\adb\\adb.exe"
 
-        # Auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.inventory = get_inventory(self.rpc)
 
     def log(self, message, level="INFO"):
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] [KODI-EXPERT] [{level}] {message}")
 
+    def installed_addons(self, addon_type=None):
+        """Cached addon inventory; None when Kodi is unreachable"""
+        try:
+            return self.inventory.addons(addon_type)
+        except KodiRPCError as e:
+            self.log(f"Addon inventory unavailable: {e}", "ERROR")
+            return None
+
     def kodi_api(self, method, params=None):
         """Kodi JSON-RPC API with expert error handling"""
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
-
-            if response.status_code == 200:
-                result = response.json()
-                if "error" in result:
-                    self.log(f"Kodi API Error: {result['error']}", "ERROR")
-                    return None
-                return result.get("result", result)
-            else:
-                return None
-        except:
-            return None
+            return self.rpc.call(method, params)
+        except KodiAPIError as e:
+            self.log(f"Kodi API Error: {e.error}", "ERROR")
+        except KodiRPCError:
+            pass
+        return None
 
     def adb_cmd(self, command):
         """ADB command with expert error handling"""
@@ -116,17 +113,13 @@ class KodiExpert:
         ]
 
         # Get all addons
-        all_addons = self.kodi_api("Addons.GetAddons", {
-            "properties": ["name", "enabled", "broken"]
-        })
+        all_addons = self.installed_addons()
 
         addon_status = {}
-        if all_addons and "addons" in all_addons:
-            addon_dict = {addon["addonid"]: addon for addon in all_addons["addons"]}
-
+        if all_addons is not None:
             for addon_id in core_addons:
-                if addon_id in addon_dict:
-                    addon = addon_dict[addon_id]
+                addon = self.inventory.get(addon_id)
+                if addon:
                     addon_status[addon_id] = {
                         "installed": True,
                         "enabled": addon["enabled"],
@@ -142,7 +135,7 @@ class KodiExpert:
                     }
 
         return {
-            "total_addons": len(all_addons["addons"]) if all_addons and "addons" in all_addons else 0,
+            "total_addons": len(all_addons or []),
             "core_addons": addon_status,
             "missing_count": sum(1 for status in addon_status.values() if not status["installed"])
         }
@@ -157,22 +150,16 @@ class KodiExpert:
         })
 
         # Get available skins
-        skins = self.kodi_api("Addons.GetAddons", {
-            "type": "xbmc.gui.skin",
-            "properties": ["name", "enabled", "broken"]
-        })
+        skins = self.installed_addons("xbmc.gui.skin")
 
         pigeonhole_available = False
-        if skins and "addons" in skins:
-            for skin in skins["addons"]:
-                if skin["addonid"] == "skin.arctic.zephyr.pigeonhole":
-                    pigeonhole_available = skin["enabled"] and not skin["broken"]
-                    break
+        if skins is not None:
+            pigeonhole_available = self.inventory.is_working("skin.arctic.zephyr.pigeonhole")
 
         return {
             "current_skin": current_skin,
             "pigeonhole_available": pigeonhole_available,
-            "total_skins": len(skins["addons"]) if skins and "addons" in skins else 0
+            "total_skins": len(skins or [])
         }
 
     def _check_streaming_status(self):
@@ -320,6 +307,7 @@ class KodiExpert:
                     self.adb_cmd('shell "mkdir -p /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons"')
                     self.adb_cmd('shell "cd /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons && unzip -o /sdcard/temp_repo.zip"')
                     self.adb_cmd('shell "chmod -R 755 /sdcard/Android/data/org.xbmc.kodi/files/.kodi/addons"')
+                    self.inventory.invalidate()
 
                     return f"Installed addons from {repo_file}"
 
@@ -334,6 +322,7 @@ class KodiExpert:
             "addonid": "skin.arctic.zephyr.pigeonhole",
             "enabled": True
         })
+        self.inventory.invalidate("skin.arctic.zephyr.pigeonhole")
 
         if result == "OK":
             # Try to set as active skin
@@ -2,12 +2,17 @@
 """
 Fire TV Cube Gold Build Optimizer - Complete Kodi v22 Setup
 """
-import requests
 import json
-import base64
-import subprocess
 import time
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
+from pigeonhole_advancedsettings import deploy_advancedsettings
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
+from pigeonhole_settings_profile import apply_profile, get_profile
 
 class KodiGoldOptimizer:
     def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
@@ -16,14 +21,9 @@ class KodiGoldOptimizer:
         self.username = "kodi"
         self.password = "0000"
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
+        self.adb = ADBClient("M:\\adb\\adb.exe", serial=f"{fire_tv_ip}:5555", retries=1)
 
-        # Auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Essential addons to keep
         self.essential_addons = [
@@ -71,26 +71,15 @@ class KodiGoldOptimizer:
 
     def kodi_api(self, method, params=None):
         try:
-            payload = {"jsonrpc": "2.0", "method": method, "id": 1}
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            return None
-        except Exception as e:
+            envelope = self.rpc.request(method, params)
+            return envelope.get("result", envelope)
+        except KodiRPCError as e:
             self.log(f"API error: {e}", "ERROR")
             return None
 
-    def adb_cmd(self, command):
-        try:
-            full_cmd = f'"M:\\adb\\adb.exe" -s {self.fire_tv_ip}:5555 {command}'
-            result = subprocess.run(full_cmd, shell=True, capture_output=True, text=True, timeout=30)
-            return result.returncode == 0, result.stdout.strip() if result.stdout else result.stderr.strip()
-        except Exception as e:
-            return False, str(e)
+    def adb_cmd(self, args):
+        result = self.adb.run(args)
+        return result.ok, result.output if result.stdout else result.stderr.strip()
 
     def cleanup_addons(self):
         self.log("Cleaning up unnecessary addons...")
@@ -121,59 +110,15 @@ class KodiGoldOptimizer:
     def optimize_settings(self):
         self.log("Applying advanced settings...")
 
-        # Set Pigeonhole skin
-        self.kodi_api("Settings.SetSettingValue", {
-            "setting": "lookandfeel.skin",
-            "value": "skin.arctic.zephyr.pigeonhole"
-        })
-
-        # Enable web server
-        self.kodi_api("Settings.SetSettingValue", {
-            "setting": "services.webserver",
-            "value": True
-        })
-
-        # Set web server port
-        self.kodi_api("Settings.SetSettingValue", {
-            "setting": "services.webserverport",
-            "value": 8080
-        })
-
-        # Enable remote control
-        self.kodi_api("Settings.SetSettingValue", {
-            "setting": "services.webserverauthentication",
-            "value": True
-        })
-
-        # Advanced cache settings via file
-        advanced_xml = '''<advancedsettings>
-    <network>
-        <buffermode>1</buffermode>
-        <cachemembuffersize>209715200</cachemembuffersize>
-        <readbufferfactor>4.0</readbufferfactor>
-    </network>
-    <video>
-        <rendermethod>0</rendermethod>
-        <adjustrefreshrate>2</adjustrefreshrate>
-    </video>
-    <cache>
-        <memorysize>209715200</memorysize>
-        <buffermode>1</buffermode>
-    </cache>
-</advancedsettings>'''
-
-        temp_file = "M:\\temp_advanced.xml"
-        with open(temp_file, "w") as f:
-            f.write(advanced_xml)
-
-        # Push to device
-        success, _ = self.adb_cmd(f'push "{temp_file}" "/storage/emulated/0/Android/data/org.xbmc.kodi/files/.kodi/userdata/advancedsettings.xml"')
-
-        import os
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        # Skin and web server settings, written only where they differ
+        try:
+            result = apply_profile(self.rpc, get_profile("gold_services"))
+            self.log(f"Kodi settings: {len(result.changed)} changed, {len(result.unchanged)} already set")
+        except KodiRPCError as e:
+            self.log(f"API error: {e}", "ERROR")
 
-        if success:
+        # Advanced cache settings via file, sized for this unit's memory
+        if deploy_advancedsettings(self.adb).ok:
             self.log("Advanced settings applied")
 
         return True
@@ -182,13 +127,13 @@ class KodiGoldOptimizer:
         self.log("Setting up launcher...")
 
         # Try alternative launcher method
-        success, output = self.adb_cmd('shell am force-stop com.amazon.tv.launcher')
+        success, output = self.adb_cmd(["shell", "am", "force-stop", "com.amazon.tv.launcher"])
 
         # Set Kodi as home activity using alternative method
-        success, output = self.adb_cmd('shell cmd package set-home-activity com.amazon.tv.launcher/com.amazon.tv.launcher.ui.HomeActivity_vNext')
+        success, output = self.adb_cmd(["shell", "cmd", "package", "set-home-activity", "com.amazon.tv.launcher/com.amazon.tv.launcher.ui.HomeActivity_vNext"])
 
         # Alternative: Try to make Kodi default via settings
-        success, output = self.adb_cmd('shell am start -a android.intent.action.MAIN -c android.intent.category.HOME')
+        success, output = self.adb_cmd(["shell", "am", "start", "-a", "android.intent.action.MAIN", "-c", "android.intent.category.HOME"])
 
         if success:
             self.log("Launcher configuration applied")
@@ -4,11 +4,16 @@ Pigeonhole Streaming - Kodi HTTP Remote Controller
 Real-time testing and optimization via HTTP API
 """
 
-import requests
 import json
 import time
 from datetime import datetime
-import base64
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_events import ADDON_EVENTS, PLAYER_STARTED, KodiEventListener
+from pigeonhole_addon_inventory import get_inventory
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
 
 class KodiHTTPController:
     def __init__(self):
@@ -18,13 +23,9 @@ class KodiHTTPController:
         self.password = "0000"
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
         
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.events = KodiEventListener(self.fire_tv_ip).start()
+        self.inventory = get_inventory(self.rpc, self.events)
         
         self.test_results = {
             "timestamp": datetime.now().isoformat(),
@@ -36,33 +37,19 @@ class KodiHTTPController:
             "recommendations": []
         }
 
+    def close(self):
+        """Stop the notification listener"""
+        self.events.stop()
+
     def send_rpc_request(self, method, params=None, timeout=10):
         """Send JSON-RPC request to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-            
         try:
-            response = requests.post(
-                self.base_url, 
-                json=payload, 
-                headers=self.headers,
-                timeout=timeout
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
+            return self.rpc.request(method, params, timeout=timeout)
+        except KodiHTTPError as e:
+            print(f"HTTP Error {e.status}: {e.body}")
+        except KodiRPCError as e:
             print(f"Connection error: {e}")
-            return None
+        return None
 
     def test_connection(self):
         """Test HTTP API connection"""
@@ -120,15 +107,12 @@ class KodiHTTPController:
         print("Validating installed addons...")
         
         # Get all installed addons
-        addons_response = self.send_rpc_request("Addons.GetAddons", {
-            "properties": ["name", "version", "summary", "enabled", "broken"]
-        })
-        
-        if not addons_response or "result" not in addons_response:
-            print("✗ Failed to get addon list")
+        try:
+            addons = self.inventory.addons()
+        except KodiRPCError as e:
+            print(f"✗ Failed to get addon list: {e}")
             return False
         
-        addons = addons_response["result"].get("addons", [])
         print(f"Found {len(addons)} installed addons")
         
         # Validate our core Pigeonhole addons
@@ -141,27 +125,13 @@ class KodiHTTPController:
             "script.pigeonhole.config"
         ]
         
-        addon_status = {}
-        for addon in addons:
-            addon_id = addon["addonid"]
-            addon_status[addon_id] = {
-                "name": addon.get("name", "Unknown"),
-                "version": addon.get("version", "Unknown"),
-                "enabled": addon.get("enabled", False),
-                "broken": addon.get("broken", False),
-                "is_core": addon_id in core_addons
-            }
-            
-            # Print status for core addons
-            if addon_id in core_addons:
-                status = "✓" if addon["enabled"] and not addon["broken"] else "✗"
-                print(f"  {status} {addon['name']} v{addon['version']}")
-        
         # Check if all core addons are present and working
         core_addon_status = []
         for core_addon in core_addons:
-            if core_addon in addon_status:
-                addon_info = addon_status[core_addon]
+            addon_info = self.inventory.get(core_addon)
+            if addon_info:
+                status = "✓" if addon_info["enabled"] and not addon_info["broken"] else "✗"
+                print(f"  {status} {addon_info['name']} v{addon_info['version']}")
                 core_addon_status.append({
                     "addon_id": core_addon,
                     "present": True,
@@ -257,6 +227,7 @@ class KodiHTTPController:
             "error": None
         }
         
+        launched = self.events.expect(PLAYER_STARTED + ADDON_EVENTS)
         try:
             start_time = time.time()
             
@@ -280,12 +251,14 @@ class KodiHTTPController:
                 print(f"    ✗ {addon_name} no response or error")
                 test_result["error"] = "No response from addon"
                 
-            # Wait briefly before next test
-            time.sleep(2)
+            # Wait until Kodi reports the addon reacting (at most 2s) before next test
+            launched.wait(timeout=2)
             
         except Exception as e:
             test_result["error"] = str(e)
             print(f"    ✗ {addon_name} exception: {e}")
+        finally:
+            launched.cancel()
         
         return test_result
 
@@ -349,14 +322,16 @@ class KodiHTTPController:
             }
         ]
         
+        try:
+            results = self.rpc.set_settings({s["setting"]: s["value"] for s in settings_to_optimize})
+        except KodiRPCError as e:
+            print(f"Connection error: {e}")
+            return False
+
         optimized_count = 0
         for setting_config in settings_to_optimize:
-            response = self.send_rpc_request("Settings.SetSettingValue", {
-                "setting": setting_config["setting"],
-                "value": setting_config["value"]
-            })
-            
-            if response and "result" in response and response["result"] is True:
+            result = results[setting_config["setting"]]
+            if result.ok and result.result is True:
                 print(f"  ✓ {setting_config['description']}: Optimized")
                 optimized_count += 1
             else:
@@ -546,7 +521,12 @@ def main():
     """Main execution function"""
     controller = KodiHTTPController()
     
-    if controller.run_comprehensive_assessment():
+    try:
+        success = controller.run_comprehensive_assessment()
+    finally:
+        controller.close()
+
+    if success:
         print("\nComprehensive assessment completed successfully!")
         print("Review the generated report for detailed analysis and recommendations.")
     else:
@@ -4,8 +4,12 @@ FireCube Network Blocker
 Blocks Amazon domains at the network level
 """
 
-import subprocess
+import sys
 import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
 
 # Device IP
 DEVICE_IP = "192.168.1.107"
@@ -80,19 +84,18 @@ AMAZON_DOMAINS = [
     "amazonwebservicesinc.tt.omtrdc.net"
 ]
 
-def run_adb_command(command):
-    """Run an ADB command and return the output"""
-    try:
-        full_command = f"M:\\platform-tools\\adb.exe -s {DEVICE_IP} {command}"
-        result = subprocess.run(full_command, shell=True, capture_output=True, text=True, timeout=30)
-        return result.returncode, result.stdout, result.stderr
-    except Exception as e:
-        return -1, "", str(e)
+adb = ADBClient("M:\\platform-tools\\adb.exe", serial=f"{DEVICE_IP}:5555", retries=1)
+
+def run_adb_command(args):
+    """Run an adb argument vector and return the output"""
+    result = adb.run(args)
+    return result.returncode, result.stdout, result.stderr
 
 def connect_device():
     """Connect to the FireCube device"""
     print("Connecting to FireCube device...")
-    code, stdout, stderr = run_adb_command("connect")
+    result = adb.connect(f"{DEVICE_IP}:5555")
+    code, stderr = result.returncode, result.stderr
     if code == 0:
         print("✓ Connected successfully")
         return True
@@ -102,7 +105,7 @@ def connect_device():
 
 def check_root_access():
     """Check if we have root access"""
-    code, stdout, stderr = run_adb_command("shell whoami")
+    code, stdout, stderr = run_adb_command(["shell", "whoami"])
     if code == 0 and "root" in stdout:
         print("✓ Root access confirmed")
         return True
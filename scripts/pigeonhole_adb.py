@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole ADB Execution Library
+Argument-vector ADB command execution with typed results, timeouts and retries
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+# adb stderr fragments that indicate a transient transport problem worth retrying
+TRANSIENT_ERRORS = (
+    "device offline",
+    "no devices/emulators found",
+    "error: closed",
+    "protocol fault",
+    "connection reset",
+    "cannot connect",
+)
+
+class ADBConnectionError(Exception):
+    """ADB connection related errors"""
+    pass
+
+@dataclass(frozen=True)
+class ADBResult:
+    """Outcome of a single adb invocation"""
+    args: Tuple[str, ...]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+    attempts: int = 1
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def output(self) -> str:
+        """Stripped stdout"""
+        return self.stdout.strip()
+
+    @property
+    def transient(self) -> bool:
+        """
+        Whether the failure looks like a transport hiccup rather than a command
+        error. Timeouts are not: the command may still be running on the device.
+        """
+        text = f"{self.stdout}\n{self.stderr}".lower()
+        return any(marker in text for marker in TRANSIENT_ERRORS)
+
+    def check(self) -> "ADBResult":
+        """Raise ADBConnectionError unless the command succeeded"""
+        if not self.ok:
+            reason = "timeout" if self.timed_out else (self.stderr.strip() or self.stdout.strip())
+            raise ADBConnectionError(f"{' '.join(self.args)} failed: {reason}")
+        return self
+
+def find_adb(preferred: Optional[str] = None) -> str:
+    """Resolve the adb executable: explicit path, $PIGEONHOLE_ADB, bundled copies, then PATH"""
+    candidates = [
+        preferred,
+        os.getenv('PIGEONHOLE_ADB'),
+        "M:\\platform-tools\\adb.exe",
+        "./platform-tools/adb.exe",
+        "./adb/adb.exe",
+    ]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return candidate
+    return preferred or shutil.which("adb") or "adb"
+
+class ADBClient:
+    """
+    Runs adb with an argument vector (never through a local shell).
+
+    A client may be bound to a device ``serial`` (``ip:port``), in which case
+    every command is prefixed with ``-s serial``. Commands that time out or
+    fail with a transient transport error are retried ``retries`` times.
+    """
+
+    def __init__(self, adb_path: Optional[str] = None, serial: Optional[str] = None,
+                 timeout: float = 30, retries: int = 0, retry_delay: float = 1.0):
+        self.adb_path = find_adb(adb_path)
+        self.serial = serial
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.logger = logging.getLogger('pigeonhole.adb')
+
+    def for_device(self, serial: str) -> "ADBClient":
+        """Client with the same settings bound to another device"""
+        return ADBClient(self.adb_path, serial, self.timeout, self.retries, self.retry_delay)
+
+    def _argv(self, args: Sequence[str], serial: Optional[str]) -> Tuple[str, ...]:
+        prefix = (self.adb_path, "-s", serial) if serial else (self.adb_path,)
+        return prefix + tuple(str(arg) for arg in args)
+
+    def _run_once(self, argv: Tuple[str, ...], timeout: float) -> ADBResult:
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                argv,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                encoding='utf-8',
+                errors='replace'
+            )
+            return ADBResult(argv, completed.returncode, completed.stdout, completed.stderr,
+                             time.perf_counter() - start)
+        except subprocess.TimeoutExpired as e:
+            stdout = e.stdout.decode(errors='replace') if isinstance(e.stdout, bytes) else (e.stdout or "")
+            return ADBResult(argv, -1, stdout, f"timeout after {timeout}s",
+                             time.perf_counter() - start, timed_out=True)
+        except OSError as e:
+            return ADBResult(argv, -1, "", str(e), time.perf_counter() - start)
+
+    def run(self, args: Sequence[str], timeout: Optional[float] = None,
+            retries: Optional[int] = None, serial: Optional[str] = None,
+            retry_on_timeout: bool = False) -> ADBResult:
+        """
+        Run ``adb [-s serial] *args``, retrying transient transport failures.
+
+        A timed-out command is retried only with ``retry_on_timeout``, for short
+        idempotent calls; re-running a push, install or uninstall that may still
+        be in progress on the device would repeat it and double the wait.
+        """
+        # serial=None means the bound device; an empty serial runs without -s
+        argv = self._argv(args, self.serial if serial is None else serial)
+        cmd_timeout = timeout or self.timeout
+        attempts = 1 + (self.retries if retries is None else retries)
+
+        for attempt in range(1, attempts + 1):
+            result = self._run_once(argv, cmd_timeout)
+            retryable = result.transient or (result.timed_out and retry_on_timeout)
+            if result.ok or not retryable or attempt == attempts:
+                break
+            self.logger.debug("Retrying %s (attempt %d): %s", argv[1:], attempt + 1, result.stderr.strip())
+            time.sleep(self.retry_delay * attempt)
+
+        if attempt > 1:
+            result = ADBResult(result.args, result.returncode, result.stdout, result.stderr,
+                               result.duration, result.timed_out, attempt)
+        return result
+
+    def shell(self, command: Union[str, Sequence[str]], **kwargs) -> ADBResult:
+        """
+        Run a command in the device shell.
+
+        A sequence is quoted argument by argument; a string is passed through
+        unchanged and interpreted by the device's /system/bin/sh, so pipes and
+        redirections there run on the device, not on the controller.
+        """
+        if not isinstance(command, str):
+            command = shlex.join(str(arg) for arg in command)
+        return self.run(["shell", command], **kwargs)
+
+    def connect(self, address: str, **kwargs) -> ADBResult:
+        kwargs.setdefault("retry_on_timeout", True)
+        result = self.run(["connect", address], serial="", **kwargs)
+        # adb connect exits 0 even when it fails to connect
+        if result.returncode == 0 and "connected" not in result.stdout.lower():
+            return ADBResult(result.args, 1, result.stdout, result.stderr or result.stdout,
+                             result.duration, attempts=result.attempts)
+        return result
+
+    def disconnect(self, address: str, **kwargs) -> ADBResult:
+        kwargs.setdefault("retry_on_timeout", True)
+        return self.run(["disconnect", address], serial="", **kwargs)
+
+    def push(self, local_path: str, remote_path: str, **kwargs) -> ADBResult:
+        return self.run(["push", local_path, remote_path], **kwargs)
+
+    def pull(self, remote_path: str, local_path: str, **kwargs) -> ADBResult:
+        return self.run(["pull", remote_path, local_path], **kwargs)
+
+    def install(self, apk_path: str, replace: bool = True, **kwargs) -> ADBResult:
+        args = ["install", "-r", apk_path] if replace else ["install", apk_path]
+        return self.run(args, **kwargs)
+
+    def getprop(self, name: str, **kwargs) -> Optional[str]:
+        kwargs.setdefault("retry_on_timeout", True)
+        result = self.shell(["getprop", name], **kwargs)
+        if result.ok and result.output:
+            return result.output
+        return None
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Kodi Addon Inventory
+Per-device cache of Addons.GetAddons with O(1) lookup, refreshed by addon notifications or TTL
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pigeonhole_kodi_events import ADDON_EVENTS, KodiEvent, KodiEventListener
+from pigeonhole_kodi_rpc import KodiAPIError, KodiRPCClient, KodiRPCError
+
+# Everything any caller reads, so one Addons.GetAddons answers them all
+ADDON_PROPERTIES = ["name", "version", "summary", "enabled", "broken", "type", "dependencies"]
+DEFAULT_TTL = 300.0
+
+logger = logging.getLogger('pigeonhole.addon_inventory')
+
+class AddonInventory:
+    """
+    Installed addons of one Kodi device, keyed by addonid.
+
+    The full list is fetched with a single ``Addons.GetAddons`` call and kept
+    until ``ttl`` seconds pass. With an event listener attached, an addon
+    notification that names its addon refetches just that addon (or drops it
+    once Kodi no longer knows it); any other addon notification marks the
+    whole inventory stale for the next lookup.
+    """
+
+    def __init__(self, rpc: KodiRPCClient, events: Optional[KodiEventListener] = None,
+                 ttl: float = DEFAULT_TTL):
+        self.rpc = rpc
+        self.ttl = ttl
+        self._addons: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self.events: Optional[KodiEventListener] = None
+        if events is not None:
+            self.attach(events)
+
+    def attach(self, events: KodiEventListener) -> None:
+        """Keep the inventory current from ``events`` instead of relying on the TTL alone"""
+        if self.events is None:
+            self.events = events
+            events.subscribe(ADDON_EVENTS, self._on_addon_event)
+
+    def invalidate(self, addon_id: Optional[str] = None) -> None:
+        """Refetch ``addon_id`` (or everything) on the next lookup, e.g. after changing it"""
+        with self._lock:
+            if addon_id:
+                self._dirty.add(addon_id)
+            else:
+                self._fetched_at = None
+
+    def _on_addon_event(self, event: KodiEvent) -> None:
+        data = event.data
+        addon_id = (data.get("id") or data.get("addonid")) if isinstance(data, dict) else None
+        self.invalidate(addon_id)
+        logger.debug("%s: %s invalidated inventory entry %s", self.rpc.host, event.method,
+                     addon_id or "(all)")
+
+    @property
+    def stale(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl
+
+    def refresh(self) -> None:
+        """Fetch the full addon list now; raises KodiRPCError when Kodi is unreachable"""
+        result = self.rpc.call("Addons.GetAddons", {"properties": ADDON_PROPERTIES}) or {}
+        addons = {addon["addonid"]: addon for addon in result.get("addons", [])}
+        with self._lock:
+            self._addons = addons
+            self._fetched_at = time.monotonic()
+            self._dirty.clear()
+        logger.debug("%s: fetched %d addons", self.rpc.host, len(addons))
+
+    def _refresh_dirty(self) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for addon_id in dirty:
+            try:
+                details = self.rpc.call("Addons.GetAddonDetails",
+                                        {"addonid": addon_id, "properties": ADDON_PROPERTIES})
+                addon = (details or {}).get("addon")
+            except KodiAPIError:
+                addon = None  # uninstalled
+            except KodiRPCError:
+                with self._lock:
+                    self._dirty |= dirty
+                raise
+            with self._lock:
+                if addon:
+                    self._addons[addon_id] = addon
+                else:
+                    self._addons.pop(addon_id, None)
+
+    def _ensure_fresh(self) -> None:
+        if self.stale:
+            self.refresh()
+        elif self._dirty:
+            self._refresh_dirty()
+
+    def get(self, addon_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_fresh()
+        return self._addons.get(addon_id)
+
+    def __contains__(self, addon_id: str) -> bool:
+        return self.get(addon_id) is not None
+
+    def addons(self, addon_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All installed addons, optionally only those of one type (e.g. ``xbmc.gui.skin``)"""
+        self._ensure_fresh()
+        addons = list(self._addons.values())
+        if addon_type:
+            addons = [addon for addon in addons if addon.get("type") == addon_type]
+        return addons
+
+    def is_working(self, addon_id: str) -> bool:
+        addon = self.get(addon_id)
+        return bool(addon and addon.get("enabled") and not addon.get("broken"))
+
+_inventories: Dict[Tuple[str, int], AddonInventory] = {}
+_inventories_lock = threading.Lock()
+
+def get_inventory(rpc: KodiRPCClient, events: Optional[KodiEventListener] = None,
+                  ttl: float = DEFAULT_TTL) -> AddonInventory:
+    """The shared inventory for ``rpc``'s device, created on first use"""
+    key = (rpc.host, rpc.port)
+    with _inventories_lock:
+        inventory = _inventories.get(key)
+        if inventory is None:
+            inventory = _inventories[key] = AddonInventory(rpc, events, ttl)
+        elif events is not None:
+            inventory.attach(events)
+        return inventory
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole advancedsettings.xml Generator
+Renders Kodi advancedsettings.xml from a DeviceProfile, sizing the video cache to the device's memory
+
+Usage: python scripts/pigeonhole_advancedsettings.py --profile corporate --model AFTGAZL [--mem-total-kb 1937000] [-o advancedsettings.xml]
+       python scripts/pigeonhole_advancedsettings.py --profile corporate --device 192.168.1.130:5555 --push
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from pigeonhole_adb import ADBClient, ADBResult
+from pigeonhole_config import ConfigManager, DeviceClass, get_config
+from pigeonhole_fleet_config import FLEET_CONFIG
+
+KODI_USERDATA = "/storage/emulated/0/Android/data/org.xbmc.kodi/files/.kodi/userdata/"
+# Matches the 200MB cache / 4.0 read factor the gold build scripts shipped with
+DEFAULT_DEVICE_PROFILE = "corporate"
+
+MIB = 1024 * 1024
+# Fire OS 7, the launcher and Kodi itself need this much before any video cache
+MEMORY_RESERVE = 1024 * MIB
+# Kodi allocates up to three times <memorysize> (forward buffer plus back buffer)
+KODI_CACHE_MULTIPLIER = 3
+# and that allocation is kept within this share of MemTotal
+MAX_CACHE_SHARE = 1 / 3
+MIN_CACHE = 20 * MIB
+MAX_CACHE = 512 * MIB
+MIN_READ_FACTOR = 1.5
+
+logger = logging.getLogger('pigeonhole.advancedsettings')
+
+@dataclass(frozen=True)
+class CacheTuning:
+    """Cache sizing chosen for one device"""
+    memory_size: int
+    read_factor: float
+    mem_total: Optional[int]  # bytes; None when neither measured nor known for the model
+
+def tune_cache(performance, mem_total: Optional[int]) -> CacheTuning:
+    """
+    Size Kodi's cache from the memory left after ``MEMORY_RESERVE``, with its
+    full allocation held to ``MAX_CACHE_SHARE`` of MemTotal.
+
+    ``performance`` (a PerformanceConfig) supplies the fallback cache size when
+    the device memory is unknown and the read factor for devices that can hold
+    the profile's cache. A device that can only hold a smaller cache gets a
+    proportionally lower read factor, so the buffer is not refilled faster than
+    the stick can decode from it.
+    """
+    if not mem_total:
+        return CacheTuning(performance.cache_size, performance.buffer_factor, None)
+
+    affordable = min(mem_total - MEMORY_RESERVE, int(mem_total * MAX_CACHE_SHARE)) // KODI_CACHE_MULTIPLIER
+    memory_size = max(MIN_CACHE, min(MAX_CACHE, affordable))
+    memory_size -= memory_size % MIB
+    read_factor = performance.buffer_factor
+    if memory_size < performance.cache_size:
+        read_factor = max(MIN_READ_FACTOR, read_factor * memory_size / performance.cache_size)
+    return CacheTuning(memory_size, round(read_factor, 1), mem_total)
+
+def _element(parent: ET.Element, tag: str, value: Any) -> None:
+    child = ET.SubElement(parent, tag)
+    child.text = str(value).lower() if isinstance(value, bool) else str(value)
+
+def render(profile, tuning: CacheTuning, model: str = "unknown") -> str:
+    """advancedsettings.xml text for ``profile`` (a DeviceProfile) with ``tuning`` applied"""
+    performance = profile.performance
+    root = ET.Element("advancedsettings", version="1.0")
+    mem_note = f"{tuning.mem_total // MIB} MiB" if tuning.mem_total else "unknown memory"
+    root.append(ET.Comment(f" Generated by pigeonhole_advancedsettings: profile {profile.name}, "
+                           f"model {model}, {mem_note} "))
+
+    # Kodi 17+ reads <cache>; the <network> cache tags are kept for Kodi 16 builds
+    cache = ET.SubElement(root, "cache")
+    _element(cache, "buffermode", 1)
+    _element(cache, "memorysize", tuning.memory_size)
+    _element(cache, "readfactor", tuning.read_factor)
+
+    network = ET.SubElement(root, "network")
+    _element(network, "buffermode", 1)
+    _element(network, "cachemembuffersize", tuning.memory_size)
+    _element(network, "readbufferfactor", tuning.read_factor)
+    _element(network, "curlclienttimeout", performance.network_timeout)
+    _element(network, "curllowspeedtime", 20)
+    _element(network, "curlretries", 2)
+
+    video = ET.SubElement(root, "video")
+    _element(video, "rendermethod", 0)
+    _element(video, "adjustrefreshrate", 2)
+
+    gui = ET.SubElement(root, "gui")
+    _element(gui, "algorithmdirtyregions", 3)
+    _element(gui, "nofliptimeout", 5)
+
+    ET.indent(root, space="    ")
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding="unicode") + "\n"
+
+def load_device_classes(path: Path = FLEET_CONFIG) -> Mapping[str, DeviceClass]:
+    """fleet-config.yaml ``devices`` keyed by model code (e.g. AFTGAZL)"""
+    return ConfigManager(str(path), defaults={}).schema.device_models
+
+def read_mem_total(adb: ADBClient) -> Optional[int]:
+    """MemTotal from the device's /proc/meminfo, in bytes"""
+    result = adb.shell(["cat", "/proc/meminfo"], timeout=10)
+    if not result.ok:
+        return None
+    for line in result.output.splitlines():
+        if line.startswith("MemTotal:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+class AdvancedSettingsGenerator:
+    """
+    Renders advancedsettings.xml per (profile, model) and keeps the result.
+
+    Units of one model differ in MemTotal only by kernel reservations, so the
+    first measured unit of a model decides the cache size for all of them and
+    later units skip both the measurement and the render.
+    """
+
+    def __init__(self, config=None, device_classes: Optional[Mapping[str, DeviceClass]] = None):
+        self.config = config
+        self._device_classes = device_classes
+        self._rendered: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def device_classes(self) -> Mapping[str, DeviceClass]:
+        if self._device_classes is None:
+            self._device_classes = load_device_classes()
+        return self._device_classes
+
+    def device_profile(self, name: str):
+        if self.config is None:
+            self.config = get_config()
+        profile = self.config.get_device_profile(name)
+        if profile is None:
+            raise KeyError(f"Unknown device profile '{name}'")
+        return profile
+
+    def nominal_memory(self, model: str) -> Optional[int]:
+        device = self.device_classes.get(model)
+        return int(device.memory_gb * 1024 * MIB) if device and device.memory_gb else None
+
+    def cached(self, profile_name: str, model: str) -> Optional[str]:
+        return self._rendered.get((profile_name, model))
+
+    def generate(self, profile_name: str, model: str = "unknown",
+                 mem_total: Optional[int] = None) -> str:
+        """Rendered XML for ``profile_name`` on ``model``; MemTotal falls back to fleet-config's memory_gb"""
+        key = (profile_name, model)
+        with self._lock:
+            if key not in self._rendered:
+                profile = self.device_profile(profile_name)
+                tuning = tune_cache(profile.performance, mem_total or self.nominal_memory(model))
+                logger.info("advancedsettings for %s on %s: cache %d MiB, read factor %.1f",
+                            profile_name, model, tuning.memory_size // MIB, tuning.read_factor)
+                self._rendered[key] = render(profile, tuning, model)
+            return self._rendered[key]
+
+    def generate_for_device(self, adb: ADBClient, profile_name: str = DEFAULT_DEVICE_PROFILE) -> str:
+        """Render for the device behind ``adb``, measuring MemTotal only for models not seen yet"""
+        model = adb.getprop("ro.product.model") or "unknown"
+        xml = self.cached(profile_name, model)
+        if xml is None:
+            xml = self.generate(profile_name, model, read_mem_total(adb))
+        return xml
+
+_generator: Optional[AdvancedSettingsGenerator] = None
+
+def get_generator() -> AdvancedSettingsGenerator:
+    global _generator
+    if _generator is None:
+        _generator = AdvancedSettingsGenerator()
+    return _generator
+
+def push_advancedsettings(adb: ADBClient, xml: str) -> ADBResult:
+    """Write ``xml`` to Kodi's userdata/advancedsettings.xml on the device"""
+    fd, temp_path = tempfile.mkstemp(suffix=".xml", prefix="advancedsettings_")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(xml)
+        return adb.push(temp_path, f"{KODI_USERDATA}advancedsettings.xml")
+    finally:
+        os.remove(temp_path)
+
+def deploy_advancedsettings(adb: ADBClient, profile_name: str = DEFAULT_DEVICE_PROFILE) -> ADBResult:
+    """Generate advancedsettings.xml for the device behind ``adb`` and push it"""
+    return push_advancedsettings(adb, get_generator().generate_for_device(adb, profile_name))
+
+def main():
+    parser = argparse.ArgumentParser(description="Render Kodi advancedsettings.xml for a device profile")
+    parser.add_argument("--profile", default=DEFAULT_DEVICE_PROFILE, help="DeviceProfile name")
+    parser.add_argument("--model", default="unknown", help="Model code from fleet-config.yaml devices")
+    parser.add_argument("--mem-total-kb", type=int, help="MemTotal from /proc/meminfo")
+    parser.add_argument("--device", help="Measure model and MemTotal from this ADB device (ip:port)")
+    parser.add_argument("--adb", default="adb", help="Path to adb")
+    parser.add_argument("--push", action="store_true", help="Push the result to --device")
+    parser.add_argument("-o", "--output", help="Write to this file instead of stdout")
+    args = parser.parse_args()
+
+    generator = get_generator()
+    if args.device:
+        adb = ADBClient(args.adb, serial=args.device)
+        xml = generator.generate_for_device(adb, args.profile)
+    else:
+        if args.push:
+            parser.error("--push needs --device")
+        mem_total = args.mem_total_kb * 1024 if args.mem_total_kb else None
+        xml = generator.generate(args.profile, args.model, mem_total)
+
+    if args.push:
+        result = push_advancedsettings(adb, xml)
+        print("Pushed advancedsettings.xml" if result.ok else f"Push failed: {result.stderr.strip()}")
+    elif args.output:
+        Path(args.output).write_text(xml, encoding="utf-8")
+    else:
+        print(xml, end="")
+
+if __name__ == "__main__":
+    main()
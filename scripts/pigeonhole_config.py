@@ -5,52 +5,272 @@ Centralized configuration handling with validation and environment support
 """
 
 import os
-import yaml
+import sys
 import json
-from pathlib import Path
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+import hashlib
+import itertools
+import marshal
+import tempfile
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Any, NamedTuple, Optional, List, Tuple
 import logging
 
-@dataclass
-class BrandingConfig:
-    """Branding configuration settings"""
-    name: str = "PIGEONHOLE MEDIA CENTER"
-    tagline: str = "Professional Streaming Solutions"
-    primary_color: str = "#FF6B35"
-    secondary_color: str = "#1E3A8A"
-    accent_color: str = "#10B981"
-    text_primary: str = "#FFFFFF"
-    text_secondary: str = "#B0B0B0"
-    background: str = "#1A1A1A"
-
-@dataclass
-class PerformanceConfig:
-    """Performance optimization settings"""
-    buffer_factor: float = 4.0
-    cache_size: int = 209715200  # 200MB default
-    concurrent_streams: int = 3
-    enable_hardware_acceleration: bool = True
-    network_timeout: int = 30
-
-@dataclass
-class DeviceProfile:
-    """Device-specific configuration profile"""
-    name: str
-    privacy_level: str = "medium"
-    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
-    enabled_services: List[str] = field(default_factory=list)
-    disabled_services: List[str] = field(default_factory=list)
-    restrictions: Dict[str, bool] = field(default_factory=dict)
+from pigeonhole_config_schema import (
+    BrandingConfig, ConfigSchema, DeploymentConfig, DeviceClass, DeviceProfile, PerformanceConfig,
+    compile_config,
+)
+
+# The schema dataclasses are re-exported: BrandingConfig, PerformanceConfig and DeviceProfile were
+# defined here before pigeonhole_config_schema existed
+__all__ = [
+    'BrandingConfig', 'ConfigChanges', 'ConfigManager', 'ConfigSchema', 'ConfigSnapshotCache',
+    'ConfigWatcher', 'DeploymentConfig', 'DeviceClass', 'DeviceProfile', 'MISSING', 'PerformanceConfig',
+    'compile_key_path', 'deep_merge', 'diff_config', 'get_config',
+]
+
+# Marks a key absent from the config: cached misses, and added or removed keys in ConfigChanges
+MISSING = object()
+
+# {dotted key: (old value, new value)}
+ConfigChanges = Dict[str, Tuple[Any, Any]]
+
+@lru_cache(maxsize=1024)
+def compile_key_path(key: str) -> Tuple[str, ...]:
+    """Split a dotted key once; later lookups of the same key reuse the tuple"""
+    return tuple(key.split('.'))
+
+def deep_merge(base: Dict, override: Dict) -> Dict:
+    """``base`` with ``override`` merged in, recursing into dicts present in both; neither is modified"""
+    result = base.copy()
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = deep_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any], prefix: str = "") -> ConfigChanges:
+    """Leaf-level differences between two config trees, keyed by dotted path"""
+    changes: ConfigChanges = {}
+    for key in old.keys() | new.keys():
+        path = f"{prefix}{key}"
+        before, after = old.get(key, MISSING), new.get(key, MISSING)
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.update(diff_config(before, after, f"{path}."))
+        elif before != after:
+            changes[path] = (before, after)
+    return changes
+
+class ConfigSnapshotCache:
+    """
+    Merged configs stored with marshal so later processes skip YAML parsing and merging.
+
+    A snapshot is keyed by its source file (path, mtime, size and SHA-256),
+    a hash of the defaults it was merged with, and the interpreter's marshal
+    format. When mtime or size differ but the content hash matches, for example
+    after a checkout that only touched the file, the snapshot is still used.
+    Set ``PIGEONHOLE_CONFIG_SNAPSHOT=0`` to disable.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = (directory or os.getenv('PIGEONHOLE_CACHE_DIR')
+                          or os.path.join(os.path.expanduser("~"), ".cache", "pigeonhole"))
+        self.logger = logging.getLogger('pigeonhole.config')
+
+    def path_for(self, source: str) -> str:
+        name = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"config-{name}.marshal")
+
+    @staticmethod
+    def defaults_key(defaults: Dict[str, Any]) -> str:
+        return hashlib.sha1(marshal.dumps(defaults)).hexdigest()
+
+    def _header(self, source: str, stat: os.stat_result, defaults_key: str) -> Dict[str, Any]:
+        return {"format": self.FORMAT, "python": sys.version_info[:2], "source": os.path.abspath(source),
+                "defaults": defaults_key, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def read(self, source: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path_for(source), 'rb') as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get("format") == self.FORMAT else None
+
+    def matches(self, entry: Optional[Dict[str, Any]], source: str, stat: os.stat_result,
+                defaults_key: str, digest: Optional[str] = None) -> bool:
+        """Whether ``entry`` is valid for the file; by stat alone, or by content when ``digest`` is given"""
+        if not entry:
+            return False
+        header = self._header(source, stat, defaults_key)
+        if any(entry.get(key) != header[key] for key in ("python", "source", "defaults")):
+            return False
+        if digest is not None:
+            return entry.get("sha256") == digest
+        return entry.get("mtime_ns") == header["mtime_ns"] and entry.get("size") == header["size"]
+
+    def write(self, source: str, stat: os.stat_result, defaults_key: str, digest: str,
+              config: Dict[str, Any]) -> bool:
+        entry = {**self._header(source, stat, defaults_key), "sha256": digest, "config": config}
+        try:
+            data = marshal.dumps(entry)
+        except ValueError as e:
+            # YAML timestamps and similar types cannot be marshalled; keep parsing for this file
+            self.logger.debug(f"Config snapshot skipped for {source}: {e}")
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path_for(source))
+            return True
+        except OSError as e:
+            self.logger.debug(f"Could not write config snapshot for {source}: {e}")
+            return False
+
+# ConfigWatcher's "nothing pending"; distinct from the None signature of a missing file
+_NO_CHANGE = object()
+
+def _under(key: str, prefix: str) -> bool:
+    return not prefix or key == prefix or key.startswith(f"{prefix}.")
+
+class ConfigWatcher:
+    """
+    Polls a config file's stat signature and calls ``on_change`` when it changes.
+
+    Polling ``os.stat`` works the same on the Windows build machine and the Linux
+    fleet server; a change is acted on once the signature has been stable for one
+    interval, so an editor's partial write is not loaded.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[], None], interval: float = 2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        loaded = self._signature()
+        pending = _NO_CHANGE
+        while not self._stopping.wait(self.interval):
+            current = self._signature()
+            if current == loaded:
+                pending = _NO_CHANGE
+            elif current != pending:
+                pending = current  # changed; wait one more interval for the write to settle
+            else:
+                loaded, pending = current, _NO_CHANGE
+                try:
+                    self.on_change()
+                except Exception as e:
+                    logging.getLogger('pigeonhole').error(f"Config reload failed: {e}")
+
+class _Snapshot(NamedTuple):
+    """A config tree and everything derived from it, replaced together"""
+    config: Dict[str, Any]
+    values: Dict[str, Any]  # resolved dotted keys
+    schema: ConfigSchema
+    issues: List[str]
 
 class ConfigManager:
-    """Centralized configuration management"""
+    """
+    Centralized configuration management.
+
+    Nothing is done at construction: the config file is located, parsed and
+    logged about on the first read, so importing this module or creating the
+    manager costs nothing for tools that never read a setting. Dotted-key
+    reads through ``get_config`` are cached until the next ``set_config`` or
+    ``reload_config``.
+
+    The loaded config is an immutable snapshot: ``set_config`` and
+    ``reload_config`` build a new tree and swap it in whole, so a reader never
+    sees half of a reload. ``subscribe`` registers for changes under a key
+    prefix and ``watch`` reloads when the file changes on disk.
+
+    ``defaults`` replaces the built-in Pigeonhole defaults, for managers over
+    other files such as fleet-config.yaml.
+    """
+    
+    def __init__(self, config_path: Optional[str] = None, defaults: Optional[Dict[str, Any]] = None,
+                 snapshot_cache: Optional[ConfigSnapshotCache] = None):
+        self._config_path = config_path
+        self._defaults = defaults
+        if snapshot_cache is None and os.getenv('PIGEONHOLE_CONFIG_SNAPSHOT', '1') != '0':
+            snapshot_cache = ConfigSnapshotCache()
+        self.snapshot_cache = snapshot_cache
+        self._logger: Optional[logging.Logger] = None
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.RLock()
+        self._subscribers: Dict[int, Tuple[str, Callable[[ConfigChanges], None]]] = {}
+        self._tokens = itertools.count(1)
+        self._watcher: Optional[ConfigWatcher] = None
+    
+    @property
+    def config_path(self) -> str:
+        if self._config_path is None:
+            self._config_path = self._get_default_config_path()
+        return self._config_path
+    
+    @config_path.setter
+    def config_path(self, path: str) -> None:
+        self._config_path = path
     
-    def __init__(self, config_path: Optional[str] = None):
-        self.config_path = config_path or self._get_default_config_path()
-        self.logger = self._setup_logging()
-        self._config_cache = {}
-        self._load_config()
+    @property
+    def logger(self) -> logging.Logger:
+        if self._logger is None:
+            self._logger = self._setup_logging()
+        return self._logger
+    
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+    
+    def _current(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._load_config()
+                snapshot = self._snapshot
+        return snapshot
+    
+    @property
+    def _config_cache(self) -> Dict[str, Any]:
+        return self._current().config
+    
+    @property
+    def schema(self) -> ConfigSchema:
+        """The current config as frozen dataclasses; the same object until the config changes"""
+        return self._current().schema
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """The current config tree; treat it as read-only"""
+        return self._config_cache
     
     def _get_default_config_path(self) -> str:
         """Get default configuration file path"""
@@ -88,29 +308,68 @@ class ConfigManager:
     
     def _load_config(self) -> None:
         """Load configuration from file with defaults"""
+        self._snapshot = self._compile(self._read_config())
+    
+    def _compile(self, config: Dict[str, Any]) -> _Snapshot:
+        schema, issues = compile_config(config)
+        for issue in issues:
+            self.logger.warning(f"Config issue in {self.config_path}: {issue}")
+        return _Snapshot(config, {}, schema, issues)
+    
+    def _read_config(self, on_error: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Defaults merged with the config file; ``on_error`` (default: the defaults) if missing or unparseable"""
         default_config = self._get_default_config()
         
-        if os.path.exists(self.config_path):
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    if self.config_path.endswith('.json'):
-                        user_config = json.load(f)
-                    else:
-                        user_config = yaml.safe_load(f)
-                
-                # Deep merge user config with defaults
-                self._config_cache = self._deep_merge(default_config, user_config or {})
-                self.logger.info(f"Configuration loaded from {self.config_path}")
-                
-            except Exception as e:
-                self.logger.error(f"Error loading config: {e}")
-                self._config_cache = default_config
-        else:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            if on_error is not None:
+                self.logger.warning(f"Config file not found: {self.config_path}, keeping the current config")
+                return on_error
             self.logger.warning(f"Config file not found: {self.config_path}, using defaults")
-            self._config_cache = default_config
+            return default_config
+        
+        cache = self.snapshot_cache
+        if cache:
+            defaults_key = cache.defaults_key(default_config)
+            entry = cache.read(self.config_path)
+            if cache.matches(entry, self.config_path, stat, defaults_key):
+                self.logger.info(f"Configuration loaded from {self.config_path} (snapshot)")
+                return entry["config"]
+        
+        try:
+            with open(self.config_path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if cache and cache.matches(entry, self.config_path, stat, defaults_key, digest):
+                # Same content under a new mtime: re-key the snapshot instead of parsing
+                cache.write(self.config_path, stat, defaults_key, digest, entry["config"])
+                self.logger.info(f"Configuration loaded from {self.config_path} (snapshot)")
+                return entry["config"]
+            
+            text = raw.decode('utf-8')
+            if self.config_path.endswith('.json'):
+                user_config = json.loads(text)
+            else:
+                import yaml
+                user_config = yaml.safe_load(text)
+            
+            # Deep merge user config with defaults
+            config = deep_merge(default_config, user_config or {})
+            self.logger.info(f"Configuration loaded from {self.config_path}")
+            
+        except Exception as e:
+            self.logger.error(f"Error loading config: {e}")
+            return default_config if on_error is None else on_error
+        
+        if cache:
+            cache.write(self.config_path, stat, defaults_key, digest, config)
+        return config
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration"""
+        if self._defaults is not None:
+            return deep_merge(self._defaults, {})
         return {
             'branding': {
                 'name': 'PIGEONHOLE MEDIA CENTER',
@@ -173,49 +432,26 @@ class ConfigManager:
             'deployment': {
                 'adb_timeout': 30,
                 'retry_attempts': 3,
+                'discovery_workers': 50,
                 'parallel_deployments': True,
                 'backup_existing': True
             }
         }
     
-    def _deep_merge(self, base: Dict, override: Dict) -> Dict:
-        """Deep merge two dictionaries"""
-        result = base.copy()
-        
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
-            else:
-                result[key] = value
-        
-        return result
-    
     def get_branding_config(self) -> BrandingConfig:
         """Get branding configuration as dataclass"""
-        branding_dict = self._config_cache.get('branding', {})
-        return BrandingConfig(**branding_dict)
+        return self._current().schema.branding
     
     def get_device_profile(self, profile_name: str) -> Optional[DeviceProfile]:
         """Get device profile configuration"""
-        profiles = self._config_cache.get('device_profiles', {})
-        profile_data = profiles.get(profile_name)
-        
-        if not profile_data:
+        profile = self._current().schema.device_profiles.get(profile_name)
+        if profile is None:
             self.logger.warning(f"Profile '{profile_name}' not found")
-            return None
-        
-        # Convert performance dict to PerformanceConfig
-        perf_data = profile_data.get('performance', {})
-        performance = PerformanceConfig(**perf_data)
-        
-        return DeviceProfile(
-            name=profile_name,
-            privacy_level=profile_data.get('privacy_level', 'medium'),
-            performance=performance,
-            enabled_services=profile_data.get('enabled_services', []),
-            disabled_services=profile_data.get('disabled_services', []),
-            restrictions=profile_data.get('restrictions', {})
-        )
+        return profile
+    
+    def get_device_class(self, model: str) -> Optional[DeviceClass]:
+        """fleet-config.yaml device class for a model code such as AFTGAZL"""
+        return self._current().schema.device_models.get(model)
     
     def get_streaming_config(self) -> Dict[str, Any]:
         """Get streaming configuration"""
@@ -227,29 +463,68 @@ class ConfigManager:
     
     def get_config(self, key: str, default: Any = None) -> Any:
         """Get configuration value by key with dot notation support"""
-        keys = key.split('.')
-        value = self._config_cache
+        config, values, _, _ = self._current()
+        value = values.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        if key in values:
+            return default
         
+        value = config
         try:
-            for k in keys:
+            for k in compile_key_path(key):
                 value = value[k]
-            return value
         except (KeyError, TypeError):
-            return default
+            value = MISSING
+        values[key] = value
+        return default if value is MISSING else value
     
     def set_config(self, key: str, value: Any) -> None:
         """Set configuration value by key with dot notation support"""
-        keys = key.split('.')
-        config = self._config_cache
-        
-        # Navigate to the parent of the target key
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
-        
-        # Set the value
-        config[keys[-1]] = value
+        keys = compile_key_path(key)
+        with self._lock:
+            old = self._config_cache
+            # Copy the dicts along the path so the current snapshot stays untouched
+            new = dict(old)
+            config = new
+            for k in keys[:-1]:
+                child = config.get(k)
+                config[k] = dict(child) if isinstance(child, dict) else {}
+                config = config[k]
+            config[keys[-1]] = value
+            self._swap(old, new)
+    
+    def _swap(self, old: Dict[str, Any], new: Dict[str, Any]) -> ConfigChanges:
+        """Install ``new`` as the current snapshot and notify subscribers of what changed"""
+        self._snapshot = self._compile(new)
+        changes = diff_config(old, new)
+        if changes:
+            self._notify(changes)
+        return changes
+    
+    def subscribe(self, prefix: str, callback: Callable[[ConfigChanges], None]) -> int:
+        """
+        Call ``callback(changes)`` whenever keys under ``prefix`` (e.g. ``"fleet.monitoring"``,
+        or ``""`` for everything) change. ``changes`` maps dotted keys to ``(old, new)``.
+        Callbacks run on the thread that changed the config, usually the watcher.
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (prefix, callback)
+        return token
+    
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            self._subscribers.pop(token, None)
+    
+    def _notify(self, changes: ConfigChanges) -> None:
+        for prefix, callback in list(self._subscribers.values()):
+            relevant = {key: change for key, change in changes.items() if _under(key, prefix)}
+            if relevant:
+                try:
+                    callback(relevant)
+                except Exception as e:
+                    self.logger.error(f"Config subscriber for '{prefix}' failed: {e}")
     
     def save_config(self, path: Optional[str] = None) -> bool:
         """Save current configuration to file"""
@@ -259,6 +534,7 @@ class ConfigManager:
             # Ensure directory exists
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
             
+            import yaml
             with open(save_path, 'w', encoding='utf-8') as f:
                 yaml.dump(self._config_cache, f, default_flow_style=False, indent=2)
             
@@ -271,33 +547,45 @@ class ConfigManager:
     
     def validate_config(self) -> List[str]:
         """Validate configuration and return list of issues"""
-        issues = []
-        
-        # Validate branding colors
-        branding = self._config_cache.get('branding', {})
-        color_fields = ['primary_color', 'secondary_color', 'accent_color']
-        
-        for field in color_fields:
-            color = branding.get(field, '')
-            if not color.startswith('#') or len(color) != 7:
-                issues.append(f"Invalid color format for branding.{field}: {color}")
-        
-        # Validate device profiles
-        profiles = self._config_cache.get('device_profiles', {})
-        for profile_name, profile_data in profiles.items():
-            privacy_level = profile_data.get('privacy_level')
-            if privacy_level not in ['low', 'medium', 'high']:
-                issues.append(f"Invalid privacy_level in profile {profile_name}: {privacy_level}")
-        
-        return issues
+        return list(self._current().issues)
+    
+    def reload_config(self) -> ConfigChanges:
+        """Reload configuration from file; a file that is missing or fails to parse keeps the current config"""
+        with self._lock:
+            if self._snapshot is None:
+                self._load_config()
+                return {}
+            old = self._config_cache
+            return self._swap(old, self._read_config(on_error=old))
     
-    def reload_config(self) -> None:
-        """Reload configuration from file"""
-        self._load_config()
+    def watch(self, interval: float = 2.0) -> None:
+        """Reload whenever the config file changes on disk"""
+        with self._lock:
+            if self._watcher is None:
+                self._current()
+                self._watcher = ConfigWatcher(self.config_path, self.reload_config, interval).start()
+    
+    def stop_watching(self) -> None:
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher:
+            watcher.stop()
 
-# Global configuration instance
-config_manager = ConfigManager()
+# Global configuration instance, created on first use
+_config_manager: Optional[ConfigManager] = None
+_config_manager_lock = threading.Lock()
 
 def get_config() -> ConfigManager:
     """Get global configuration manager instance"""
-    return config_manager
\ No newline at end of file
+    global _config_manager
+    if _config_manager is None:
+        with _config_manager_lock:
+            if _config_manager is None:
+                _config_manager = ConfigManager()
+    return _config_manager
+
+def __getattr__(name: str) -> Any:
+    # ``from pigeonhole_config import config_manager`` keeps working without an import-time instance
+    if name == "config_manager":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
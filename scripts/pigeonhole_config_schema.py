@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Configuration Schema
+Typed view of the Pigeonhole config and fleet-config.yaml, validated once per loaded config
+
+Every section is a frozen, slotted dataclass. ``compile_config`` turns a
+merged config tree into a ``ConfigSchema`` and a list of issues; it never
+raises, so a bad value is reported and replaced by its default rather than
+failing the load. Keys the schema does not describe are kept, frozen, in each
+section's ``extra``.
+"""
+
+import typing
+from collections.abc import Mapping as MappingABC
+from dataclasses import MISSING as NO_DEFAULT, dataclass, field, fields, is_dataclass, replace
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+# Ordered from least to most restrictive; the shipped profiles use the words, older configs low/medium/high
+PRIVACY_LEVELS = ("minimal", "low", "balanced", "medium", "high", "maximum")
+
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+def _frozen_map() -> Mapping[str, Any]:
+    return MappingProxyType({})
+
+def check_color(value: str) -> Optional[str]:
+    """``#RRGGBB`` or Kodi's ``AARRGGBB``"""
+    digits = value[1:] if value.startswith('#') else value
+    if len(digits) != (6 if value.startswith('#') else 8) or not set(digits) <= HEX_DIGITS:
+        return f"Invalid color format: {value}"
+    return None
+
+def check_privacy_level(value: str) -> Optional[str]:
+    if value not in PRIVACY_LEVELS:
+        return f"Invalid privacy_level: {value} (expected one of {', '.join(PRIVACY_LEVELS)})"
+    return None
+
+def checked(default: Any, check: Callable[[Any], Optional[str]]) -> Any:
+    """A field whose compiled value is also passed to ``check``, which returns an issue or None"""
+    return field(default=default, metadata={"check": check})
+
+@dataclass(frozen=True, slots=True)
+class BrandingConfig:
+    """Branding configuration settings"""
+    name: str = "PIGEONHOLE MEDIA CENTER"
+    tagline: str = "Professional Streaming Solutions"
+    primary_color: str = checked("#FF6B35", check_color)
+    secondary_color: str = checked("#1E3A8A", check_color)
+    accent_color: str = checked("#10B981", check_color)
+    text_primary: str = "#FFFFFF"
+    text_secondary: str = "#B0B0B0"
+    background: str = "#1A1A1A"
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class PerformanceConfig:
+    """Performance optimization settings"""
+    buffer_factor: float = 4.0
+    cache_size: int = 209715200  # 200MB default
+    concurrent_streams: int = 3
+    enable_hardware_acceleration: bool = True
+    network_timeout: int = 30
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class DeviceProfile:
+    """Device-specific configuration profile"""
+    name: str
+    privacy_level: str = checked("medium", check_privacy_level)
+    performance_profile: Optional[str] = None
+    performance: PerformanceConfig = field(default_factory=PerformanceConfig)
+    enabled_services: Tuple[str, ...] = ()
+    disabled_services: Tuple[str, ...] = ()
+    restrictions: Mapping[str, Any] = field(default_factory=_frozen_map)
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class StreamingConfig:
+    """Add-ons and repositories installed on every device"""
+    essential_addons: Tuple[str, ...] = ()
+    optional_addons: Tuple[str, ...] = ()
+    repositories: Tuple[Any, ...] = ()  # repository ids, or {name, url, required} mappings
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class DeploymentConfig:
+    """Deployment settings from the Pigeonhole config and fleet-config.yaml"""
+    adb_timeout: int = 30
+    retry_attempts: int = 3
+    discovery_workers: int = 50
+    parallel_deployments: bool = True
+    backup_existing: bool = True
+    # fleet-config.yaml
+    concurrent_devices: int = 3
+    deployment_timeout: int = 1800
+    backup_retention_days: int = 30
+    discovery_range: Optional[str] = None
+    adb_port: int = 5555
+    management_port: int = 8080
+    skip_backup: bool = False
+    install_custom_rom: bool = False
+    enable_root_required: bool = False
+    parallel_deployment: bool = True
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class DeviceClass:
+    """One Fire TV hardware class from fleet-config.yaml ``devices``"""
+    name: str
+    model: str
+    android_version: str = ""
+    cpu_arch: str = ""
+    memory_gb: float = 0.0
+    storage_gb: float = 0.0
+    root_method: str = "none"
+    custom_rom: bool = False
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class AddonSource:
+    """An add-on and the repository it is installed from"""
+    id: str
+    name: str = ""
+    repository: str = ""
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class ApplicationConfig:
+    """An Android application from fleet-config.yaml ``applications``"""
+    name: str
+    package: str
+    version: Optional[str] = None
+    auto_start: bool = False
+    skin: Optional[str] = None
+    addons: Tuple[AddonSource, ...] = ()
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+
+@dataclass(frozen=True, slots=True)
+class ConfigSchema:
+    """A whole config file; sections the file does not have hold their defaults"""
+    branding: BrandingConfig = field(default_factory=BrandingConfig)
+    device_profiles: Mapping[str, DeviceProfile] = field(default_factory=_frozen_map)
+    streaming: StreamingConfig = field(default_factory=StreamingConfig)
+    deployment: DeploymentConfig = field(default_factory=DeploymentConfig)
+    devices: Mapping[str, DeviceClass] = field(default_factory=_frozen_map)
+    applications: Mapping[str, ApplicationConfig] = field(default_factory=_frozen_map)
+    extra: Mapping[str, Any] = field(default_factory=_frozen_map)
+    # Derived from ``devices``: the same DeviceClass objects keyed by model code (e.g. AFTGAZL)
+    device_models: Mapping[str, DeviceClass] = field(default_factory=_frozen_map, metadata={"derived": True})
+
+class _Invalid(Exception):
+    pass
+
+@lru_cache(maxsize=None)
+def _schema_fields(cls: type) -> Tuple[Tuple[str, Any, bool, Optional[Callable]], ...]:
+    """(name, type, required, check) per compiled field of ``cls``"""
+    hints = typing.get_type_hints(cls)
+    return tuple((f.name, hints[f.name], f.default is NO_DEFAULT and f.default_factory is NO_DEFAULT,
+                  f.metadata.get("check"))
+                 for f in fields(cls) if f.name != "extra" and not f.metadata.get("derived"))
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _coerce(tp: Any, value: Any, path: str, issues: List[str]) -> Any:
+    if tp is Any:
+        return _freeze(value)
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if origin is typing.Union:  # Optional[X]
+        return None if value is None else _coerce(args[0], value, path, issues)
+    if is_dataclass(tp):
+        if not isinstance(value, dict):
+            raise _Invalid("expected a mapping")
+        return _compile(tp, value, path, issues)
+    if origin is tuple:
+        if not isinstance(value, (list, tuple)):
+            raise _Invalid("expected a list")
+        items = []
+        for index, item in enumerate(value):
+            try:
+                items.append(_coerce(args[0], item, f"{path}[{index}]", issues))
+            except _Invalid as e:
+                issues.append(f"{path}[{index}]: {e}, got {item!r}")
+        return tuple(item for item in items if item is not None)
+    if origin is MappingABC:
+        if not isinstance(value, dict):
+            raise _Invalid("expected a mapping")
+        entries = {}
+        for key, item in value.items():
+            item_path = f"{path}.{key}"
+            try:
+                if is_dataclass(args[1]):
+                    if not isinstance(item, dict):
+                        raise _Invalid("expected a mapping")
+                    item = _compile(args[1], item, item_path, issues, name=str(key))
+                else:
+                    item = _coerce(args[1], item, item_path, issues)
+            except _Invalid as e:
+                issues.append(f"{item_path}: {e}, got {item!r}")
+                continue
+            if item is not None:
+                entries[key] = item
+        return MappingProxyType(entries)
+    if tp is bool:
+        if isinstance(value, bool):
+            return value
+        raise _Invalid("expected true or false")
+    if tp in (int, float):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if tp is float or value == int(value):
+                return tp(value)
+        raise _Invalid(f"expected {'an integer' if tp is int else 'a number'}")
+    if tp is str:
+        # Unquoted YAML versions such as ``android_version: 9`` arrive as numbers
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+            return str(value)
+        raise _Invalid("expected a string")
+    raise TypeError(f"unsupported schema type {tp!r} at {path}")
+
+def _compile(cls: type, data: Dict[str, Any], path: str, issues: List[str], name: Optional[str] = None):
+    """``cls`` built from ``data``; None (with an issue) when a required field is missing or invalid"""
+    kwargs: Dict[str, Any] = {}
+    known = set()
+    for field_name, tp, required, check in _schema_fields(cls):
+        if field_name == "name" and name is not None:
+            kwargs["name"] = name
+            continue
+        known.add(field_name)
+        field_path = f"{path}.{field_name}"
+        if field_name not in data:
+            if required:
+                issues.append(f"{field_path}: required")
+                return None
+            continue
+        value = data[field_name]
+        try:
+            kwargs[field_name] = _coerce(tp, value, field_path, issues)
+        except _Invalid as e:
+            issues.append(f"{field_path}: {e}, got {value!r}")
+            if required:
+                return None
+            continue
+        if check is not None and kwargs[field_name] is not None:
+            problem = check(kwargs[field_name])
+            if problem:
+                issues.append(f"{field_path}: {problem}")
+    extra = {key: _freeze(value) for key, value in data.items() if key not in known}
+    if extra:
+        kwargs["extra"] = MappingProxyType(extra)
+    return cls(**kwargs)
+
+def compile_config(config: Dict[str, Any]) -> Tuple[ConfigSchema, List[str]]:
+    """The schema for a merged config tree, and every problem found while compiling it"""
+    issues: List[str] = []
+    schema = _compile(ConfigSchema, config if isinstance(config, dict) else {}, "config", issues)
+    schema = replace(schema, device_models=MappingProxyType(
+        {device.model: device for device in schema.devices.values()}))
+    return schema, [issue[len("config."):] for issue in issues]
@@ -18,6 +18,7 @@ from typing import Dict, List, Optional
 from contextlib import contextmanager
 
 from pigeonhole_config import get_config, BrandingConfig
+from pigeonhole_fleet_config import get_fleet_config
 from pigeonhole_device_manager import Device, DeviceType
 
 class CustomizationError(Exception):
@@ -54,21 +55,24 @@ class PigeonholeCustomizer:
             try:
                 if os.path.exists(temp_dir):
                     shutil.rmtree(temp_dir)
-                    self.logger.debug(f"Cleaned up temp dir: {temp_dir}")
+                    self.logger.debug("Cleaned up temp dir: %s", temp_dir)
             except Exception as e:
                 self.logger.warning(f"Failed to cleanup temp dir {temp_dir}: {e}")
         self._cleanup_dirs.clear()
         
     def create_custom_skin(self, device: Device, base_skin: str = "skin.amber") -> str:
         """Create completely customized skin with branding for specific device"""
+        # Branding may be overridden per model or device in fleet-config.yaml
+        branding = get_fleet_config().for_device(device.ip, device.model).schema.branding
         try:
             with self.temp_directory() as temp_dir:
-                return self._create_skin_package(device, base_skin, temp_dir)
+                return self._create_skin_package(device, base_skin, temp_dir, branding)
         except Exception as e:
             self.logger.error(f"Failed to create custom skin: {e}")
             raise SkinGenerationError(f"Skin creation failed: {e}")
     
-    def _create_skin_package(self, device: Device, base_skin: str, temp_dir: str) -> str:
+    def _create_skin_package(self, device: Device, base_skin: str, temp_dir: str,
+                             branding: BrandingConfig) -> str:
         """Internal method to create skin package"""
         # Create custom skin directory structure
         custom_skin_dir = os.path.join(temp_dir, "skin.pigeonhole.corporate")
@@ -82,10 +86,10 @@ class PigeonholeCustomizer:
         self.logger.info(f"Creating custom skin for {device.name} ({device.device_type.value})")
         
         # Generate device-specific components
-        self._generate_addon_xml(custom_skin_dir, device)
-        self._create_color_schemes(custom_skin_dir)
+        self._generate_addon_xml(custom_skin_dir, device, branding)
+        self._create_color_schemes(custom_skin_dir, branding)
         self._create_custom_home_screen(custom_skin_dir, device)
-        self._create_custom_graphics(custom_skin_dir, device)
+        self._create_custom_graphics(custom_skin_dir, device, branding)
         self._create_custom_fonts(custom_skin_dir)
         
         # Package the skin
@@ -95,20 +99,20 @@ class PigeonholeCustomizer:
         self.logger.info(f"Custom skin created: {skin_zip_path}")
         return skin_zip_path
         
-    def _generate_addon_xml(self, skin_dir: str, device: Device) -> None:
+    def _generate_addon_xml(self, skin_dir: str, device: Device, branding: BrandingConfig) -> None:
         """Generate addon.xml for custom Pigeonhole skin"""
-        addon_xml = self._create_addon_xml_content(device)
+        addon_xml = self._create_addon_xml_content(device, branding)
         
         with open(os.path.join(skin_dir, "addon.xml"), 'w', encoding='utf-8') as f:
             f.write(addon_xml)
     
-    def _create_addon_xml_content(self, device: Device) -> str:
+    def _create_addon_xml_content(self, device: Device, branding: BrandingConfig) -> str:
         """Create addon.xml content"""
         skin_id = f"skin.pigeonhole.{device.device_type.value}"
         device_desc = f"Optimized for {device.device_type.value.upper()} devices ({device.model})"
         
         return f'''<?xml version="1.0" encoding="UTF-8"?>
-<addon id="{skin_id}" version="1.0.0" name="{self.branding.name}" provider-name="Pigeonhole Media Solutions">
+<addon id="{skin_id}" version="1.0.0" name="{branding.name}" provider-name="Pigeonhole Media Solutions">
     <requires>
         <import addon="xbmc.gui" version="5.15.0"/>
         <import addon="script.skinshortcuts" version="0.4.0" optional="true"/>
@@ -120,7 +124,7 @@ class PigeonholeCustomizer:
     <extension point="xbmc.addon.metadata">
         <platform>all</platform>
         <license>Proprietary - Pigeonhole Media Solutions</license>
-        <summary lang="en">{self.branding.tagline}</summary>
+        <summary lang="en">{branding.tagline}</summary>
         <description lang="en">Professional corporate media center interface designed for enterprise deployments. {device_desc}. Features custom branding, optimized performance, and streamlined user experience.</description>
         <assets>
             <icon>icon.png</icon>
@@ -130,21 +134,21 @@ class PigeonholeCustomizer:
     </extension>
 </addon>'''
 
-    def _create_color_schemes(self, skin_dir: str):
+    def _create_color_schemes(self, skin_dir: str, branding: BrandingConfig):
         """Create custom color scheme files"""
         color_dir = os.path.join(skin_dir, "colors")
         Path(color_dir).mkdir(exist_ok=True)
         
         # Create default color scheme
-        self._create_default_color_scheme(color_dir)
+        self._create_default_color_scheme(color_dir, branding)
     
-    def _create_default_color_scheme(self, color_dir: str):
+    def _create_default_color_scheme(self, color_dir: str, branding: BrandingConfig):
         """Create default Pigeonhole color scheme"""
         colors = {
-            'text_primary': self.branding.text_primary,
-            'text_secondary': self.branding.text_secondary,
-            'background': self.branding.background,
-            'highlight': self.branding.primary_color,
+            'text_primary': branding.text_primary,
+            'text_secondary': branding.text_secondary,
+            'background': branding.background,
+            'highlight': branding.primary_color,
             'success': '#10B981',
             'warning': '#F59E0B',
             'error': '#EF4444'
@@ -158,9 +162,9 @@ class PigeonholeCustomizer:
     <color name="Green">{colors['success']}</color>
     <color name="Orange">{colors['warning']}</color>
     <color name="Red">{colors['error']}</color>
-    <color name="PigeonholeOrange">{self.branding.primary_color}</color>
-    <color name="CorporateBlue">{self.branding.secondary_color}</color>
-    <color name="AccentGreen">{self.branding.accent_color}</color>
+    <color name="PigeonholeOrange">{branding.primary_color}</color>
+    <color name="CorporateBlue">{branding.secondary_color}</color>
+    <color name="AccentGreen">{branding.accent_color}</color>
 </colors>'''
         
         with open(os.path.join(color_dir, "Pigeonhole.xml"), 'w', encoding='utf-8') as f:
@@ -391,7 +395,7 @@ class PigeonholeCustomizer:
         with open(home_xml_path, 'w', encoding='utf-8') as f:
             f.write(home_xml)
 
-    def _create_custom_graphics(self, skin_dir: str, device: Device):
+    def _create_custom_graphics(self, skin_dir: str, device: Device, branding: BrandingConfig):
         """Generate custom graphics and branding assets"""
         try:
             media_dir = os.path.join(skin_dir, "media")
@@ -401,19 +405,21 @@ class PigeonholeCustomizer:
             self.logger.info(f"Creating custom graphics for {device.device_type.value}")
             
             # Create color-coded background images
-            self._create_gradient_background(os.path.join(colors_dir, "background.png"))
+            self._create_gradient_background(os.path.join(colors_dir, "background.png"), branding)
             
             # Create card backgrounds with device-specific sizing
             card_size = self._get_optimal_card_size(device.device_type)
-            self._create_card_background(os.path.join(colors_dir, "card_background.png"), card_size)
-            self._create_card_background(os.path.join(colors_dir, "card_focus.png"), card_size, focused=True)
-            self._create_card_glow(os.path.join(colors_dir, "card_focus_glow.png"), (card_size[0]+10, card_size[1]+10))
+            self._create_card_background(os.path.join(colors_dir, "card_background.png"), card_size, branding)
+            self._create_card_background(os.path.join(colors_dir, "card_focus.png"), card_size, branding,
+                                         focused=True)
+            self._create_card_glow(os.path.join(colors_dir, "card_focus_glow.png"), (card_size[0]+10, card_size[1]+10),
+                                   branding)
             
             # Create footer background
             self._create_footer_background(os.path.join(colors_dir, "footer_background.png"))
             
             # Create corporate logo
-            self._create_corporate_logo(os.path.join(media_dir, "pigeonhole-logo.png"))
+            self._create_corporate_logo(os.path.join(media_dir, "pigeonhole-logo.png"), branding)
             
         except Exception as e:
             self.logger.error(f"Failed to create graphics: {e}")
@@ -430,14 +436,14 @@ class PigeonholeCustomizer:
         }
         return size_map.get(device_type, (410, 560))
     
-    def _create_gradient_background(self, path: str):
+    def _create_gradient_background(self, path: str, branding: BrandingConfig):
         """Create gradient background with corporate colors"""
         try:
-            img = Image.new('RGBA', (1920, 1080), color=self.branding.background)
+            img = Image.new('RGBA', (1920, 1080), color=branding.background)
             
             # Create subtle gradient overlay
             draw = ImageDraw.Draw(img)
-            primary_hex = self.branding.primary_color.lstrip('#')
+            primary_hex = branding.primary_color.lstrip('#')
             
             for y in range(1080):
                 alpha = int(30 * (y / 1080))  # Subtle gradient
@@ -445,13 +451,13 @@ class PigeonholeCustomizer:
                 draw.line([(0, y), (1920, y)], fill=color, width=1)
             
             img.save(path)
-            self.logger.debug(f"Gradient background created: {path}")
+            self.logger.debug("Gradient background created: %s", path)
             
         except Exception as e:
             self.logger.error(f"Failed to create gradient background: {e}")
             raise
         
-    def _create_card_background(self, path: str, size: tuple, focused: bool = False):
+    def _create_card_background(self, path: str, size: tuple, branding: BrandingConfig, focused: bool = False):
         """Create card background with corporate styling"""
         try:
             base_color = '#2a2a2a' if not focused else '#3a3a3a'
@@ -459,23 +465,23 @@ class PigeonholeCustomizer:
             
             # Add border
             draw = ImageDraw.Draw(img)
-            border_color = '#404040' if not focused else self.branding.primary_color
+            border_color = '#404040' if not focused else branding.primary_color
             draw.rectangle([0, 0, size[0]-1, size[1]-1], outline=border_color, width=2)
             
             img.save(path)
-            self.logger.debug(f"Card background created: {path} ({'focused' if focused else 'normal'})")
+            self.logger.debug("Card background created: %s (%s)", path, 'focused' if focused else 'normal')
             
         except Exception as e:
             self.logger.error(f"Failed to create card background: {e}")
             raise
         
-    def _create_card_glow(self, path: str, size: tuple):
+    def _create_card_glow(self, path: str, size: tuple, branding: BrandingConfig):
         """Create glow effect for focused cards"""
         try:
             img = Image.new('RGBA', size, color=(0, 0, 0, 0))
             
             draw = ImageDraw.Draw(img)
-            primary_hex = self.branding.primary_color.lstrip('#')
+            primary_hex = branding.primary_color.lstrip('#')
             
             # Create glow effect
             for i in range(10):
@@ -484,7 +490,7 @@ class PigeonholeCustomizer:
                 draw.rectangle([i, i, size[0]-1-i, size[1]-1-i], outline=color, width=1)
             
             img.save(path)
-            self.logger.debug(f"Card glow created: {path}")
+            self.logger.debug("Card glow created: %s", path)
             
         except Exception as e:
             self.logger.error(f"Failed to create card glow: {e}")
@@ -503,13 +509,13 @@ class PigeonholeCustomizer:
                 draw.line([(0, y), (1920, y)], fill=color, width=1)
             
             img.save(path)
-            self.logger.debug(f"Footer background created: {path}")
+            self.logger.debug("Footer background created: %s", path)
             
         except Exception as e:
             self.logger.error(f"Failed to create footer background: {e}")
             raise
         
-    def _create_corporate_logo(self, path: str):
+    def _create_corporate_logo(self, path: str, branding: BrandingConfig):
         """Create corporate logo with text"""
         try:
             img = Image.new('RGBA', (200, 60), color=(0, 0, 0, 0))
@@ -522,11 +528,11 @@ class PigeonholeCustomizer:
                 font = ImageFont.load_default()
             
             # Draw company name from branding config
-            company_name = self.branding.name.split()[0]  # First word only for logo
-            draw.text((10, 20), company_name, fill=self.branding.primary_color, font=font)
+            company_name = branding.name.split()[0]  # First word only for logo
+            draw.text((10, 20), company_name, fill=branding.primary_color, font=font)
             
             img.save(path)
-            self.logger.debug(f"Corporate logo created: {path}")
+            self.logger.debug("Corporate logo created: %s", path)
             
         except Exception as e:
             self.logger.error(f"Failed to create corporate logo: {e}")
@@ -673,7 +679,7 @@ def main():
         # Initialize components
         customizer = PigeonholeCustomizer()
         device_manager = create_device_manager()
-        config = get_config()
+        fleet_config = get_fleet_config()
         
         # Discover devices
         logger.info("Discovering devices...")
@@ -695,8 +701,8 @@ def main():
                 logger.info(f"✅ Custom skin created: {skin_path}")
                 
                 # Create addon package for device
-                streaming_config = config.get_streaming_config()
-                essential_addons = streaming_config.get('essential_addons', [])
+                settings = fleet_config.for_device(device.ip, device.model)
+                essential_addons = list(settings.schema.streaming.essential_addons)
                 
                 if essential_addons:
                     addon_package = customizer.create_custom_addon_package(essential_addons, device)
@@ -4,7 +4,6 @@ Pigeonhole Device Manager
 Abstract base classes and utilities for device management and ADB operations
 """
 
-import subprocess
 import socket
 import time
 import logging
@@ -15,8 +14,11 @@ from dataclasses import dataclass
 from enum import Enum
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import weakref
 
 from pigeonhole_config import get_config
+from pigeonhole_adb import ADBClient, ADBConnectionError, ADBResult
+from pigeonhole_logger import operation
 
 class DeviceType(Enum):
     """Supported device types"""
@@ -51,10 +53,6 @@ class Device:
         if self.metadata is None:
             self.metadata = {}
 
-class ADBConnectionError(Exception):
-    """ADB connection related errors"""
-    pass
-
 class DeviceNotFoundError(Exception):
     """Device not found or not accessible"""
     pass
@@ -68,30 +66,55 @@ class ADBManager:
         self.config = get_config()
         self.timeout = self.config.get_config('deployment.adb_timeout', 30)
         self.retry_attempts = self.config.get_config('deployment.retry_attempts', 3)
+        self.client = ADBClient(
+            adb_path,
+            timeout=self.timeout,
+            retries=max(0, self.retry_attempts - 1)
+        )
         self._connection_lock = threading.Lock()
         self._connected_devices = set()
+        # The global config holds only a weak reference, so a dropped manager is collected and unsubscribed
+        manager = weakref.ref(self)
+        
+        def on_change(changes) -> None:
+            adb = manager()
+            if adb is not None:
+                adb._on_deployment_config(changes)
+        
+        self._config_token = self.config.subscribe('deployment', on_change)
+    
+    def close(self) -> None:
+        """Stop following config reloads"""
+        token, self._config_token = self._config_token, None
+        if token is not None:
+            self.config.unsubscribe(token)
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
     
-    def _execute_command(self, command: List[str], timeout: Optional[int] = None) -> Tuple[str, str, int]:
+    def _on_deployment_config(self, changes) -> None:
+        """Apply reloaded ADB timeout and retry settings to later commands"""
+        self.timeout = self.config.get_config('deployment.adb_timeout', 30)
+        self.retry_attempts = self.config.get_config('deployment.retry_attempts', 3)
+        self.client.timeout = self.timeout
+        self.client.retries = max(0, self.retry_attempts - 1)
+    
+    def _execute_command(self, args: List[str], timeout: Optional[int] = None,
+                         serial: Optional[str] = None) -> Tuple[str, str, int]:
         """Execute ADB command with timeout and error handling"""
-        cmd_timeout = timeout or self.timeout
+        result: ADBResult = self.client.run(args, timeout=timeout, serial=serial or "")
         
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=cmd_timeout,
-                encoding='utf-8',
-                errors='replace'
-            )
-            return result.stdout.strip(), result.stderr.strip(), result.returncode
-            
-        except subprocess.TimeoutExpired:
-            self.logger.error(f"Command timeout after {cmd_timeout}s: {' '.join(command)}")
-            raise ADBConnectionError(f"Command timeout: {' '.join(command)}")
-        except Exception as e:
-            self.logger.error(f"Command execution failed: {e}")
-            raise ADBConnectionError(f"Command execution failed: {e}")
+        if result.timed_out:
+            self.logger.error(f"Command timeout after {timeout or self.timeout}s: {' '.join(result.args)}")
+            raise ADBConnectionError(f"Command timeout: {' '.join(result.args)}")
+        if result.returncode < 0:
+            self.logger.error(f"Command execution failed: {result.stderr}")
+            raise ADBConnectionError(f"Command execution failed: {result.stderr}")
+        
+        return result.output, result.stderr.strip(), result.returncode
     
     def connect_device(self, ip: str, port: int = 5555) -> bool:
         """Connect to device via ADB"""
@@ -101,26 +124,30 @@ class ADBManager:
             if device_addr in self._connected_devices:
                 return True
             
-            try:
-                # First check if device is reachable
-                if not self._is_device_reachable(ip, port):
-                    raise DeviceNotFoundError(f"Device {device_addr} not reachable")
-                
-                # Connect via ADB
-                command = [self.adb_path, "connect", device_addr]
-                stdout, stderr, returncode = self._execute_command(command)
-                
-                if returncode == 0 and ("connected" in stdout.lower() or "already connected" in stdout.lower()):
-                    self._connected_devices.add(device_addr)
-                    self.logger.info(f"Connected to device: {device_addr}")
-                    return True
-                else:
-                    self.logger.error(f"Failed to connect to {device_addr}: {stderr}")
-                    return False
+            with operation(self.logger, 'adb.connect', device_addr) as op:
+                try:
+                    # First check if device is reachable
+                    if not self._is_device_reachable(ip, port):
+                        raise DeviceNotFoundError(f"Device {device_addr} not reachable")
                     
-            except Exception as e:
-                self.logger.error(f"Connection error for {device_addr}: {e}")
-                return False
+                    # Connect via ADB
+                    stdout, stderr, returncode = self._execute_command(["connect", device_addr])
+                    
+                    if returncode == 0 and ("connected" in stdout.lower() or "already connected" in stdout.lower()):
+                        self._connected_devices.add(device_addr)
+                        self.logger.info("Connected to device: %s", device_addr)
+                        return True
+                    else:
+                        op['outcome'] = 'failed'
+                        op['reported'] = True
+                        self.logger.error("Failed to connect to %s: %s", device_addr, stderr)
+                        return False
+                        
+                except Exception as e:
+                    op['outcome'] = 'error'
+                    op['reported'] = True
+                    self.logger.error("Connection error for %s: %s", device_addr, e)
+                    return False
     
     def disconnect_device(self, ip: str, port: int = 5555) -> bool:
         """Disconnect from device"""
@@ -128,66 +155,81 @@ class ADBManager:
         
         with self._connection_lock:
             try:
-                command = [self.adb_path, "disconnect", device_addr]
-                stdout, stderr, returncode = self._execute_command(command)
+                stdout, stderr, returncode = self._execute_command(["disconnect", device_addr])
                 
                 self._connected_devices.discard(device_addr)
-                self.logger.info(f"Disconnected from device: {device_addr}")
+                self.logger.info("Disconnected from device: %s", device_addr, extra={'device_id': device_addr})
                 return True
                 
             except Exception as e:
-                self.logger.error(f"Disconnect error for {device_addr}: {e}")
+                self.logger.error(f"Disconnect error for {device_addr}: {e}", extra={'device_id': device_addr})
                 return False
     
     def execute_shell_command(self, device_addr: str, command: str, timeout: Optional[int] = None) -> Tuple[str, bool]:
         """Execute shell command on device"""
-        try:
-            adb_command = [self.adb_path, "-s", device_addr, "shell", command]
-            stdout, stderr, returncode = self._execute_command(adb_command, timeout)
-            
-            if returncode == 0:
-                return stdout, True
-            else:
-                self.logger.error(f"Shell command failed on {device_addr}: {stderr}")
-                return stderr, False
+        with operation(self.logger, 'adb.shell', device_addr, command=command) as op:
+            try:
+                stdout, stderr, returncode = self._execute_command(["shell", command], timeout, device_addr)
                 
-        except Exception as e:
-            self.logger.error(f"Shell command error on {device_addr}: {e}")
-            return str(e), False
+                if returncode == 0:
+                    return stdout, True
+                else:
+                    op['outcome'] = 'failed'
+                    op['reported'] = True
+                    self.logger.error("Shell command failed on %s: %s", device_addr, stderr)
+                    return stderr, False
+                    
+            except Exception as e:
+                op['outcome'] = 'error'
+                op['reported'] = True
+                self.logger.error("Shell command error on %s: %s", device_addr, e)
+                return str(e), False
     
     def push_file(self, device_addr: str, local_path: str, remote_path: str) -> bool:
         """Push file to device"""
-        try:
-            command = [self.adb_path, "-s", device_addr, "push", local_path, remote_path]
-            stdout, stderr, returncode = self._execute_command(command)
-            
-            if returncode == 0:
-                self.logger.info(f"File pushed: {local_path} -> {device_addr}:{remote_path}")
-                return True
-            else:
-                self.logger.error(f"File push failed: {stderr}")
-                return False
+        with operation(self.logger, 'adb.push', device_addr, path=remote_path) as op:
+            try:
+                stdout, stderr, returncode = self._execute_command(
+                    ["push", local_path, remote_path], serial=device_addr
+                )
                 
-        except Exception as e:
-            self.logger.error(f"File push error: {e}")
-            return False
+                if returncode == 0:
+                    self.logger.info("File pushed: %s -> %s:%s", local_path, device_addr, remote_path)
+                    return True
+                else:
+                    op['outcome'] = 'failed'
+                    op['reported'] = True
+                    self.logger.error("File push failed: %s", stderr)
+                    return False
+                    
+            except Exception as e:
+                op['outcome'] = 'error'
+                op['reported'] = True
+                self.logger.error("File push error: %s", e)
+                return False
     
     def pull_file(self, device_addr: str, remote_path: str, local_path: str) -> bool:
         """Pull file from device"""
-        try:
-            command = [self.adb_path, "-s", device_addr, "pull", remote_path, local_path]
-            stdout, stderr, returncode = self._execute_command(command)
-            
-            if returncode == 0:
-                self.logger.info(f"File pulled: {device_addr}:{remote_path} -> {local_path}")
-                return True
-            else:
-                self.logger.error(f"File pull failed: {stderr}")
-                return False
+        with operation(self.logger, 'adb.pull', device_addr, path=remote_path) as op:
+            try:
+                stdout, stderr, returncode = self._execute_command(
+                    ["pull", remote_path, local_path], serial=device_addr
+                )
                 
-        except Exception as e:
-            self.logger.error(f"File pull error: {e}")
-            return False
+                if returncode == 0:
+                    self.logger.info("File pulled: %s:%s -> %s", device_addr, remote_path, local_path)
+                    return True
+                else:
+                    op['outcome'] = 'failed'
+                    op['reported'] = True
+                    self.logger.error("File pull failed: %s", stderr)
+                    return False
+                    
+            except Exception as e:
+                op['outcome'] = 'error'
+                op['reported'] = True
+                self.logger.error("File pull error: %s", e)
+                return False
     
     def get_device_property(self, device_addr: str, property_name: str) -> Optional[str]:
         """Get device property via getprop"""
@@ -229,11 +271,14 @@ class ADBManager:
 class BaseDeviceManager(ABC):
     """Abstract base class for device management"""
     
-    def __init__(self):
+    def __init__(self, watch_config: bool = False):
         self.adb = ADBManager()
         self.logger = logging.getLogger('pigeonhole.device_manager')
         self.config = get_config()
         self.devices: Dict[str, Device] = {}
+        if watch_config:
+            # Long-running managers pick up config edits; known devices are kept
+            self.config.watch()
     
     @abstractmethod
     def discover_devices(self, network_range: str) -> List[Device]:
@@ -248,13 +293,13 @@ class BaseDeviceManager(ABC):
     def add_device(self, device: Device) -> None:
         """Add device to managed devices"""
         self.devices[device.ip] = device
-        self.logger.info(f"Added device: {device.name} ({device.ip})")
+        self.logger.info("Added device: %s (%s)", device.name, device.ip)
     
     def remove_device(self, ip: str) -> None:
         """Remove device from managed devices"""
         if ip in self.devices:
             device = self.devices.pop(ip)
-            self.logger.info(f"Removed device: {device.name} ({ip})")
+            self.logger.info("Removed device: %s (%s)", device.name, ip)
     
     def get_device(self, ip: str) -> Optional[Device]:
         """Get device by IP address"""
@@ -294,12 +339,12 @@ class FireTVManager(BaseDeviceManager):
                         return device_info
                         
             except Exception as e:
-                self.logger.debug(f"Failed to check device {ip}: {e}")
+                self.logger.debug("Failed to check device %s: %s", ip, e)
                 return None
         
         # Parallel device discovery
         if self.config.get_config('deployment.parallel_deployments', True):
-            with ThreadPoolExecutor(max_workers=50) as executor:
+            with ThreadPoolExecutor(max_workers=self.config.get_config('deployment.discovery_workers', 50)) as executor:
                 futures = {}
                 
                 for i in range(start_range, end_range + 1):
@@ -319,7 +364,7 @@ class FireTVManager(BaseDeviceManager):
                 if device:
                     devices.append(device)
         
-        self.logger.info(f"Discovered {len(devices)} devices")
+        self.logger.info("Discovered %d devices", len(devices))
         return devices
     
     def classify_device(self, model: str) -> DeviceType:
@@ -374,10 +419,10 @@ class FireTVManager(BaseDeviceManager):
             )
             
         except Exception as e:
-            self.logger.error(f"Error getting device info for {device_addr}: {e}")
+            self.logger.error("Error getting device info for %s: %s", device_addr, e)
             return None
 
 # Factory function
-def create_device_manager() -> BaseDeviceManager:
+def create_device_manager(watch_config: bool = False) -> BaseDeviceManager:
     """Create appropriate device manager"""
-    return FireTVManager()
\ No newline at end of file
+    return FireTVManager(watch_config=watch_config)
\ No newline at end of file
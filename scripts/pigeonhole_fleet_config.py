@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Fleet Configuration
+Layered fleet settings resolved once into a per-device effective-config table
+
+Layers, lowest first:
+  defaults  the calling tool's built-in settings
+  site      pigeonhole_config.yaml (with the Pigeonhole defaults), fleet-config.yaml,
+            then the deployer's fleet_config.json
+  model     ``overrides.models.<model code or device class name>`` from the site layers
+  device    ``overrides.devices.<serial or IP address>`` from the site layers
+
+A device's effective config is merged the first time it is asked for and kept.
+Devices without their own override share their model's effective config, so
+a fleet of 1,000 devices across three models costs three merges, plus one per
+overridden device. The table is rebuilt after any layer's file changes.
+
+Usage: python scripts/pigeonhole_fleet_config.py --device 192.168.1.130 --model AFTGAZL [--key fleet.monitoring]
+"""
+
+import argparse
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pigeonhole_config import MISSING, ConfigChanges, ConfigManager, compile_key_path, deep_merge, get_config
+from pigeonhole_config_schema import ConfigSchema, compile_config
+
+FLEET_CONFIG = Path(os.getenv("PIGEONHOLE_FLEET_CONFIG",
+                              Path(__file__).resolve().parent.parent / "fleet-config.yaml"))
+DEPLOYER_CONFIG = Path(os.getenv("PIGEONHOLE_DEPLOYER_CONFIG", "fleet_config.json"))
+
+@dataclass(frozen=True, slots=True)
+class EffectiveConfig:
+    """
+    Settings for one device (or model) with every layer applied.
+
+    ``config`` is shared between devices; treat it as read-only. ``layers``
+    names what was merged, e.g. ``("defaults", "site", "model:AFTGAZL")``.
+    """
+    layers: Tuple[str, ...]
+    config: Dict[str, Any]
+    schema: ConfigSchema
+    _values: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value at a dotted key, e.g. ``fleet.monitoring.memory_threshold``"""
+        value = self._values.get(key, MISSING)
+        if value is MISSING and key not in self._values:
+            value = self.config
+            try:
+                for k in compile_key_path(key):
+                    value = value[k]
+            except (KeyError, TypeError):
+                value = MISSING
+            self._values[key] = value
+        return default if value is MISSING else value
+
+    def merged(self, layer: str, override: Dict[str, Any]) -> "EffectiveConfig":
+        config = deep_merge(self.config, override)
+        return EffectiveConfig(self.layers + (layer,), config, compile_config(config)[0])
+
+def default_sources(fleet_config: Optional[Path] = None, deployer_config: Optional[Path] = None) -> List[ConfigManager]:
+    """The site layers in precedence order: Pigeonhole config, fleet-config.yaml, fleet_config.json"""
+    return [get_config(),
+            ConfigManager(str(fleet_config or FLEET_CONFIG), defaults={}),
+            ConfigManager(str(deployer_config or DEPLOYER_CONFIG), defaults={})]
+
+def _mapping(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+class _Table:
+    """Effective configs for one version of the layers; replaced whole when a layer changes"""
+    __slots__ = ("site", "model_overrides", "device_overrides", "models", "devices")
+
+    def __init__(self, site: EffectiveConfig, overrides: Dict[str, Any]):
+        self.site = site
+        self.model_overrides: Dict[str, Any] = _mapping(overrides.get("models"))
+        self.device_overrides: Dict[str, Any] = _mapping(overrides.get("devices"))
+        self.models: Dict[Optional[str], EffectiveConfig] = {None: site}
+        self.devices: Dict[str, Tuple[Optional[str], EffectiveConfig]] = {}  # id -> (model, config)
+
+class FleetConfig:
+    """
+    One view of every fleet setting, indexed per device.
+
+    ``for_device`` is a dict lookup once a device has been resolved;
+    ``resolve`` fills the table for a whole device list at once. ``get_config``,
+    ``subscribe``, ``watch`` and ``stop_watching`` mirror ConfigManager for
+    fleet-wide settings.
+    """
+
+    def __init__(self, defaults: Optional[Dict[str, Any]] = None,
+                 sources: Optional[Sequence[ConfigManager]] = None):
+        self.defaults = defaults or {}
+        self.sources = list(sources) if sources is not None else default_sources()
+        self._table: Optional[_Table] = None
+        self._lock = threading.RLock()
+        for source in self.sources:
+            # Registered before any caller's subscription, so callbacks already see the new table
+            source.subscribe("", self._invalidate)
+
+    def _invalidate(self, changes: ConfigChanges) -> None:
+        self._table = None
+
+    def _current(self) -> _Table:
+        table = self._table
+        if table is None:
+            with self._lock:
+                if self._table is None:
+                    self._table = self._build()
+                table = self._table
+        return table
+
+    def _build(self) -> _Table:
+        config = self.defaults
+        for source in self.sources:
+            config = deep_merge(config, source.snapshot())
+        config = dict(config)
+        overrides = _mapping(config.pop("overrides", None))
+        return _Table(EffectiveConfig(("defaults", "site"), config, compile_config(config)[0]), overrides)
+
+    @property
+    def site(self) -> EffectiveConfig:
+        """Fleet-wide settings: defaults and site layers only"""
+        return self._current().site
+
+    def _model_override(self, table: _Table, model: str) -> Optional[Dict[str, Any]]:
+        override = table.model_overrides.get(model)
+        if override is None:
+            device_class = table.site.schema.device_models.get(model)
+            if device_class is not None:
+                override = table.model_overrides.get(device_class.name)
+        return override if isinstance(override, dict) else None
+
+    def for_model(self, model: Optional[str]) -> EffectiveConfig:
+        table = self._current()
+        effective = table.models.get(model)
+        if effective is None:
+            with self._lock:
+                effective = table.models.get(model)
+                if effective is None:
+                    override = self._model_override(table, model)
+                    effective = table.site.merged(f"model:{model}", override) if override else table.site
+                    table.models[model] = effective
+        return effective
+
+    def for_device(self, device_id: str, model: Optional[str] = None, ip: Optional[str] = None) -> EffectiveConfig:
+        """
+        Effective settings for ``device_id`` (serial or IP address). A device
+        override may be keyed by either, so pass ``ip`` when ``device_id`` is a
+        serial. A device first seen without ``model`` is resolved again once
+        a model is given.
+        """
+        table = self._current()
+        entry = table.devices.get(device_id)
+        if entry is not None and (model is None or entry[0] == model):
+            return entry[1]
+        base = self.for_model(model)
+        with self._lock:
+            override = _mapping(table.device_overrides.get(device_id)
+                                or (ip and table.device_overrides.get(ip)))
+            effective = base.merged(f"device:{device_id}", override) if override else base
+            table.devices[device_id] = (model, effective)
+        return effective
+
+    def resolve(self, devices: Iterable[Tuple[str, Optional[str]]]) -> Dict[str, EffectiveConfig]:
+        """Effective configs for ``(device_id, model)`` pairs, resolving any not yet in the table"""
+        return {device_id: self.for_device(device_id, model) for device_id, model in devices}
+
+    def get_config(self, key: str, default: Any = None) -> Any:
+        return self.site.get(key, default)
+
+    def subscribe(self, prefix: str, callback: Callable[[ConfigChanges], None]) -> List[int]:
+        """Subscribe to ``prefix`` in every site layer; pass the result to ``unsubscribe``"""
+        return [source.subscribe(prefix, callback) for source in self.sources]
+
+    def unsubscribe(self, tokens: List[int]) -> None:
+        for source, token in zip(self.sources, tokens):
+            source.unsubscribe(token)
+
+    def watch(self, interval: float = 2.0) -> None:
+        for source in self.sources:
+            source.watch(interval)
+
+    def stop_watching(self) -> None:
+        for source in self.sources:
+            source.stop_watching()
+
+# Global fleet configuration, created on first use
+_fleet_config: Optional[FleetConfig] = None
+_fleet_config_lock = threading.Lock()
+
+def get_fleet_config() -> FleetConfig:
+    global _fleet_config
+    if _fleet_config is None:
+        with _fleet_config_lock:
+            if _fleet_config is None:
+                _fleet_config = FleetConfig()
+    return _fleet_config
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a device's effective fleet configuration")
+    parser.add_argument("--device", required=True, help="Device id or IP address")
+    parser.add_argument("--model", help="Model code, e.g. AFTGAZL")
+    parser.add_argument("--key", help="Dotted key to show instead of the whole config")
+    args = parser.parse_args()
+
+    effective = get_fleet_config().for_device(args.device, args.model)
+    print(f"# layers: {' > '.join(effective.layers)}")
+    value = effective.get(args.key) if args.key else effective.config
+    print(json.dumps(value, indent=2, default=str))
+
+if __name__ == "__main__":
+    main()
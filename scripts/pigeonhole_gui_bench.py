@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole GUI Navigation Benchmark
+Scripted navigation through the Pigeonhole skin with per-step latency until Kodi confirms the change
+
+Usage: python scripts/pigeonhole_gui_bench.py --hosts 192.168.1.130 --label debloated [--repetitions 20] [--json nav.json]
+       python scripts/pigeonhole_gui_bench.py --compare nav-stock.json nav-debloated.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from pigeonhole_kodi_rpc import KodiAPIError, KodiRPCClient, KodiRPCError
+from pigeonhole_playback_bench import percentile
+
+SKIN_ID = "skin.arctic.zephyr.pigeonhole"
+PERCENTILES = (50, 95, 99)
+
+logger = logging.getLogger('pigeonhole.gui_bench')
+
+@dataclass(frozen=True)
+class NavStep:
+    """
+    One navigation action and how to confirm it took effect.
+
+    With ``window`` set, the step is complete when ``GUI.GetProperties``
+    reports that window id as current; otherwise when the focused control's
+    label differs from before the action.
+    """
+    name: str
+    method: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    window: Optional[int] = None
+
+# Kodi window ids
+HOME, VIDEOS, SETTINGS, ADDON_BROWSER = 10000, 10025, 10004, 10040
+
+# The home menu of arctic-zephyr-pigeonhole (1080i/Home.xml) and the windows it opens. Library
+# nodes are opened with "return" so that Back goes to Home rather than the parent node
+PIGEONHOLE_HOME_SCRIPT = (
+    NavStep("home", "Input.Home", window=HOME),
+    NavStep("menu right", "Input.Right"),
+    NavStep("menu left", "Input.Left"),
+    NavStep("movies", "GUI.ActivateWindow", {"window": "videos", "parameters": ["MovieTitles", "return"]}, VIDEOS),
+    NavStep("back from movies", "Input.Back", window=HOME),
+    NavStep("tv shows", "GUI.ActivateWindow", {"window": "videos", "parameters": ["TVTitles", "return"]}, VIDEOS),
+    NavStep("back from tv shows", "Input.Back", window=HOME),
+    NavStep("add-ons", "GUI.ActivateWindow", {"window": "addonbrowser"}, ADDON_BROWSER),
+    NavStep("back from add-ons", "Input.Back", window=HOME),
+    NavStep("settings", "GUI.ActivateWindow", {"window": "settings"}, SETTINGS),
+    NavStep("home from settings", "Input.Home", window=HOME),
+)
+
+@dataclass
+class NavigationReport:
+    """Step latencies for one device in one labelled state (skin build, debloat level)"""
+    host: str
+    label: str
+    skin_version: Optional[str] = None
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    failures: Dict[str, int] = field(default_factory=dict)
+
+    def percentiles(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """``{step: {"p50": ..., "p95": ..., "p99": ...}}`` in seconds"""
+        return {step: {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+                for step, values in self.latencies.items()}
+
+    def all_steps(self) -> List[float]:
+        return [value for values in self.latencies.values() for value in values]
+
+    def summary(self) -> str:
+        values = self.all_steps()
+        if not values:
+            return f"{self.host} [{self.label}]: no completed steps"
+        stats = " ".join(f"p{pct} {percentile(values, pct) * 1000:.0f}ms" for pct in PERCENTILES)
+        return (f"{self.host} [{self.label}, skin {self.skin_version or 'unknown'}]: {len(values)} steps, "
+                f"{stats}, {sum(self.failures.values())} failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "percentiles": self.percentiles()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NavigationReport":
+        return cls(data["host"], data["label"], data.get("skin_version"),
+                   data.get("latencies", {}), data.get("failures", {}))
+
+class NavigationBenchmark:
+    """
+    Runs a navigation script repeatedly against one device.
+
+    Each step's latency runs from sending the action to the first
+    ``GUI.GetProperties`` poll that shows its effect, so it covers the skin
+    loading and rendering the target window rather than only the RPC round-trip.
+    """
+
+    def __init__(self, rpc: KodiRPCClient, script: Sequence[NavStep] = PIGEONHOLE_HOME_SCRIPT,
+                 repetitions: int = 10, timeout: float = 10.0, poll_interval: float = 0.02):
+        self.rpc = rpc
+        self.script = script
+        self.repetitions = repetitions
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def gui_state(self) -> Dict[str, Any]:
+        return self.rpc.call("GUI.GetProperties", {"properties": ["currentwindow", "currentcontrol"]})
+
+    def skin_version(self) -> Optional[str]:
+        try:
+            details = self.rpc.call("Addons.GetAddonDetails", {"addonid": SKIN_ID, "properties": ["version"]})
+            return details["addon"].get("version")
+        except (KodiAPIError, KeyError):
+            return None
+
+    def _confirmed(self, step: NavStep, before: Dict[str, Any], state: Dict[str, Any]) -> bool:
+        if step.window is not None:
+            return state.get("currentwindow", {}).get("id") == step.window
+        return state.get("currentcontrol", {}).get("label") != before.get("currentcontrol", {}).get("label")
+
+    def run_step(self, step: NavStep) -> Optional[float]:
+        """Latency of one step in seconds; None when it was not confirmed within ``timeout``"""
+        before = self.gui_state() if step.window is None else {}
+        started = time.monotonic()
+        self.rpc.call(step.method, step.params or None)
+        deadline = started + self.timeout
+        while True:
+            if self._confirmed(step, before, self.gui_state()):
+                return time.monotonic() - started
+            if time.monotonic() >= deadline:
+                logger.warning("%s: '%s' not confirmed within %.0fs", self.rpc.host, step.name, self.timeout)
+                return None
+            time.sleep(self.poll_interval)
+
+    def run(self, label: str = "current") -> NavigationReport:
+        report = NavigationReport(self.rpc.host, label, self.skin_version())
+        for repetition in range(self.repetitions):
+            for step in self.script:
+                try:
+                    latency = self.run_step(step)
+                except KodiAPIError as e:
+                    latency = None
+                    logger.warning("%s: '%s' rejected: %s", self.rpc.host, step.name, e)
+                if latency is None:
+                    report.failures[step.name] = report.failures.get(step.name, 0) + 1
+                else:
+                    report.latencies.setdefault(step.name, []).append(latency)
+        logger.info(report.summary())
+        return report
+
+def compare(baseline: NavigationReport, candidate: NavigationReport) -> List[str]:
+    """Per-step p50/p95/p99 of ``candidate`` against ``baseline``, as printable lines"""
+    lines = [f"{baseline.label} -> {candidate.label} ({candidate.host})"]
+    base_stats, new_stats = baseline.percentiles(), candidate.percentiles()
+    for step in candidate.latencies:
+        cells = []
+        for pct in PERCENTILES:
+            new = new_stats[step][f"p{pct}"]
+            old = base_stats.get(step, {}).get(f"p{pct}")
+            delta = f" ({(new - old) * 1000:+.0f})" if old is not None else ""
+            cells.append(f"p{pct} {new * 1000:5.0f}ms{delta:8s}")
+        lines.append(f"  {step:20s} " + "  ".join(cells))
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kodi GUI navigation latency")
+    parser.add_argument("--hosts", nargs="*", default=[], help="Device IPs")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--label", default="current", help="Name of the state under test, e.g. skin build or debloat level")
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for each step")
+    parser.add_argument("--json", help="Write the reports to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Compare two --json files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = {report["host"]: NavigationReport.from_dict(report) for report in json.load(f)}
+        with open(args.compare[1]) as f:
+            for data in json.load(f):
+                candidate = NavigationReport.from_dict(data)
+                if candidate.host in baseline:
+                    print("\n".join(compare(baseline[candidate.host], candidate)))
+        return
+    if not args.hosts:
+        parser.error("no hosts given")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    reports = []
+    for host in args.hosts:
+        try:
+            benchmark = NavigationBenchmark(KodiRPCClient(host, args.port), repetitions=args.repetitions,
+                                            timeout=args.timeout)
+            reports.append(benchmark.run(args.label))
+        except KodiRPCError as e:
+            print(f"{host}: FAILED: {e}")
+    for report in reports:
+        print(report.summary())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([report.to_dict() for report in reports], f, indent=2)
+
+if __name__ == "__main__":
+    main()
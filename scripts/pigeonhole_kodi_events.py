@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Kodi Notification Listener
+Client for Kodi's JSON-RPC notification stream on TCP port 9090 with awaitable events
+"""
+
+import codecs
+import fnmatch
+import itertools
+import json
+import logging
+import socket
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Union
+
+DEFAULT_EVENT_PORT = 9090
+
+# Notification name patterns (fnmatch syntax)
+PLAYER_STARTED = ("Player.OnPlay", "Player.OnAVStart")
+PLAYER_STOPPED = ("Player.OnStop",)
+SCREENSAVER_EVENTS = ("GUI.OnScreensaver*",)
+WAKE_EVENTS = ("System.OnWake", "GUI.OnScreensaverDeactivated", "GUI.OnDPMSDeactivated")
+SHUTDOWN_EVENTS = ("System.OnQuit", "System.OnRestart", "System.OnSleep")
+# Addon notifications are namespaced differently across Kodi versions
+ADDON_EVENTS = ("Addon*",)
+
+Patterns = Union[str, Sequence[str]]
+
+def enable_keepalive(sock: socket.socket, idle: float, interval: float = 5.0, probes: int = 3) -> None:
+    """
+    Probe an idle connection so one whose box dropped off the network errors
+    out after about ``idle + interval * probes`` seconds instead of never.
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "SIO_KEEPALIVE_VALS"):  # Windows
+        sock.ioctl(socket.SIO_KEEPALIVE_VALS, (1, int(idle * 1000), int(interval * 1000)))
+        return
+    for option, value in (("TCP_KEEPIDLE", idle), ("TCP_KEEPALIVE", idle),  # Linux / macOS
+                          ("TCP_KEEPINTVL", interval), ("TCP_KEEPCNT", probes)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), max(1, int(value)))
+
+@dataclass
+class KodiEvent:
+    """One notification received from Kodi"""
+    method: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    received_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def data(self) -> Any:
+        return self.params.get("data")
+
+    @property
+    def sender(self) -> Optional[str]:
+        return self.params.get("sender")
+
+def _as_patterns(patterns: Patterns) -> tuple:
+    return (patterns,) if isinstance(patterns, str) else tuple(patterns)
+
+def matches(method: str, patterns: Patterns) -> bool:
+    return any(fnmatch.fnmatchcase(method, pattern) for pattern in _as_patterns(patterns))
+
+class EventWaiter:
+    """A pending wait for the first notification matching some patterns"""
+
+    def __init__(self, listener: "KodiEventListener", patterns: Patterns,
+                 predicate: Optional[Callable[[KodiEvent], bool]] = None):
+        self.listener = listener
+        self.patterns = _as_patterns(patterns)
+        self.predicate = predicate
+        self.event: Optional[KodiEvent] = None
+        self._done = threading.Event()
+
+    def _offer(self, event: KodiEvent) -> bool:
+        if self._done.is_set() or not matches(event.method, self.patterns):
+            return False
+        if self.predicate and not self.predicate(event):
+            return False
+        self.event = event
+        self._done.set()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[KodiEvent]:
+        """Block until a matching notification arrives; None on timeout"""
+        try:
+            self._done.wait(timeout)
+            return self.event
+        finally:
+            self.listener._remove_waiter(self)
+
+    def cancel(self) -> None:
+        self.listener._remove_waiter(self)
+
+class KodiEventListener:
+    """
+    Background reader for Kodi's raw TCP JSON-RPC interface.
+
+    Kodi pushes notifications as a stream of concatenated JSON objects (no
+    delimiter). The listener decodes them incrementally, hands them to
+    subscribers and waiters, and reconnects with backoff when the socket drops
+    (Kodi restarting), so ``wait_connected`` doubles as a liveness signal.
+
+    Register a waiter with ``expect`` *before* triggering the action it waits
+    for, so a notification that arrives immediately is not missed::
+
+        waiter = listener.expect(PLAYER_STARTED)
+        rpc.call("Player.Open", {"item": {"file": url}})
+        event = waiter.wait(timeout=30)
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_EVENT_PORT, reconnect: bool = True,
+                 connect_timeout: float = 5.0, max_backoff: float = 10.0, history: int = 256,
+                 keepalive: float = 10.0):
+        self.host = host
+        self.port = port
+        self.reconnect = reconnect
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.keepalive = keepalive
+        self.history: Deque[KodiEvent] = deque(maxlen=history)
+        self.connected = threading.Event()
+        self.disconnected = threading.Event()
+        self.disconnected.set()
+        self.logger = logging.getLogger('pigeonhole.kodi_events')
+
+        self._lock = threading.Lock()
+        self._waiters: List[EventWaiter] = []
+        self._subscribers: Dict[int, tuple] = {}
+        self._tokens = itertools.count(1)
+        self._socket: Optional[socket.socket] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "KodiEventListener":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"kodi-events-{self.host}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        sock = self._socket
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=self.connect_timeout + 1)
+            self._thread = None
+
+    def __enter__(self) -> "KodiEventListener":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        return self.connected.wait(timeout)
+
+    def wait_disconnected(self, timeout: Optional[float] = None) -> bool:
+        return self.disconnected.wait(timeout)
+
+    def subscribe(self, patterns: Patterns, callback: Callable[[KodiEvent], None]) -> int:
+        """Call ``callback`` from the reader thread for every matching notification"""
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (_as_patterns(patterns), callback)
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def expect(self, patterns: Patterns,
+               predicate: Optional[Callable[[KodiEvent], bool]] = None) -> EventWaiter:
+        """Start waiting for a notification; call ``wait`` on the result"""
+        waiter = EventWaiter(self, patterns, predicate)
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def wait_for(self, patterns: Patterns, timeout: Optional[float] = None,
+                 predicate: Optional[Callable[[KodiEvent], bool]] = None) -> Optional[KodiEvent]:
+        """Wait for the next matching notification; None on timeout"""
+        return self.expect(patterns, predicate).wait(timeout)
+
+    def _remove_waiter(self, waiter: EventWaiter) -> None:
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _dispatch(self, message: Any) -> None:
+        # Responses to requests carry an id; notifications do not
+        if not isinstance(message, dict) or "method" not in message or "id" in message:
+            return
+        event = KodiEvent(message["method"], message.get("params") or {})
+        self.history.append(event)
+        self.logger.debug("%s notification from %s", event.method, self.host)
+
+        with self._lock:
+            waiters = list(self._waiters)
+            subscribers = list(self._subscribers.values())
+        for waiter in waiters:
+            waiter._offer(event)
+        for patterns, callback in subscribers:
+            if matches(event.method, patterns):
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.logger.error("Notification callback for %s failed: %s", event.method, e)
+
+    def _read(self, sock: socket.socket) -> None:
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        buffer = ""
+        while not self._stopping.is_set():
+            chunk = sock.recv(65536)
+            if not chunk:
+                return
+            buffer += text.decode(chunk)
+            while True:
+                buffer = buffer.lstrip()
+                if not buffer:
+                    break
+                try:
+                    message, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break  # incomplete object, wait for more data
+                buffer = buffer[end:]
+                self._dispatch(message)
+            if len(buffer) > 4 * 1024 * 1024:
+                self.logger.warning("Discarding undecodable notification data from %s", self.host)
+                buffer = ""
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stopping.is_set():
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+            except OSError as e:
+                self.logger.debug("Notification connect to %s:%d failed: %s", self.host, self.port, e)
+                if not self.reconnect:
+                    return
+                self._stopping.wait(backoff)
+                backoff = min(self.max_backoff, backoff * 2)
+                continue
+
+            # Notifications may be minutes apart, so no read timeout; keepalive probes notice a
+            # box that left the network, and the reconnect below takes over
+            sock.settimeout(None)
+            enable_keepalive(sock, self.keepalive)
+            self._socket = sock
+            self.disconnected.clear()
+            self.connected.set()
+            backoff = 0.5
+            self.logger.info("Listening for Kodi notifications on %s:%d", self.host, self.port)
+            try:
+                self._read(sock)
+            except OSError as e:
+                self.logger.debug("Notification stream from %s closed: %s", self.host, e)
+            finally:
+                self._socket = None
+                self.connected.clear()
+                self.disconnected.set()
+                sock.close()
+
+            if not self.reconnect:
+                return
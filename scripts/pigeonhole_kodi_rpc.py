@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Kodi JSON-RPC Client
+Shared Kodi JSON-RPC over HTTP client with per-host keep-alive sessions and typed errors
+"""
+
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_PORT = 8080
+DEFAULT_USERNAME = "kodi"
+DEFAULT_PASSWORD = "0000"
+DEFAULT_TIMEOUT = 15
+
+class KodiRPCError(Exception):
+    """Base class for Kodi JSON-RPC failures"""
+    pass
+
+class KodiConnectionError(KodiRPCError):
+    """Kodi could not be reached or did not answer in time"""
+    pass
+
+class KodiHTTPError(KodiRPCError):
+    """Kodi's webserver answered with a non-200 status"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+class KodiAPIError(KodiRPCError):
+    """Kodi returned a JSON-RPC error object"""
+
+    def __init__(self, method: str, error: Dict[str, Any]):
+        super().__init__(f"{method}: {error.get('message', error)} ({error.get('code')})")
+        self.method = method
+        self.error = error
+        self.code = error.get("code")
+        self.data = error.get("data")
+
+@dataclass
+class BatchResult:
+    """Outcome of one request within a JSON-RPC batch"""
+    method: str
+    params: Optional[Dict[str, Any]]
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+# Request ids are unique per process so responses can be matched to requests
+_request_ids = itertools.count(1)
+
+def build_request(method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """JSON-RPC 2.0 request object with a fresh id"""
+    payload = {"jsonrpc": "2.0", "method": method, "id": next(_request_ids)}
+    if params:
+        payload["params"] = params
+    return payload
+
+def build_batch(calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]]) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """Request ids and batch array for ``(method, params)`` pairs"""
+    payload = [build_request(method, params) for method, params in calls]
+    return [item["id"] for item in payload], payload
+
+def check_envelope(method: str, request_id: int, envelope: Any) -> Dict[str, Any]:
+    """Validate a single-request response envelope"""
+    if not isinstance(envelope, dict):
+        raise KodiRPCError(f"Unexpected response to {method}: {envelope!r}")
+    if envelope.get("id") not in (request_id, None):
+        raise KodiRPCError(f"Response id {envelope.get('id')} does not match request {request_id}")
+    return envelope
+
+def map_batch(calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]], ids: List[int],
+              response: Any) -> List[BatchResult]:
+    """Match a batch response back to its requests by id"""
+    if isinstance(response, dict) and "error" in response:
+        # Kodi rejected the batch as a whole (parse error, invalid request)
+        return [BatchResult(method, params, error=response["error"]) for method, params in calls]
+    if not isinstance(response, list):
+        raise KodiRPCError(f"Unexpected batch response: {response!r}")
+
+    by_id = {item.get("id"): item for item in response if isinstance(item, dict)}
+    results = []
+    for request_id, (method, params) in zip(ids, calls):
+        item = by_id.get(request_id)
+        if item is None:
+            results.append(BatchResult(method, params, error={"code": -32603, "message": "No response"}))
+        elif "error" in item:
+            results.append(BatchResult(method, params, error=item["error"]))
+        else:
+            results.append(BatchResult(method, params, result=item.get("result")))
+    return results
+
+def settings_calls(settings: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Settings.SetSettingValue batch items for a setting -> value mapping"""
+    return [("Settings.SetSettingValue", {"setting": setting, "value": value})
+            for setting, value in settings.items()]
+
+_sessions: Dict[Tuple[str, int, str], requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(host: str, port: int = DEFAULT_PORT, username: str = DEFAULT_USERNAME,
+                password: str = DEFAULT_PASSWORD, pool_size: int = 4,
+                retries: int = 2) -> requests.Session:
+    """
+    Persistent keep-alive session for one Kodi host, shared by every client in
+    the process. Only connection failures are retried: a request that reached
+    Kodi is never re-sent, since JSON-RPC writes are not idempotent.
+    """
+    key = (host, port, username)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            session.auth = (username, password)
+            session.headers.update({"Content-Type": "application/json"})
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=pool_size,
+                max_retries=Retry(total=retries, connect=retries, read=0, status=0,
+                                  backoff_factor=0.2, raise_on_status=False)
+            )
+            session.mount("http://", adapter)
+            _sessions[key] = session
+        return session
+
+def close_sessions() -> None:
+    """Close every pooled connection, e.g. before the process exits"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+class KodiRPCClient:
+    """
+    JSON-RPC client for one Kodi instance.
+
+    ``request`` returns the raw response envelope and only raises on transport
+    or HTTP failures; ``call`` returns the ``result`` member and raises
+    ``KodiAPIError`` when Kodi reports an error; ``batch`` sends several
+    requests in one round-trip and reports each item separately.
+    """
+
+    def __init__(self, host: str, port: int = DEFAULT_PORT, username: str = DEFAULT_USERNAME,
+                 password: str = DEFAULT_PASSWORD, timeout: float = DEFAULT_TIMEOUT,
+                 pool_size: int = 4, retries: int = 2):
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}/jsonrpc"
+        self.timeout = timeout
+        self.session = get_session(host, port, username, password, pool_size, retries)
+        self.logger = logging.getLogger('pigeonhole.kodi_rpc')
+
+    def _post(self, payload: Any, timeout: Optional[float]) -> Any:
+        try:
+            response = self.session.post(self.url, json=payload, timeout=timeout or self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise KodiConnectionError(f"{self.host}:{self.port}: {e}") from e
+
+        if response.status_code != 200:
+            raise KodiHTTPError(response.status_code, response.text)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise KodiRPCError(f"Invalid JSON from {self.host}:{self.port}: {e}") from e
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one request and return the response envelope"""
+        payload = build_request(method, params)
+        envelope = check_envelope(method, payload["id"], self._post(payload, timeout))
+        self.logger.debug("%s -> %s", method, "error" if "error" in envelope else "ok")
+        return envelope
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+             timeout: Optional[float] = None) -> Any:
+        """Send one request and return its result, raising KodiAPIError on an error response"""
+        envelope = self.request(method, params, timeout)
+        if "error" in envelope:
+            raise KodiAPIError(method, envelope["error"])
+        return envelope.get("result")
+
+    def batch(self, calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+              timeout: Optional[float] = None) -> List[BatchResult]:
+        """
+        Send ``(method, params)`` pairs as one JSON-RPC 2.0 batch array.
+
+        Responses are matched to requests by id, so one failed item does not
+        affect the others; an item Kodi did not answer is reported as failed.
+        Transport and HTTP failures raise, as for ``request``.
+        """
+        if not calls:
+            return []
+        ids, payload = build_batch(calls)
+        results = map_batch(calls, ids, self._post(payload, timeout))
+        failed = sum(1 for r in results if not r.ok)
+        self.logger.debug("batch of %d -> %d failed", len(results), failed)
+        return results
+
+    def set_settings(self, settings: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, BatchResult]:
+        """Apply several Settings.SetSettingValue writes in one round-trip, keyed by setting id"""
+        results = self.batch(settings_calls(settings), timeout)
+        return {result.params["setting"]: result for result in results}
+
+    def ping(self, timeout: Optional[float] = None) -> bool:
+        try:
+            return self.call("JSONRPC.Ping", timeout=timeout) == "pong"
+        except KodiRPCError:
+            return False
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Async Kodi JSON-RPC Client
+aiohttp Kodi JSON-RPC client and fleet-wide fan-out with bounded concurrency
+
+Usage: python scripts/pigeonhole_kodi_rpc_async.py --hosts-file fleet_hosts.txt ping
+       python scripts/pigeonhole_kodi_rpc_async.py --hosts 10.0.0.5 10.0.0.6 infolabels System.BuildVersion
+       python scripts/pigeonhole_kodi_rpc_async.py --hosts-file fleet_hosts.txt set network.cachemembuffersize=209715200
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from pigeonhole_kodi_rpc import (
+    DEFAULT_PASSWORD, DEFAULT_PORT, DEFAULT_TIMEOUT, DEFAULT_USERNAME,
+    BatchResult, KodiAPIError, KodiConnectionError, KodiHTTPError, KodiRPCError,
+    build_batch, build_request, check_envelope, map_batch, settings_calls
+)
+
+class AsyncKodiRPCClient:
+    """
+    asyncio counterpart of KodiRPCClient for one Kodi instance.
+
+    The aiohttp session is supplied by the caller so that many clients (one
+    per device) share a single connection pool.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, host: str, port: int = DEFAULT_PORT,
+                 username: str = DEFAULT_USERNAME, password: str = DEFAULT_PASSWORD,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.session = session
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}/jsonrpc"
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.headers = {"Authorization": f"Basic {credentials}"}
+        self.timeout = timeout
+
+    async def _post(self, payload: Any, timeout: Optional[float]) -> Any:
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        try:
+            async with self.session.post(self.url, json=payload, headers=self.headers,
+                                         timeout=client_timeout) as response:
+                body = await response.text()
+                status = response.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise KodiConnectionError(f"{self.host}:{self.port}: {str(e) or type(e).__name__}") from e
+
+        if status != 200:
+            raise KodiHTTPError(status, body)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise KodiRPCError(f"Invalid JSON from {self.host}:{self.port}: {e}") from e
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send one request and return the response envelope"""
+        payload = build_request(method, params)
+        return check_envelope(method, payload["id"], await self._post(payload, timeout))
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> Any:
+        """Send one request and return its result, raising KodiAPIError on an error response"""
+        envelope = await self.request(method, params, timeout)
+        if "error" in envelope:
+            raise KodiAPIError(method, envelope["error"])
+        return envelope.get("result")
+
+    async def batch(self, calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+                    timeout: Optional[float] = None) -> List[BatchResult]:
+        """Send ``(method, params)`` pairs as one JSON-RPC 2.0 batch array"""
+        if not calls:
+            return []
+        ids, payload = build_batch(calls)
+        return map_batch(calls, ids, await self._post(payload, timeout))
+
+    async def set_settings(self, settings: Dict[str, Any],
+                           timeout: Optional[float] = None) -> Dict[str, BatchResult]:
+        results = await self.batch(settings_calls(settings), timeout)
+        return {result.params["setting"]: result for result in results}
+
+    async def ping(self, timeout: Optional[float] = None) -> bool:
+        try:
+            return await self.call("JSONRPC.Ping", timeout=timeout) == "pong"
+        except KodiRPCError:
+            return False
+
+@dataclass
+class FleetResult:
+    """Aggregated outcome of one operation fanned out across the fleet"""
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    durations: Dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> List[str]:
+        return sorted(self.results)
+
+    @property
+    def failed(self) -> List[str]:
+        return sorted(self.errors)
+
+    def summary(self) -> str:
+        total = len(self.results) + len(self.errors)
+        slowest = max(self.durations.values(), default=0.0)
+        return (f"{len(self.results)}/{total} hosts succeeded in {self.elapsed:.2f}s "
+                f"(slowest host {slowest:.2f}s)")
+
+class KodiFleet:
+    """
+    Runs the same RPC, batch or coroutine against many Kodi devices at once.
+
+    At most ``concurrency`` devices are in flight, each bounded by
+    ``host_timeout`` seconds; a slow or dead box only costs its own timeout.
+    Use as an async context manager so the shared connection pool is closed.
+    """
+
+    def __init__(self, hosts: Sequence[str], port: int = DEFAULT_PORT,
+                 username: str = DEFAULT_USERNAME, password: str = DEFAULT_PASSWORD,
+                 concurrency: int = 64, host_timeout: float = 5.0):
+        self.hosts = list(dict.fromkeys(hosts))
+        self.port = port
+        self.username = username
+        self.password = password
+        self.concurrency = concurrency
+        self.host_timeout = host_timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.logger = logging.getLogger('pigeonhole.kodi_rpc')
+
+    async def __aenter__(self) -> "KodiFleet":
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=2)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+
+    def client(self, host: str) -> AsyncKodiRPCClient:
+        return AsyncKodiRPCClient(self.session, host, self.port, self.username,
+                                  self.password, self.host_timeout)
+
+    async def run(self, operation: Callable[[AsyncKodiRPCClient], Awaitable[Any]]) -> FleetResult:
+        """Run ``operation(client)`` for every host and collect results and errors"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fleet = FleetResult()
+
+        async def one(host: str) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    fleet.results[host] = await asyncio.wait_for(operation(self.client(host)),
+                                                                 self.host_timeout)
+                except asyncio.TimeoutError:
+                    fleet.errors[host] = f"timeout after {self.host_timeout}s"
+                except KodiRPCError as e:
+                    fleet.errors[host] = str(e)
+                except Exception as e:
+                    # One host's bad payload or a bug in ``operation`` must not abort the whole fan-out
+                    fleet.errors[host] = f"{type(e).__name__}: {e}"
+                finally:
+                    fleet.durations[host] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(host) for host in self.hosts))
+        fleet.elapsed = time.perf_counter() - start
+        self.logger.info("Fleet operation: %s", fleet.summary())
+        return fleet
+
+    async def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> FleetResult:
+        return await self.run(lambda client: client.call(method, params))
+
+    async def batch(self, calls: Sequence[Tuple[str, Optional[Dict[str, Any]]]]) -> FleetResult:
+        return await self.run(lambda client: client.batch(calls))
+
+    async def set_settings(self, settings: Dict[str, Any]) -> FleetResult:
+        """Apply settings everywhere; a host with any rejected setting is reported as failed"""
+        async def apply(client: AsyncKodiRPCClient) -> Dict[str, BatchResult]:
+            results = await client.set_settings(settings)
+            rejected = {s: r.error.get("message") for s, r in results.items() if not r.ok}
+            if rejected:
+                raise KodiRPCError(f"rejected settings: {rejected}")
+            return results
+        return await self.run(apply)
+
+    async def info_labels(self, labels: Sequence[str]) -> FleetResult:
+        return await self.run(lambda client: client.call("System.GetInfoLabels", {"labels": list(labels)}))
+
+    async def ping(self) -> FleetResult:
+        async def ping(client: AsyncKodiRPCClient) -> bool:
+            result = await client.call("JSONRPC.Ping")
+            if result != "pong":
+                raise KodiRPCError(f"unexpected ping reply {result!r}")
+            return True
+        return await self.run(ping)
+
+def run_fleet(hosts: Sequence[str], operation: Callable[[KodiFleet], Awaitable[FleetResult]],
+              **fleet_kwargs) -> FleetResult:
+    """Synchronous entry point: ``run_fleet(hosts, lambda fleet: fleet.ping())``"""
+    async def main() -> FleetResult:
+        async with KodiFleet(hosts, **fleet_kwargs) as fleet:
+            return await operation(fleet)
+    return asyncio.run(main())
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet-wide Kodi JSON-RPC")
+    parser.add_argument("--hosts", nargs="*", default=[], help="Device IPs")
+    parser.add_argument("--hosts-file", help="File with one device IP per line")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-host timeout in seconds")
+    parser.add_argument("command", choices=["ping", "infolabels", "set", "call"])
+    parser.add_argument("args", nargs="*",
+                        help="infolabels: LABEL...; set: SETTING=VALUE...; call: METHOD [JSON_PARAMS]")
+    args = parser.parse_args()
+
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        with open(args.hosts_file) as f:
+            hosts += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not hosts:
+        parser.error("no hosts given")
+
+    if args.command == "ping":
+        operation = lambda fleet: fleet.ping()  # noqa: E731
+    elif args.command == "infolabels":
+        operation = lambda fleet: fleet.info_labels(args.args or ["System.BuildVersion"])  # noqa: E731
+    elif args.command == "set":
+        settings = dict(item.split("=", 1) for item in args.args)
+        settings = {k: _parse_value(v) for k, v in settings.items()}
+        operation = lambda fleet: fleet.set_settings(settings)  # noqa: E731
+    else:
+        if not args.args:
+            parser.error("call needs a METHOD")
+        params = json.loads(args.args[1]) if len(args.args) > 1 else None
+        operation = lambda fleet: fleet.call(args.args[0], params)  # noqa: E731
+
+    result = run_fleet(hosts, operation, port=args.port, concurrency=args.concurrency,
+                       host_timeout=args.timeout)
+    for host in result.succeeded:
+        value = result.results[host]
+        if isinstance(value, dict) and all(isinstance(v, BatchResult) for v in value.values()):
+            value = "ok"
+        print(f"{host:<16} {value}")
+    for host in result.failed:
+        print(f"{host:<16} FAILED: {result.errors[host]}")
+    print(result.summary())
+
+if __name__ == "__main__":
+    main()
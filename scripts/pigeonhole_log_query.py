@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Event Log Query
+Loads structured pigeonhole_events_*.jsonl logs into an indexed SQLite database and filters them
+
+With --since/--until, rotated segments whose time range (from
+pigeonhole_events_segments.json) lies outside the window are not read.
+
+Usage: python scripts/pigeonhole_log_query.py --logs M:/logs --device 192.168.1.130:5555 --since "2025-06-01 08:00"
+       python scripts/pigeonhole_log_query.py --logs M:/logs --outcome error --operation adb.shell --summary
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pigeonhole_log_rotation import SegmentIndex, open_segment
+
+# Columns with their own index-friendly column; everything else stays in ``data``
+COLUMNS = ('ts', 'level', 'logger', 'message', 'device_id', 'operation', 'duration_ms',
+           'outcome', 'run_id', 'correlation_id')
+
+_EVENTS_FILE = re.compile(r'_(\d{8})(?:\.(\d+))?\.jsonl(?:\.(\d+))?')
+
+def _rotation_order(path: str):
+    """Day, then segments in order (.1.jsonl, .2.jsonl, then .jsonl); older .jsonl.N backups highest N first"""
+    match = _EVENTS_FILE.search(os.path.basename(path))
+    if not match:
+        return '', 0, 0
+    day, segment, backup = match.groups()
+    return day, int(segment) if segment else float('inf'), -int(backup or 0)
+
+class EventStore:
+    """
+    SQLite copy of the JSON-lines event logs.
+
+    Loading is incremental: each file is remembered by a hash of its first
+    line and the offset read so far, so re-running only reads new lines, and a
+    file renamed by rotation (``.jsonl`` -> ``.jsonl.1``) is not read again.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL,
+                level TEXT,
+                logger TEXT,
+                message TEXT,
+                device_id TEXT,
+                operation TEXT,
+                duration_ms REAL,
+                outcome TEXT,
+                run_id TEXT,
+                correlation_id TEXT,
+                data TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_device_ts ON events (device_id, ts);
+            CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+            CREATE INDEX IF NOT EXISTS idx_events_operation_ts ON events (operation, ts);
+            CREATE INDEX IF NOT EXISTS idx_events_correlation ON events (correlation_id);
+            CREATE TABLE IF NOT EXISTS loaded_files (
+                first_line TEXT PRIMARY KEY,
+                path TEXT,
+                offset INTEGER
+            );
+        ''')
+        self._connection.commit()
+
+    def load_file(self, path: str, size: Optional[int] = None) -> int:
+        """
+        Insert the lines of ``path`` (plain or compressed) not loaded before;
+        returns how many events were added. ``size`` is the uncompressed size
+        of a closed segment, to skip one already read in full without
+        decompressing it again.
+        """
+        with open_segment(path) as f:
+            first = f.readline()
+            if not first.endswith(b'\n'):
+                return 0  # empty, or the first write is still in progress
+            key = hashlib.sha1(first).hexdigest()
+            row = self._connection.execute('SELECT offset FROM loaded_files WHERE first_line = ?',
+                                           (key,)).fetchone()
+            if row and size is not None and row['offset'] >= size:
+                return 0
+            f.seek(row['offset'] if row else 0)
+            rows = []
+            offset = f.tell()
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # partial line; picked up next time
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                rows.append(tuple(event.pop(column, None) for column in COLUMNS)
+                            + (json.dumps(event) if event else None,))
+        with self._connection:
+            self._connection.executemany(
+                f'INSERT INTO events ({", ".join(COLUMNS)}, data) VALUES ({", ".join("?" * (len(COLUMNS) + 1))})',
+                rows
+            )
+            self._connection.execute('INSERT OR REPLACE INTO loaded_files VALUES (?, ?, ?)', (key, path, offset))
+        return len(rows)
+
+    def load_dir(self, log_dir: str, since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """Load new events; indexed segments entirely outside ``[since, until)`` are skipped"""
+        index = SegmentIndex(Path(log_dir) / "pigeonhole_events_segments.json")
+        segments = index.load()
+        indexed = {segment['file'] for segment in segments}
+        added = 0
+        for segment in index.overlapping(since, until):
+            path = os.path.join(log_dir, segment['file'])
+            if os.path.exists(path):
+                added += self.load_file(path, segment.get('bytes'))
+        # The file being written, and anything rotated before the index existed
+        paths = sorted((path for path in glob.glob(os.path.join(log_dir, "pigeonhole_events_*.jsonl*"))
+                        if os.path.basename(path) not in indexed and not path.endswith('.tmp')),
+                       key=_rotation_order)
+        return added + sum(self.load_file(path) for path in paths)
+
+    def _where(self, device: Optional[str] = None, since: Optional[float] = None, until: Optional[float] = None,
+               operation: Optional[str] = None, outcome: Optional[str] = None, run_id: Optional[str] = None,
+               correlation_id: Optional[str] = None, level: Optional[str] = None):
+        clauses, params = [], []
+        for column, value in (('device_id', device), ('operation', operation), ('outcome', outcome),
+                              ('run_id', run_id), ('correlation_id', correlation_id), ('level', level)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if since is not None:
+            clauses.append('ts >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('ts < ?')
+            params.append(until)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, limit: int = 200, **filters) -> List[Dict[str, Any]]:
+        """Matching events in time order; ``filters`` as in ``_where``"""
+        where, params = self._where(**filters)
+        rows = self._connection.execute(f'SELECT * FROM events{where} ORDER BY ts, id LIMIT ?',
+                                        params + [limit]).fetchall()
+        events = []
+        for row in rows:
+            event = {column: row[column] for column in COLUMNS if row[column] is not None}
+            if row['data']:
+                event.update(json.loads(row['data']))
+            events.append(event)
+        return events
+
+    def summary(self, **filters) -> List[Dict[str, Any]]:
+        """Per operation: events, failures and duration statistics"""
+        where, params = self._where(**filters)
+        rows = self._connection.execute(f'''
+            SELECT operation, COUNT(*) AS events, COUNT(DISTINCT device_id) AS devices,
+                   SUM(outcome IS NOT NULL AND outcome != 'ok') AS failures,
+                   AVG(duration_ms) AS avg_ms, MAX(duration_ms) AS max_ms
+            FROM events{where} GROUP BY operation ORDER BY events DESC
+        ''', params).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        self._connection.close()
+
+def parse_time(value: str) -> float:
+    """Epoch seconds from an ISO date/time ("2025-06-01", "2025-06-01 08:00") or a number"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def format_event(event: Dict[str, Any]) -> str:
+    when = datetime.fromtimestamp(event['ts']).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] if 'ts' in event else '?'
+    fields = ' '.join(f"{key}={event[key]}" for key in ('device_id', 'operation', 'outcome', 'duration_ms')
+                      if key in event)
+    return f"{when} {event.get('level', ''):8s} {event.get('logger', '')}: {event.get('message', '')}  {fields}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Query Pigeonhole structured event logs")
+    parser.add_argument("--logs", default="M:/logs", help="Directory with pigeonhole_events_*.jsonl files")
+    parser.add_argument("--db", help="SQLite database (default: events.db in --logs)")
+    parser.add_argument("--no-load", action="store_true", help="Query the database without reading new log lines")
+    parser.add_argument("--device", help="device_id, e.g. 192.168.1.130:5555")
+    parser.add_argument("--since", type=parse_time, help="Start time (ISO or epoch seconds)")
+    parser.add_argument("--until", type=parse_time, help="End time (ISO or epoch seconds)")
+    parser.add_argument("--operation")
+    parser.add_argument("--outcome", help="ok, failed, error, ...")
+    parser.add_argument("--run", dest="run_id")
+    parser.add_argument("--correlation", dest="correlation_id")
+    parser.add_argument("--level", help="Exact level, e.g. ERROR")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--summary", action="store_true", help="Per-operation counts and durations instead of events")
+    parser.add_argument("--json", action="store_true", help="Print events as JSON lines")
+    args = parser.parse_args()
+
+    store = EventStore(args.db or os.path.join(args.logs, "events.db"))
+    try:
+        if not args.no_load:
+            added = store.load_dir(args.logs, args.since, args.until)
+            if added:
+                print(f"# loaded {added} new events")
+        filters = dict(device=args.device, since=args.since, until=args.until, operation=args.operation,
+                       outcome=args.outcome, run_id=args.run_id, correlation_id=args.correlation_id,
+                       level=args.level)
+        if args.summary:
+            print(f"{'operation':28s} {'events':>7s} {'devices':>7s} {'failed':>7s} {'avg ms':>9s} {'max ms':>9s}")
+            for row in store.summary(**filters):
+                avg = f"{row['avg_ms']:9.1f}" if row['avg_ms'] is not None else f"{'-':>9s}"
+                peak = f"{row['max_ms']:9.1f}" if row['max_ms'] is not None else f"{'-':>9s}"
+                print(f"{row['operation'] or '-':28s} {row['events']:7d} {row['devices']:7d} "
+                      f"{row['failures'] or 0:7d} {avg} {peak}")
+            return
+        for event in store.query(limit=args.limit, **filters):
+            print(json.dumps(event) if args.json else format_event(event))
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
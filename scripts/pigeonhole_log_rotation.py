@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Log Rotation
+Log files rotated at midnight and by size, compressed in the background, with an index of segment time ranges
+
+For a log named ``pigeonhole`` the file being written is always
+pigeonhole_YYYYMMDD.log for the current day. At midnight, or once it reaches
+``max_bytes``, it is renamed to pigeonhole_YYYYMMDD.N.log (N counting up
+through the day) and a background thread compresses it to .log.gz (or
+.log.zst with the optional ``zstandard`` package). Each closed segment is
+recorded in pigeonhole_segments.json with the times of its first and last
+records, so readers such as scripts/pigeonhole_log_query.py can skip files
+outside the range they are asked about. Segments older than
+``retention_days`` are deleted.
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+def open_segment(path: str, mode: str = 'rb') -> IO:
+    """Open a segment for reading whether it is plain, .gz or .zst"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode)
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install the zstandard package to read it")
+        return zstandard.open(path, mode)
+    return open(path, mode)
+
+def _day_start(day: str) -> float:
+    return datetime.strptime(day, '%Y%m%d').timestamp()
+
+class SegmentIndex:
+    """
+    The ``<name>_segments.json`` file next to a rotated log: one entry per
+    closed segment with ``file``, ``start``, ``end`` (epoch seconds),
+    ``records`` and ``bytes`` (uncompressed). ``file`` is updated when the
+    segment is compressed. Every change is a read-modify-write of the whole
+    file, replaced atomically, so readers never see a partial index.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def load(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                segments = json.load(f).get('segments', [])
+        except (OSError, ValueError, AttributeError):
+            return []
+        return [segment for segment in segments if isinstance(segment, dict) and 'file' in segment]
+
+    def update(self, change: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]) -> None:
+        """Apply ``change`` to the list of segments and write it back"""
+        with self._lock:
+            segments = change(self.load())
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'segments': segments}, f, indent=1)
+            os.replace(tmp, self.path)
+
+    def add(self, segment: Dict[str, Any]) -> None:
+        self.update(lambda segments: [s for s in segments if s['file'] != segment['file']] + [segment])
+
+    def rename(self, old: str, new: str, **fields: Any) -> None:
+        def change(segments):
+            for segment in segments:
+                if segment['file'] == old:
+                    segment.update(fields, file=new)
+            return segments
+        self.update(change)
+
+    def overlapping(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Segments with records in ``[since, until)``, oldest first"""
+        return sorted((segment for segment in self.load()
+                       if (since is None or segment['end'] >= since)
+                       and (until is None or segment['start'] < until)),
+                      key=lambda segment: segment['start'])
+
+class _Compressor:
+    """One background thread compressing rotated segments for every handler in the process"""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='pigeonhole-log-compressor', daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                job()
+            except Exception:
+                logging.getLogger('pigeonhole.logging').exception("Log segment compression failed")
+            finally:
+                self._queue.task_done()
+
+    def join(self) -> None:
+        """Wait until every submitted segment has been compressed"""
+        self._queue.join()
+
+_compressor = _Compressor()
+
+class SegmentedFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    Writes ``<log_dir>/<name>_YYYYMMDD<suffix>``, rolling over at local
+    midnight and at ``max_bytes``.
+
+    Rotated segments are indexed and handed to a background thread for
+    compression (``compress``: ``"gzip"``, ``"zstd"``, or None/``"none"``), so the
+    thread writing the log only pays for a rename. On start-up, day files
+    left by an earlier run, and segments it had not finished compressing,
+    are rotated and compressed as well.
+    """
+
+    def __init__(self, log_dir: str, name: str, suffix: str = '.log', max_bytes: int = 10*1024*1024,
+                 compress: Optional[str] = 'gzip', retention_days: Optional[float] = 30,
+                 encoding: str = 'utf-8'):
+        if compress == 'none':
+            compress = None
+        if compress == 'zstd' and zstandard is None:
+            compress = 'gzip'
+        if compress is not None and compress not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown log compression: {compress}")
+        self.log_dir = Path(log_dir)
+        self.name_prefix = name
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.retention_days = retention_days
+        self.index = SegmentIndex(self.log_dir / f"{name}_segments.json")
+        self.day = datetime.now().strftime('%Y%m%d')
+        self._day_pattern = re.compile(re.escape(name) + r'_(\d{8})' + re.escape(suffix) + '$')
+        self._recover()
+        super().__init__(str(self._active_path()), 'a', encoding=encoding)
+        self._open_segment()
+
+    def _active_path(self) -> Path:
+        return self.log_dir / f"{self.name_prefix}_{self.day}{self.suffix}"
+
+    def _open_segment(self) -> None:
+        """Reset the range of the active file; one reopened after a restart started no earlier than its day"""
+        path = self._active_path()
+        existing = path.exists() and path.stat().st_size > 0
+        self.start: Optional[float] = _day_start(self.day) if existing else None
+        self.end: Optional[float] = path.stat().st_mtime if existing else None
+        self.records: Optional[int] = None if existing else 0  # unknown for a file an earlier run wrote to
+        self.rollover_at = (datetime.strptime(self.day, '%Y%m%d') + timedelta(days=1)).timestamp()
+
+    def _recover(self) -> None:
+        """Compress indexed segments that are still plain, then rotate earlier days' files"""
+        if self.compress is not None:
+            for segment in self.index.load():
+                if segment['file'].endswith(self.suffix) and (self.log_dir / segment['file']).exists():
+                    _compressor.submit(lambda file=segment['file']: self._compress(file))
+        for path in sorted(self.log_dir.glob(f"{self.name_prefix}_*{self.suffix}")):
+            match = self._day_pattern.match(path.name)
+            if match and match.group(1) < self.day and path.stat().st_size > 0:
+                self._rotate(path, match.group(1), _day_start(match.group(1)), path.stat().st_mtime, None)
+
+    def shouldRollover(self, record) -> bool:
+        if record.created >= self.rollover_at:
+            return True
+        if self.stream is None:
+            self.stream = self._open()
+        if self.max_bytes > 0 and self.stream.tell() >= self.max_bytes:
+            return True
+        return False
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        path = self._active_path()
+        if path.exists() and path.stat().st_size > 0:
+            self._rotate(path, self.day, self.start if self.start is not None else _day_start(self.day),
+                         self.end if self.end is not None else time.time(), self.records)
+        self.day = datetime.now().strftime('%Y%m%d')
+        self.baseFilename = os.path.abspath(self._active_path())
+        self.stream = self._open()
+        self._open_segment()
+
+    def _rotate(self, path: Path, day: str, start: float, end: float, records: Optional[int]) -> None:
+        taken = {segment['file'].split(self.suffix)[0] for segment in self.index.load()}
+        number = 1
+        while (f"{self.name_prefix}_{day}.{number}" in taken
+               or any(self.log_dir.glob(f"{self.name_prefix}_{day}.{number}{self.suffix}*"))):
+            number += 1
+        segment = self.log_dir / f"{self.name_prefix}_{day}.{number}{self.suffix}"
+        os.replace(path, segment)
+        self.index.add({'file': segment.name, 'start': round(start, 3), 'end': round(end, 3),
+                        'records': records, 'bytes': segment.stat().st_size})
+        if self.compress is not None:
+            _compressor.submit(lambda: self._compress(segment.name))
+        if self.retention_days is not None:
+            _compressor.submit(self._expire)
+
+    def _compress(self, file: str) -> None:
+        source = self.log_dir / file
+        target = source.with_name(file + COMPRESSION_SUFFIXES[self.compress])
+        tmp = target.with_name(target.name + '.tmp')
+        with open(source, 'rb') as src, self._compressed_writer(tmp) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, target)
+        self.index.rename(file, target.name, compressed_bytes=target.stat().st_size)
+        source.unlink()
+
+    def _compressed_writer(self, path: Path) -> IO:
+        if self.compress == 'zstd':
+            return zstandard.open(path, 'wb')
+        return gzip.open(path, 'wb', compresslevel=6)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.retention_days * 86400
+        expired = [segment['file'] for segment in self.index.load() if segment['end'] < cutoff]
+        if not expired:
+            return
+        for file in expired:
+            try:
+                (self.log_dir / file).unlink()
+            except FileNotFoundError:
+                pass
+        self.index.update(lambda segments: [s for s in segments if s['file'] not in expired])
+
+    def emit(self, record) -> None:
+        super().emit(record)
+        if self.start is None:
+            self.start = record.created
+        self.end = record.created
+        if self.records is not None:
+            self.records += 1
+
+    def close(self) -> None:
+        super().close()
+        _compressor.join()
@@ -2,15 +2,362 @@
 """
 Pigeonhole Logging Configuration
 Centralized logging setup with multiple handlers and formatters
+
+Log calls only put the record on a bounded queue; a listener thread formats
+it and writes it to the console and log files, so ADB worker threads and the
+asyncio monitor never wait on disk I/O. When the queue is full, records are
+dropped and counted rather than blocking the caller.
+
+In structured mode (``structured=True`` or ``PIGEONHOLE_LOG_FORMAT=json``)
+every record is also written as one JSON object per line to
+pigeonhole_events_YYYYMMDD.jsonl, carrying the fields in ``EVENT_FIELDS``.
+``log_context`` and ``operation`` attach them without changing the log calls
+inside; scripts/pigeonhole_log_query.py loads the files into SQLite.
+
+When a subnet drops, every device fails the same way at once. RateLimitFilter
+lets each message template through at a steady rate and replaces the rest
+with periodic "Suppressed N similar messages" summaries; SamplingFilter keeps
+a fraction of DEBUG records. Both apply to the console and text log files
+only; the JSON event log keeps every record.
+
+Hot paths pass arguments rather than f-strings (or a ``lazy`` message), so a
+record below its logger's level costs one cached level check. ``levels`` /
+``PIGEONHOLE_LOG_LEVELS`` raises chatty subsystems above DEBUG, e.g.
+``PIGEONHOLE_LOG_LEVELS=pigeonhole.adb=INFO,pigeonhole.customizer=INFO``.
 """
 
+import atexit
+import collections
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
+import re
 import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pigeonhole_log_rotation import SegmentedFileHandler
+
+# Argument types that cannot change between the log call and the listener formatting the record
+IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+# Structured fields, set through log_context/operation or ``extra=``
+EVENT_FIELDS = ('device_id', 'operation', 'duration_ms', 'outcome', 'run_id', 'correlation_id')
+
+# Identifies every event from this process; set PIGEONHOLE_RUN_ID to share one across processes
+RUN_ID = os.getenv('PIGEONHOLE_RUN_ID') or uuid.uuid4().hex[:12]
+
+_log_context: ContextVar[Dict[str, Any]] = ContextVar('pigeonhole_log_context', default={})
+
+# Level names accepted by set_level, set_subsystem_level and PIGEONHOLE_LOG_LEVELS
+LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+# Set once a ContextFilter exists; until then nothing reads log_context and operation can skip it
+_context_read = False
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=`` or the context
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime'}
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Attach ``fields`` (e.g. ``device_id``) to every record logged inside the
+    block, in this thread or asyncio task only. None values are ignored.
+    """
+    fields = {key: value for key, value in fields.items() if value is not None}
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+def _operation_message(name: str) -> str:
+    # The name is part of the template, so rate limiting groups outcomes per operation
+    return name.replace('%', '%%') + " %s in %.0f ms"
+
+@contextmanager
+def operation(logger: logging.Logger, name: str, device_id: Optional[str] = None,
+              level: int = logging.DEBUG, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block as one operation and log its outcome when it ends.
+
+    Records inside the block carry ``operation``, ``device_id`` and a fresh
+    ``correlation_id``. The block may set ``result['outcome']`` (default
+    ``"ok"``; ``"error"`` if it raises); any outcome other than ok is logged
+    at WARNING instead of ``level``, unless the block also sets
+    ``result['reported']`` because it has logged the failure itself.
+    """
+    result: Dict[str, Any] = {'outcome': 'ok'}
+    started = time.perf_counter()
+    if not _context_read and not logger.isEnabledFor(level):
+        # Nobody reads the context and a successful run logs nothing: skip the id and the context
+        try:
+            yield result
+        except BaseException:
+            result['outcome'] = 'error'
+            raise
+        finally:
+            outcome = result['outcome']
+            if outcome != 'ok' and not result.get('reported'):
+                duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                logger.warning(_operation_message(name), outcome, duration_ms,
+                               extra={'duration_ms': duration_ms, 'outcome': outcome})
+        return
+    with log_context(operation=name, device_id=device_id, correlation_id=uuid.uuid4().hex[:12], **fields):
+        try:
+            yield result
+        except BaseException:
+            result['outcome'] = 'error'
+            raise
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            outcome = result['outcome']
+            quiet = outcome == 'ok' or result.get('reported')
+            logger.log(level if quiet else logging.WARNING, _operation_message(name),
+                       outcome, duration_ms, extra={'duration_ms': duration_ms, 'outcome': outcome})
+
+class LazyMessage:
+    """A log message built by ``fn(*args)`` only if a handler is going to write the record"""
+    __slots__ = ('fn', 'args')
+    
+    def __init__(self, fn: Callable[..., Any], args: Tuple[Any, ...]):
+        self.fn = fn
+        self.args = args
+    
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+def lazy(fn: Callable[..., Any], *args: Any) -> LazyMessage:
+    """
+    A message for values too costly to compute for a disabled level, e.g.
+    ``logger.debug(lazy(describe_image, path))``. For plain values pass them
+    as log arguments instead.
+    """
+    return LazyMessage(fn, args)
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """``"pigeonhole.adb=INFO,pigeonhole.customizer=WARNING"`` as logger name -> level"""
+    levels = {}
+    for item in spec.split(','):
+        name, _, level = item.strip().partition('=')
+        if name and level.strip().upper() in LEVELS:
+            levels[name.strip()] = LEVELS[level.strip().upper()]
+    return levels
+
+class ContextFilter(logging.Filter):
+    """Copies the run id and the current log_context onto records, in the thread that logged them"""
+    
+    def __init__(self, name: str = ''):
+        global _context_read
+        super().__init__(name)
+        _context_read = True
+    
+    def filter(self, record):
+        if not hasattr(record, 'run_id'):
+            record.run_id = RUN_ID
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+# Digit runs (addresses, ports, counts) in a pre-formatted message; masked so it groups as one template
+_VARIABLE_PARTS = re.compile(r'0x[0-9a-fA-F]+|\d+')
+
+def message_template(record: logging.LogRecord) -> str:
+    """
+    The unformatted message (``"Failed to connect to %s: %s"``), or for a
+    message formatted before the call, the message with its numbers masked
+    (``"Failed to connect to #.#.#.#:#: ..."``).
+    """
+    msg = str(record.msg)
+    return msg if record.args else _VARIABLE_PARTS.sub('#', msg)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a random ``rate`` fraction of records at or below ``level``.
+
+    The decision is stored on the record, so one instance can be shared by
+    several handlers and a record is either kept by all of them or dropped.
+    """
+    
+    def __init__(self, rate: float = 0.1, level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+        self.sampled_out = 0
+    
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        keep = record.__dict__.get('_sampled')
+        if keep is None:
+            keep = record._sampled = random.random() < self.rate
+            if not keep:
+                self.sampled_out += 1
+        return keep
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'rate': self.rate, 'sampled_out': self.sampled_out}
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated', 'suppressed', 'suppressed_since')
+    
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.suppressed = 0
+        self.suppressed_since = updated
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per (logger, level, message template) for records from
+    ``level`` up to, but not including, CRITICAL.
+    
+    Each template may log ``burst`` records at once and ``rate`` per second
+    after that; the rest are counted. Once anything has been suppressed, a
+    timer thread logs the counts every ``summary_interval`` seconds, at the
+    suppressed records' level, as "Suppressed N similar messages", whether
+    or not the storm is still going; ``close`` stops it. Templates are looked up by ``message_template``, so
+    log calls that pass arguments (``logger.error("... %s", ip)``) group
+    exactly. At most ``max_templates`` buckets are kept; the idlest is
+    evicted first. As with SamplingFilter, the decision is stored on the
+    record so the filter can be shared between handlers.
+    """
+    
+    def __init__(self, rate: float = 1.0, burst: int = 20, summary_interval: float = 60.0,
+                 level: int = logging.WARNING, max_templates: int = 1000):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.summary_interval = summary_interval
+        self.level = level
+        self.max_templates = max_templates
+        self.suppressed_total = 0
+        self._buckets: Dict[Tuple[str, int, str], _Bucket] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+    
+    def filter(self, record):
+        if not self.level <= record.levelno < logging.CRITICAL:
+            return True
+        allowed = record.__dict__.get('_rate_limited')
+        if allowed is not None:
+            return allowed
+        key = (record.name, record.levelno, message_template(record))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_templates:
+                    self._evict()
+                bucket = self._buckets[key] = _Bucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            allowed = bucket.tokens >= 1
+            if allowed:
+                bucket.tokens -= 1
+            else:
+                if not bucket.suppressed:
+                    bucket.suppressed_since = now
+                bucket.suppressed += 1
+                self.suppressed_total += 1
+                if self._timer is None and not self._closed.is_set():
+                    self._timer = threading.Thread(target=self._report, name='pigeonhole-log-summaries',
+                                                   daemon=True)
+                    self._timer.start()
+        record._rate_limited = allowed
+        return allowed
+    
+    def _report(self):
+        while not self._closed.wait(self.summary_interval):
+            self.flush()
+    
+    def _evict(self):
+        # Prefer buckets with nothing waiting to be reported, so counts are not lost
+        idle = min(self._buckets.items(), key=lambda item: (item[1].suppressed > 0, item[1].updated))
+        del self._buckets[idle[0]]
+    
+    def _take_summaries(self) -> List[Tuple[Tuple[str, int, str], int, float]]:
+        summaries = []
+        now = time.monotonic()
+        for key, bucket in self._buckets.items():
+            if bucket.suppressed:
+                summaries.append((key, bucket.suppressed, now - bucket.suppressed_since))
+                bucket.suppressed = 0
+        return summaries
+    
+    def _log_summaries(self, summaries, handlers: Optional[Sequence[logging.Handler]] = None):
+        # Logged outside the lock: the summaries pass through this filter again, marked as allowed
+        for (name, levelno, template), count, seconds in summaries:
+            logger = logging.getLogger(name)
+            record = logger.makeRecord(
+                name, levelno, __file__, 0,
+                "Suppressed %d similar messages in the last %.0fs: %r",
+                (count, max(1, seconds), template), None,
+                extra={'suppressed': count, '_rate_limited': True}
+            )
+            if handlers is None:
+                logger.handle(record)
+                continue
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+    
+    def flush(self, handlers: Optional[Sequence[logging.Handler]] = None) -> None:
+        """
+        Log the summaries of everything suppressed so far, through the loggers
+        or, once the queue in front of them has stopped, straight to ``handlers``
+        """
+        with self._lock:
+            summaries = self._take_summaries()
+        self._log_summaries(summaries, handlers)
+    
+    def stop(self) -> None:
+        """Stop the summary timer"""
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+    
+    def close(self, handlers: Optional[Sequence[logging.Handler]] = None) -> None:
+        """Stop the summary timer and log what is still unreported (see ``flush``)"""
+        self.stop()
+        self.flush(handlers)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'templates': len(self._buckets), 'suppressed': self.suppressed_total}
+
+class JSONLinesFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message, the EVENT_FIELDS set, and any other extras"""
+    
+    def format(self, record):
+        event = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and value is not None and not key.startswith('_'):
+                event[key] = value
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
 
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for console output"""
@@ -26,21 +373,138 @@ class ColoredFormatter(logging.Formatter):
     }
     
     def format(self, record):
-        # Add color to levelname
-        if hasattr(record, 'levelname') and record.levelname in self.COLORS:
-            colored_levelname = (
-                f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
-            )
-            record.levelname = colored_levelname
-        
-        return super().format(record)
+        # Add color to levelname, restoring it for the file handlers that format the same record
+        levelname = record.levelname
+        if levelname in self.COLORS:
+            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a QueueListener without formatting them or blocking.
+
+    Messages are formatted on the listener thread unless an argument is
+    mutable (a dict, list or object that may change before then). A full
+    queue drops the record and counts it in ``dropped`` by level; the count
+    is logged as a warning once the queue has room again.
+    """
+    
+    def __init__(self, maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped: Dict[str, int] = collections.Counter()
+        self._unreported = 0
+        self._drop_lock = threading.Lock()
+    
+    def handle(self, record):
+        # Queue.put_nowait is already thread-safe; skip the handler lock the base class takes
+        rv = self.filter(record)
+        if isinstance(rv, logging.LogRecord):
+            record = rv
+        if rv:
+            self.emit(record)
+        return rv
+    
+    def prepare(self, record):
+        args = record.args
+        if not isinstance(record.msg, str):
+            # A lazy message (or any object) may read state that changes before the listener runs
+            record.msg = record.getMessage()
+            record.args = None
+        elif args and not all(isinstance(arg, IMMUTABLE_ARGS) for arg in
+                            (args.values() if isinstance(args, dict) else args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+    
+    def emit(self, record):
+        try:
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped[record.levelname] += 1
+                self._unreported += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        if self._unreported:
+            self._report_drops()
+    
+    def _report_drops(self):
+        with self._drop_lock:
+            count, self._unreported = self._unreported, 0
+        record = logging.LogRecord('pigeonhole.logging', logging.WARNING, __file__, 0,
+                                   "Log queue full: dropped %d records", (count,), None)
+        try:
+            self.enqueue(record)
+        except queue.Full:
+            with self._drop_lock:
+                self._unreported += count
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'queued': self.queue.qsize(), 'maxsize': self.queue.maxsize,
+                'dropped': dict(self.dropped)}
 
 class PigeonholeLogger:
-    """Centralized logging manager for Pigeonhole applications"""
+    """
+    Centralized logging manager for Pigeonhole applications.
+    
+    The root logger gets a single BoundedQueueHandler; the console and file
+    handlers run on a QueueListener thread. Caller information
+    (``funcName:lineno``) costs a stack walk on every log call, so it is only
+    collected with ``caller_info=True`` or ``PIGEONHOLE_LOG_CALLER=1``.
+    
+    ``rate_limit`` is the records per second each WARNING/ERROR message
+    template may log after a burst of ``rate_burst`` (``PIGEONHOLE_LOG_RATE_LIMIT``,
+    default 1; 0 turns limiting off). ``debug_sample_rate`` is the fraction of
+    DEBUG records kept (``PIGEONHOLE_LOG_DEBUG_SAMPLE``, default 1: all).
+    ``levels`` sets the level of individual subsystems' loggers, as
+    ``{"pigeonhole.adb": "INFO"}`` or ``"name=LEVEL,..."`` (``PIGEONHOLE_LOG_LEVELS``); a record below its
+    logger's level is never created, so this is cheaper than filtering it at
+    the file handler.
+    
+    Log files roll over at midnight and by size; rotated segments are
+    compressed in the background (``compress``/``PIGEONHOLE_LOG_COMPRESS``:
+    gzip, zstd or none) and deleted after ``retention_days``
+    (``PIGEONHOLE_LOG_RETENTION_DAYS``, default 30). See pigeonhole_log_rotation.
+    """
     
-    def __init__(self, log_dir: str = "M:/logs"):
+    def __init__(self, log_dir: str = "M:/logs", queue_size: int = 10000,
+                 caller_info: Optional[bool] = None, structured: Optional[bool] = None,
+                 rate_limit: Optional[float] = None, rate_burst: int = 20,
+                 debug_sample_rate: Optional[float] = None,
+                 levels: Optional[Union[str, Dict[str, str]]] = None,
+                 compress: Optional[str] = None, retention_days: Optional[float] = None):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
+        if caller_info is None:
+            caller_info = os.getenv('PIGEONHOLE_LOG_CALLER', '0') == '1'
+        if structured is None:
+            structured = os.getenv('PIGEONHOLE_LOG_FORMAT', 'text') == 'json'
+        if rate_limit is None:
+            rate_limit = float(os.getenv('PIGEONHOLE_LOG_RATE_LIMIT', '1'))
+        if debug_sample_rate is None:
+            debug_sample_rate = float(os.getenv('PIGEONHOLE_LOG_DEBUG_SAMPLE', '1'))
+        if levels is None:
+            levels = os.getenv('PIGEONHOLE_LOG_LEVELS', '')
+        if compress is None:
+            compress = os.getenv('PIGEONHOLE_LOG_COMPRESS', 'gzip')
+        if retention_days is None:
+            retention_days = float(os.getenv('PIGEONHOLE_LOG_RETENTION_DAYS', '30'))
+        self.levels: Dict[str, int] = parse_levels(levels) if isinstance(levels, str) else {
+            name: LEVELS[level.upper()] for name, level in levels.items()}
+        self.caller_info = caller_info
+        self.structured = structured
+        self.queue_size = queue_size
+        self.compress = compress
+        self.retention_days = retention_days if retention_days > 0 else None
+        self.rate_limit = RateLimitFilter(rate_limit, rate_burst) if rate_limit > 0 else None
+        self.sampling = SamplingFilter(debug_sample_rate) if debug_sample_rate < 1 else None
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
         self._setup_logging()
     
     def _setup_logging(self):
@@ -53,51 +517,103 @@ class PigeonholeLogger:
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
         
+        if not self.caller_info:
+            # Documented switch: Logger.findCaller then skips the stack walk
+            logging._srcfile = None
+        
         # Console handler with colors
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        self.console_handler = logging.StreamHandler(sys.stdout)
+        self.console_handler.setLevel(logging.INFO)
         
         console_formatter = ColoredFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%H:%M:%S'
         )
-        console_handler.setFormatter(console_formatter)
-        
-        # File handler for all logs
-        log_file = self.log_dir / f"pigeonhole_{datetime.now().strftime('%Y%m%d')}.log"
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
+        self.console_handler.setFormatter(console_formatter)
+        
+        # File handler for all logs: pigeonhole_YYYYMMDD.log, rotated daily and by size
+        file_handler = SegmentedFileHandler(
+            self.log_dir, "pigeonhole",
+            max_bytes=10*1024*1024,  # 10MB
+            compress=self.compress,
+            retention_days=self.retention_days
         )
         file_handler.setLevel(logging.DEBUG)
         
+        caller = ' - %(funcName)s:%(lineno)d' if self.caller_info else ''
         file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
+            f'%(asctime)s - %(name)s - %(levelname)s{caller} - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
         
         # Error file handler for errors only
-        error_file = self.log_dir / f"pigeonhole_errors_{datetime.now().strftime('%Y%m%d')}.log"
-        error_handler = logging.handlers.RotatingFileHandler(
-            error_file,
-            maxBytes=5*1024*1024,   # 5MB
-            backupCount=3,
-            encoding='utf-8'
+        error_handler = SegmentedFileHandler(
+            self.log_dir, "pigeonhole_errors",
+            max_bytes=5*1024*1024,   # 5MB
+            compress=self.compress,
+            retention_days=self.retention_days
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
+        handlers = [self.console_handler, file_handler, error_handler]
+        # Only the text logs are thinned out; the JSON events below keep every record
+        for handler in handlers:
+            for noise_filter in (self.sampling, self.rate_limit):
+                if noise_filter is not None:
+                    handler.addFilter(noise_filter)
         
-        # Add handlers to root logger
-        root_logger.addHandler(console_handler)
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(error_handler)
+        # Loggers only enqueue; the listener thread formats and writes
+        self.queue_handler = BoundedQueueHandler(self.queue_size)
+        
+        if self.structured:
+            events_handler = SegmentedFileHandler(
+                self.log_dir, "pigeonhole_events", suffix=".jsonl",
+                max_bytes=50*1024*1024,  # 50MB
+                compress=self.compress,
+                retention_days=self.retention_days
+            )
+            events_handler.setLevel(logging.DEBUG)
+            events_handler.setFormatter(JSONLinesFormatter())
+            handlers.append(events_handler)
+            # Context is per thread/task, so it has to be read before the record is queued
+            self.queue_handler.addFilter(ContextFilter())
+        
+        self.listener = logging.handlers.QueueListener(
+            self.queue_handler.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        atexit.register(self.shutdown)
+        root_logger.addHandler(self.queue_handler)
         
         # Set specific logger levels
         logging.getLogger('PIL').setLevel(logging.WARNING)  # Reduce PIL verbosity
         logging.getLogger('urllib3').setLevel(logging.WARNING)  # Reduce requests verbosity
+        for name, level in self.levels.items():
+            logging.getLogger(name).setLevel(level)
+    
+    def shutdown(self) -> None:
+        """Write out everything still queued and stop the listener thread"""
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            if self.rate_limit is not None:
+                self.rate_limit.stop()
+            logging.getLogger().removeHandler(self.queue_handler)
+            listener.stop()
+            # The filter runs on the listener thread, so counts are final only once the queue is drained
+            if self.rate_limit is not None:
+                self.rate_limit.close(listener.handlers)
+            for handler in listener.handlers:
+                handler.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, records dropped by level, and what the rate limit and sampling filtered out"""
+        stats = self.queue_handler.stats()
+        if self.rate_limit is not None:
+            stats['rate_limit'] = self.rate_limit.stats()
+        if self.sampling is not None:
+            stats['sampling'] = self.sampling.stats()
+        return stats
     
     def get_logger(self, name: str) -> logging.Logger:
         """Get a logger with the specified name"""
@@ -105,34 +621,31 @@ class PigeonholeLogger:
     
     def set_level(self, level: str) -> None:
         """Set global logging level"""
-        level_map = {
-            'DEBUG': logging.DEBUG,
-            'INFO': logging.INFO,
-            'WARNING': logging.WARNING,
-            'ERROR': logging.ERROR,
-            'CRITICAL': logging.CRITICAL
-        }
-        
-        if level.upper() in level_map:
-            logging.getLogger().setLevel(level_map[level.upper()])
+        if level.upper() in LEVELS:
+            logging.getLogger().setLevel(LEVELS[level.upper()])
         else:
             raise ValueError(f"Invalid log level: {level}")
     
+    def set_subsystem_level(self, name: str, level: str) -> None:
+        """Set one subsystem's level, e.g. ``set_subsystem_level('pigeonhole.adb', 'INFO')``"""
+        if level.upper() not in LEVELS:
+            raise ValueError(f"Invalid log level: {level}")
+        self.levels[name] = LEVELS[level.upper()]
+        logging.getLogger(name).setLevel(self.levels[name])
+    
     def enable_debug(self) -> None:
         """Enable debug logging"""
         self.set_level('DEBUG')
         
         # Update console handler to show debug messages
-        for handler in logging.getLogger().handlers:
-            if isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout:
-                handler.setLevel(logging.DEBUG)
+        self.console_handler.setLevel(logging.DEBUG)
     
     def disable_console(self) -> None:
         """Disable console logging (file only)"""
-        root_logger = logging.getLogger()
-        for handler in root_logger.handlers[:]:
-            if isinstance(handler, logging.StreamHandler) and handler.stream == sys.stdout:
-                root_logger.removeHandler(handler)
+        if self.listener is not None:
+            # The listener thread reads this tuple per record, so replacing it is safe
+            self.listener.handlers = tuple(handler for handler in self.listener.handlers
+                                           if handler is not self.console_handler)
     
     def log_system_info(self):
         """Log system information for debugging"""
@@ -153,12 +666,13 @@ class PigeonholeLogger:
 # Global logger instance
 _logger_instance: Optional[PigeonholeLogger] = None
 
-def setup_logging(log_dir: str = "M:/logs", debug: bool = False) -> PigeonholeLogger:
+def setup_logging(log_dir: str = "M:/logs", debug: bool = False,
+                  structured: Optional[bool] = None) -> PigeonholeLogger:
     """Setup global logging configuration"""
     global _logger_instance
     
     if _logger_instance is None:
-        _logger_instance = PigeonholeLogger(log_dir)
+        _logger_instance = PigeonholeLogger(log_dir, structured=structured)
         
         if debug:
             _logger_instance.enable_debug()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Playback Startup Benchmark
+Plays test media over JSON-RPC and reports time-to-first-frame, seek latency and stalled frames
+
+Usage: python scripts/pigeonhole_playback_bench.py --hosts 192.168.1.130 --media http://10.0.0.2/test/1080p.mkv [--repetitions 10]
+       python scripts/pigeonhole_playback_bench.py --hosts 192.168.1.130 --media smb://nas/test.mkv --profiles corporate home --adb adb
+"""
+
+import argparse
+import json
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pigeonhole_kodi_events import PLAYER_STOPPED, KodiEventListener
+from pigeonhole_kodi_rpc import KodiRPCClient, KodiRPCError
+
+FIRST_FRAME_EVENT = "Player.OnAVStart"
+SEEK_EVENT = "Player.OnSeek"
+METRICS = ("time_to_first_frame", "seek_latency", "stall_frames")
+PERCENTILES = (50, 90, 95)
+# Used when Kodi does not report the stream's frame rate
+DEFAULT_FPS = 25.0
+
+logger = logging.getLogger('pigeonhole.playback_bench')
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile; None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def player_seconds(player_time: Dict[str, int]) -> float:
+    """Seconds from a Kodi ``Global.Time`` object"""
+    return (player_time.get("hours", 0) * 3600 + player_time.get("minutes", 0) * 60
+            + player_time.get("seconds", 0) + player_time.get("milliseconds", 0) / 1000)
+
+@dataclass
+class PlaybackSample:
+    """One play-seek-stop repetition; metrics are None when that step failed"""
+    repetition: int
+    time_to_first_frame: Optional[float] = None
+    seek_latency: Optional[float] = None
+    stall_frames: Optional[float] = None
+    error: Optional[str] = None
+
+@dataclass
+class PlaybackReport:
+    """All repetitions for one device under one advancedsettings profile"""
+    host: str
+    profile: str
+    media: str
+    samples: List[PlaybackSample] = field(default_factory=list)
+
+    @property
+    def failures(self) -> int:
+        return sum(1 for sample in self.samples if sample.error)
+
+    def values(self, metric: str) -> List[float]:
+        return [getattr(sample, metric) for sample in self.samples if getattr(sample, metric) is not None]
+
+    def percentiles(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """``{metric: {"p50": ..., "p90": ..., "p95": ..., "max": ...}}``"""
+        stats = {}
+        for metric in METRICS:
+            values = self.values(metric)
+            stats[metric] = {f"p{pct}": percentile(values, pct) for pct in PERCENTILES}
+            stats[metric]["max"] = max(values) if values else None
+        return stats
+
+    def summary(self) -> str:
+        stats = self.percentiles()
+
+        def fmt(metric: str, unit: str) -> str:
+            s = stats[metric]
+            if s["p50"] is None:
+                return f"{metric} n/a"
+            return f"{metric} p50 {s['p50']:.2f}{unit} p95 {s['p95']:.2f}{unit}"
+
+        return (f"{self.host} [{self.profile}]: {len(self.samples) - self.failures}/{len(self.samples)} ok, "
+                f"{fmt('time_to_first_frame', 's')}, {fmt('seek_latency', 's')}, {fmt('stall_frames', '')}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"host": self.host, "profile": self.profile, "media": self.media,
+                "percentiles": self.percentiles(), "samples": [asdict(sample) for sample in self.samples]}
+
+class PlaybackBenchmark:
+    """
+    Repeats play, seek and stop of one media item on one device.
+
+    Time-to-first-frame runs from the ``Player.Open`` request to Kodi's
+    ``Player.OnAVStart`` notification, which Kodi sends once the first video
+    frame is rendered. Seek latency runs from ``Player.Seek`` until
+    ``Player.GetProperties`` shows the playback clock moving again at a
+    non-zero speed; ``Player.OnSeek`` only says the request was handled, and
+    the player may still be refilling its cache. The clock is polled every
+    ``poll_interval`` seconds.
+
+    Kodi's JSON-RPC does not expose the renderer's dropped-frame counter, so
+    stall frames are an estimate: over ``observe`` seconds from the moment
+    playback resumed, the playback time that fell behind wall time,
+    multiplied by the stream's frame rate.
+    """
+
+    def __init__(self, rpc: KodiRPCClient, events: KodiEventListener, media: str,
+                 repetitions: int = 10, timeout: float = 30.0, seek_percentage: float = 50.0,
+                 observe: float = 5.0, poll_interval: float = 0.1):
+        self.rpc = rpc
+        self.events = events
+        self.media = media
+        self.repetitions = repetitions
+        self.timeout = timeout
+        self.seek_percentage = seek_percentage
+        self.observe = observe
+        self.poll_interval = poll_interval
+
+    def _frame_rate(self) -> float:
+        try:
+            labels = self.rpc.call("XBMC.GetInfoLabels", {"labels": ["Player.Process(videofps)"]})
+            return float(labels.get("Player.Process(videofps)") or DEFAULT_FPS)
+        except (KodiRPCError, ValueError):
+            return DEFAULT_FPS
+
+    def _player_state(self, player_id: int) -> Tuple[float, float]:
+        """Playback clock in seconds and player speed (0 while paused or buffering)"""
+        properties = self.rpc.call("Player.GetProperties", {"playerid": player_id, "properties": ["time", "speed"]})
+        return player_seconds(properties.get("time", {})), float(properties.get("speed") or 0)
+
+    def _wait_playing(self, player_id: int, deadline: float) -> Optional[Tuple[float, float]]:
+        """
+        Monotonic time and playback clock at which the clock started advancing,
+        or None if it has not by ``deadline``. The start is placed between the
+        two polls that saw it move, by how far it had moved.
+        """
+        clock, _ = self._player_state(player_id)
+        polled = time.monotonic()
+        while polled < deadline:
+            time.sleep(self.poll_interval)
+            now_clock, speed = self._player_state(player_id)
+            now = time.monotonic()
+            if speed > 0 and now_clock > clock:
+                resumed = max(polled, now - (now_clock - clock) / speed)
+                return resumed, now_clock - (now - resumed) * speed
+            clock, polled = now_clock, now
+        return None
+
+    def _stop(self, player_id: Optional[int]) -> None:
+        if player_id is None:
+            return
+        waiter = self.events.expect(PLAYER_STOPPED)
+        try:
+            self.rpc.call("Player.Stop", {"playerid": player_id})
+        except KodiRPCError as e:
+            waiter.cancel()
+            logger.warning("Player.Stop on %s failed: %s", self.rpc.host, e)
+            return
+        waiter.wait(self.timeout)
+
+    def run_once(self, repetition: int) -> PlaybackSample:
+        sample = PlaybackSample(repetition)
+        player_id: Optional[int] = None
+        try:
+            waiter = self.events.expect(FIRST_FRAME_EVENT)
+            started = time.monotonic()
+            self.rpc.call("Player.Open", {"item": {"file": self.media}})
+            event = waiter.wait(self.timeout)
+            if event is None:
+                sample.error = f"no first frame within {self.timeout:.0f}s"
+                player_id = 1  # video player; stop whatever did start
+                return sample
+            sample.time_to_first_frame = event.received_at - started
+            player_id = ((event.data or {}).get("player") or {}).get("playerid", 1)
+
+            waiter = self.events.expect(SEEK_EVENT)
+            started = time.monotonic()
+            self.rpc.call("Player.Seek", {"playerid": player_id, "value": {"percentage": self.seek_percentage}})
+            if waiter.wait(self.timeout) is None:
+                sample.error = f"seek not completed within {self.timeout:.0f}s"
+                return sample
+            resumed = self._wait_playing(player_id, started + self.timeout)
+            if resumed is None:
+                sample.error = f"playback did not resume within {self.timeout:.0f}s of the seek"
+                return sample
+            wall_start, clock_start = resumed
+            sample.seek_latency = wall_start - started
+
+            fps = self._frame_rate()
+            time.sleep(max(0.0, wall_start + self.observe - time.monotonic()))
+            clock_end, _ = self._player_state(player_id)
+            behind = max(0.0, (time.monotonic() - wall_start) - (clock_end - clock_start))
+            sample.stall_frames = round(behind * fps, 1)
+            return sample
+        except KodiRPCError as e:
+            sample.error = str(e)
+            return sample
+        finally:
+            self._stop(player_id)
+
+    def run(self, profile: str = "current") -> PlaybackReport:
+        report = PlaybackReport(self.rpc.host, profile, self.media)
+        for repetition in range(1, self.repetitions + 1):
+            sample = self.run_once(repetition)
+            report.samples.append(sample)
+            if sample.error:
+                logger.warning("%s repetition %d: %s", self.rpc.host, repetition, sample.error)
+            else:
+                logger.debug("%s repetition %d: %.2fs to first frame", self.rpc.host, repetition,
+                             sample.time_to_first_frame)
+        logger.info(report.summary())
+        return report
+
+def benchmark_device(host: str, media: str, profile: str = "current", port: int = 8080,
+                     event_port: int = 9090, **kwargs) -> PlaybackReport:
+    """Run a PlaybackBenchmark against ``host`` with its own notification listener"""
+    rpc = KodiRPCClient(host, port)
+    with KodiEventListener(host, event_port) as events:
+        if not events.wait_connected(10):
+            raise KodiRPCError(f"No notification stream on {host}:{event_port}")
+        return PlaybackBenchmark(rpc, events, media, **kwargs).run(profile)
+
+def apply_advancedsettings_profile(host: str, adb_path: str, profile: str, adb_port: int = 5555,
+                                   http_port: int = 8080) -> bool:
+    """Push the generated advancedsettings.xml for ``profile`` and restart Kodi until it answers again"""
+    from pigeonhole_adb import ADBClient
+    from pigeonhole_advancedsettings import deploy_advancedsettings
+    from pigeonhole_readiness import KODI_PACKAGE, kodi_prober, wait_process_exit
+
+    adb = ADBClient(adb_path, serial=f"{host}:{adb_port}")
+    if not deploy_advancedsettings(adb, profile).ok:
+        return False
+    adb.shell(["am", "force-stop", KODI_PACKAGE])
+    wait_process_exit(adb)
+    adb.shell(["am", "start", "-n", f"{KODI_PACKAGE}/.Splash"])
+    readiness = kodi_prober(host, adb=adb, http_port=http_port).wait_ready()
+    logger.info("%s with profile %s: %s", host, profile, readiness.describe())
+    return readiness.ready
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kodi playback startup over JSON-RPC")
+    parser.add_argument("--hosts", nargs="+", required=True, help="Device IPs")
+    parser.add_argument("--media", required=True, help="Local path or LAN URL of the test media")
+    parser.add_argument("--repetitions", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each notification")
+    parser.add_argument("--observe", type=float, default=5.0, help="Seconds of playback sampled for stalls after the seek")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--event-port", type=int, default=9090)
+    parser.add_argument("--profiles", nargs="*", default=[],
+                        help="DeviceProfile names; each is deployed as advancedsettings.xml before its run")
+    parser.add_argument("--adb", default="adb", help="Path to adb (needed with --profiles)")
+    parser.add_argument("--json", help="Also write the reports to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    reports: List[PlaybackReport] = []
+    for host in args.hosts:
+        for profile in args.profiles or ["current"]:
+            if args.profiles and not apply_advancedsettings_profile(host, args.adb, profile, http_port=args.port):
+                print(f"{host} [{profile}]: could not apply profile, skipped")
+                continue
+            try:
+                reports.append(benchmark_device(host, args.media, profile, args.port, args.event_port,
+                                                repetitions=args.repetitions, timeout=args.timeout,
+                                                observe=args.observe))
+            except KodiRPCError as e:
+                print(f"{host} [{profile}]: FAILED: {e}")
+
+    for report in reports:
+        print(report.summary())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([report.to_dict() for report in reports], f, indent=2)
+
+if __name__ == "__main__":
+    main()
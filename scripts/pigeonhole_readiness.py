@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Kodi Readiness Prober
+Exponential-backoff readiness probing after Kodi restarts, with measured time-to-ready
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pigeonhole_adb import ADBClient
+from pigeonhole_kodi_rpc import KodiRPCClient
+
+KODI_PACKAGE = "org.xbmc.kodi"
+
+# Fleet metrics database shared with fleet-monitoring.py
+FLEET_DB = Path(os.getenv("PIGEONHOLE_FLEET_DB", "/opt/pigeonhole/data/fleet.db"))
+TIME_TO_READY_METRIC = "kodi_time_to_ready_seconds"
+
+Check = Tuple[str, Callable[[], bool]]
+
+logger = logging.getLogger('pigeonhole.readiness')
+
+def adb_process_check(adb: ADBClient, package: str = KODI_PACKAGE) -> Check:
+    """Passes once ``package`` has a running process on the device"""
+    def check() -> bool:
+        result = adb.shell(["pidof", package], timeout=5, retries=0)
+        return result.ok and bool(result.output)
+    return ("process", check)
+
+def tcp_port_check(host: str, port: int, timeout: float = 1.0) -> Check:
+    """Passes once ``host:port`` accepts TCP connections"""
+    def check() -> bool:
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return True
+        except OSError:
+            return False
+    return (f"port {port}", check)
+
+def jsonrpc_ping_check(rpc: KodiRPCClient, timeout: float = 2.0) -> Check:
+    """Passes once Kodi answers JSONRPC.Ping"""
+    return ("jsonrpc", lambda: rpc.ping(timeout=timeout))
+
+@dataclass
+class ReadinessResult:
+    """Outcome of one readiness wait"""
+    host: str
+    ready: bool
+    time_to_ready: float
+    attempts: int
+    # Seconds from the start of the wait until each check first passed
+    checks_passed: Dict[str, float] = field(default_factory=dict)
+    failed_check: Optional[str] = None
+
+    def describe(self) -> str:
+        stages = ", ".join(f"{name} {t:.1f}s" for name, t in self.checks_passed.items())
+        if self.ready:
+            return f"ready in {self.time_to_ready:.1f}s after {self.attempts} probes ({stages})"
+        return (f"not ready after {self.time_to_ready:.1f}s, waiting on {self.failed_check}"
+                + (f" ({stages})" if stages else ""))
+
+def poll(check: Callable[[], bool], deadline: float, initial_delay: float = 0.25,
+         max_delay: float = 4.0, factor: float = 2.0) -> Tuple[bool, int]:
+    """Call ``check`` with exponential backoff until it passes or ``deadline`` (monotonic) passes"""
+    delay = initial_delay
+    attempts = 0
+    while True:
+        attempts += 1
+        if check():
+            return True, attempts
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, attempts
+        time.sleep(min(delay, remaining))
+        delay = min(max_delay, delay * factor)
+
+def wait_process_exit(adb: ADBClient, package: str = KODI_PACKAGE, timeout: float = 5.0) -> bool:
+    """Wait for ``package`` to have no running process, e.g. after ``am force-stop``"""
+    _, running = adb_process_check(adb, package)
+    exited, _ = poll(lambda: not running(), time.monotonic() + timeout,
+                     initial_delay=0.1, max_delay=1.0)
+    return exited
+
+class ReadinessProber:
+    """
+    Waits for an ordered list of checks to pass, cheapest and earliest first.
+
+    Each probe runs the checks in order and stops at the first failure, so a
+    Kodi that is still launching costs one ``pidof`` rather than a timed-out
+    HTTP request. Probes back off exponentially up to ``max_delay`` and give
+    up at ``deadline`` seconds.
+    """
+
+    def __init__(self, host: str, checks: List[Check], deadline: float = 90.0,
+                 initial_delay: float = 0.25, max_delay: float = 4.0, factor: float = 2.0):
+        self.host = host
+        self.checks = checks
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.factor = factor
+
+    def wait_ready(self, started_at: Optional[float] = None) -> ReadinessResult:
+        """
+        Probe until every check passes. ``started_at`` (time.monotonic) is when
+        Kodi was started; time-to-ready is measured from it when given.
+        """
+        start = time.monotonic() if started_at is None else started_at
+        passed: Dict[str, float] = {}
+        failing: List[Optional[str]] = [None]
+
+        def probe() -> bool:
+            for name, check in self.checks:
+                if name in passed:
+                    continue
+                if not check():
+                    failing[0] = name
+                    return False
+                passed[name] = time.monotonic() - start
+            return True
+
+        ready, attempts = poll(probe, start + self.deadline, self.initial_delay,
+                               self.max_delay, self.factor)
+        result = ReadinessResult(
+            host=self.host,
+            ready=ready,
+            time_to_ready=time.monotonic() - start,
+            attempts=attempts,
+            checks_passed=passed,
+            failed_check=None if ready else failing[0]
+        )
+        logger.info("Kodi on %s %s", self.host, result.describe())
+        return result
+
+def kodi_prober(host: str, adb: Optional[ADBClient] = None, rpc: Optional[KodiRPCClient] = None,
+                http_port: int = 8080, deadline: float = 90.0, **kwargs) -> ReadinessProber:
+    """Standard Kodi prober: process running (when ADB is available), webserver port open, Ping answered"""
+    checks: List[Check] = []
+    if adb is not None:
+        checks.append(adb_process_check(adb))
+    checks.append(tcp_port_check(host, http_port))
+    checks.append(jsonrpc_ping_check(rpc or KodiRPCClient(host, http_port)))
+    return ReadinessProber(host, checks, deadline=deadline, **kwargs)
+
+def record_time_to_ready(result: ReadinessResult, db_path: Path = FLEET_DB) -> bool:
+    """Append a successful time-to-ready to the fleet metrics table that fleet-monitoring exports"""
+    if not result.ready:
+        return False
+    try:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(db_path))
+        try:
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS metrics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    device_id TEXT,
+                    timestamp TIMESTAMP,
+                    metric_name TEXT,
+                    metric_value REAL
+                )
+            ''')
+            connection.execute(
+                'INSERT INTO metrics (device_id, timestamp, metric_name, metric_value) VALUES (?, ?, ?, ?)',
+                (result.host, datetime.now(), TIME_TO_READY_METRIC, result.time_to_ready)
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        return True
+    except (OSError, sqlite3.Error) as e:
+        logger.warning("Could not record time-to-ready for %s: %s", result.host, e)
+        return False
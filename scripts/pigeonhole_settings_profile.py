@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Pigeonhole Kodi Settings Profiles
+Declarative Kodi settings profiles applied as a minimal diff: one batched read, then only the changes
+
+Usage: python scripts/pigeonhole_settings_profile.py --hosts 10.0.0.5 10.0.0.6 gold
+       python scripts/pigeonhole_settings_profile.py --hosts-file fleet_hosts.txt --device-profile home --dry-run
+"""
+
+import argparse
+import logging
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from pigeonhole_kodi_rpc import BatchResult, KodiRPCClient
+
+if TYPE_CHECKING:
+    from pigeonhole_config import DeviceProfile
+
+PROFILES_FILE = Path(__file__).resolve().parent.parent / "config" / "kodi_settings_profiles.yaml"
+
+# DeviceProfile service names -> Kodi boolean settings. "webserver" is left out on purpose:
+# profiles are applied through Kodi's JSON-RPC webserver, and switching it off would lock
+# this tool (and the rest of the fleet tooling) out of the box
+SERVICE_SETTINGS = {
+    "zeroconf": "services.zeroconf",
+    "airplay": "services.airplay",
+    "upnp": "services.upnp",
+    "esallinterfaces": "services.esallinterfaces",
+}
+
+logger = logging.getLogger('pigeonhole.settings_profile')
+
+@dataclass
+class SettingsProfile:
+    """An ordered set of Kodi setting values, with optional human-readable descriptions"""
+    name: str
+    settings: Dict[str, Any] = field(default_factory=dict)
+    descriptions: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_document(cls, name: str, document: Dict[str, Any]) -> "SettingsProfile":
+        """Build from ``{setting: value}`` or ``{setting: {"value": v, "description": d}}`` entries"""
+        profile = cls(name)
+        for setting, entry in (document or {}).items():
+            if isinstance(entry, dict):
+                profile.settings[setting] = entry["value"]
+                if entry.get("description"):
+                    profile.descriptions[setting] = entry["description"]
+            else:
+                profile.settings[setting] = entry
+        return profile
+
+    @classmethod
+    def from_device_profile(cls, device_profile: "DeviceProfile") -> "SettingsProfile":
+        """Kodi settings implied by a DeviceProfile's performance block and service lists"""
+        performance = device_profile.performance
+        profile = cls(device_profile.name)
+        profile.set("network.cachemembuffersize", performance.cache_size, "Network cache buffer")
+        profile.set("network.readbufferfactor", performance.buffer_factor, "Read buffer factor")
+        profile.set("videoplayer.usemediacodec", performance.enable_hardware_acceleration,
+                    "MediaCodec hardware acceleration")
+        for services, enabled in ((device_profile.enabled_services, True),
+                                  (device_profile.disabled_services, False)):
+            for service in services:
+                if service == "webserver" and not enabled:
+                    logger.warning("Profile %s disables the webserver; not applied, JSON-RPC needs it",
+                                   device_profile.name)
+                elif service in SERVICE_SETTINGS:
+                    profile.set(SERVICE_SETTINGS[service], enabled,
+                                f"{'Enable' if enabled else 'Disable'} {service}")
+        return profile
+
+    def set(self, setting: str, value: Any, description: Optional[str] = None) -> None:
+        self.settings[setting] = value
+        if description:
+            self.descriptions[setting] = description
+
+    def merged(self, other: "SettingsProfile") -> "SettingsProfile":
+        """This profile overlaid with ``other``; ``other`` wins on conflicts"""
+        return SettingsProfile(f"{self.name}+{other.name}",
+                               {**self.settings, **other.settings},
+                               {**self.descriptions, **other.descriptions})
+
+    def describe(self, setting: str) -> str:
+        return self.descriptions.get(setting, setting)
+
+def load_profiles(path: Path = PROFILES_FILE) -> Dict[str, SettingsProfile]:
+    with open(path, 'r', encoding='utf-8') as f:
+        document = yaml.safe_load(f) or {}
+    return {name: SettingsProfile.from_document(name, settings)
+            for name, settings in (document.get("profiles") or {}).items()}
+
+_profiles: Optional[Dict[str, SettingsProfile]] = None
+
+def get_profile(name: str) -> SettingsProfile:
+    """A named profile from config/kodi_settings_profiles.yaml (the file is read once)"""
+    global _profiles
+    if _profiles is None:
+        _profiles = load_profiles()
+    try:
+        return _profiles[name]
+    except KeyError:
+        raise KeyError(f"Unknown settings profile '{name}' (have: {', '.join(sorted(_profiles))})") from None
+
+def values_equal(desired: Any, current: Any) -> bool:
+    # Kodi reports numbers in its own type (4 for 4.0, 0.1 as 0.10000000149)
+    if (isinstance(desired, (int, float)) and isinstance(current, (int, float))
+            and not isinstance(desired, bool) and not isinstance(current, bool)):
+        return math.isclose(desired, current, rel_tol=1e-6, abs_tol=1e-6)
+    return desired == current
+
+@dataclass
+class ProfileResult:
+    """Outcome of applying one profile to one device"""
+    profile: str
+    host: str
+    unchanged: List[str] = field(default_factory=list)
+    applied: Dict[str, BatchResult] = field(default_factory=dict)
+    # Settings Kodi could not read, mapped to its error message; these are not written
+    unknown: Dict[str, str] = field(default_factory=dict)
+    dry_run: bool = False
+
+    @property
+    def changed(self) -> List[str]:
+        return [setting for setting, result in self.applied.items() if result.ok]
+
+    @property
+    def failed(self) -> Dict[str, str]:
+        return {setting: (result.error or {}).get("message", "unknown error")
+                for setting, result in self.applied.items() if not result.ok}
+
+    @property
+    def in_place(self) -> List[str]:
+        """Settings now holding the profile value, whether written this time or already set"""
+        return self.unchanged + self.changed
+
+    def summary(self) -> str:
+        verb = "would change" if self.dry_run else "changed"
+        return (f"{self.host}: profile '{self.profile}' {verb} {len(self.applied)}, "
+                f"{len(self.unchanged)} already set, {len(self.failed)} failed, {len(self.unknown)} unknown")
+
+def read_calls(profile: SettingsProfile) -> List[Tuple[str, Dict[str, Any]]]:
+    return [("Settings.GetSettingValue", {"setting": setting}) for setting in profile.settings]
+
+def plan(profile: SettingsProfile, host: str, reads: List[BatchResult],
+         dry_run: bool = False) -> Tuple[ProfileResult, Dict[str, Any]]:
+    """Compare the batched reads with the profile; returns the result skeleton and the writes needed"""
+    result = ProfileResult(profile.name, host, dry_run=dry_run)
+    changes: Dict[str, Any] = {}
+    for read in reads:
+        setting = read.params["setting"]
+        desired = profile.settings[setting]
+        if not read.ok:
+            result.unknown[setting] = (read.error or {}).get("message", "unknown error")
+        elif values_equal(desired, (read.result or {}).get("value")):
+            result.unchanged.append(setting)
+        else:
+            changes[setting] = desired
+    return result, changes
+
+def _planned_writes(changes: Dict[str, Any]) -> Dict[str, BatchResult]:
+    return {setting: BatchResult("Settings.SetSettingValue", {"setting": setting, "value": value})
+            for setting, value in changes.items()}
+
+def apply_profile(rpc: KodiRPCClient, profile: SettingsProfile, dry_run: bool = False) -> ProfileResult:
+    """
+    Bring one device to ``profile``: read every setting in one batch, then write only
+    the differing ones in a second batch (skipped when nothing differs). Raises
+    KodiRPCError when the device is unreachable.
+    """
+    result, changes = plan(profile, rpc.host, rpc.batch(read_calls(profile)), dry_run)
+    if changes:
+        result.applied = _planned_writes(changes) if dry_run else rpc.set_settings(changes)
+    logger.info(result.summary())
+    return result
+
+async def apply_profile_async(client, profile: SettingsProfile, dry_run: bool = False) -> ProfileResult:
+    """``apply_profile`` for an AsyncKodiRPCClient, e.g. ``fleet.run(lambda c: apply_profile_async(c, p))``"""
+    result, changes = plan(profile, client.host, await client.batch(read_calls(profile)), dry_run)
+    if changes:
+        result.applied = _planned_writes(changes) if dry_run else await client.set_settings(changes)
+    logger.debug(result.summary())
+    return result
+
+def main():
+    from pigeonhole_config import get_config
+    from pigeonhole_kodi_rpc_async import run_fleet
+
+    parser = argparse.ArgumentParser(description="Apply a Kodi settings profile across devices")
+    parser.add_argument("--hosts", nargs="*", default=[], help="Device IPs")
+    parser.add_argument("--hosts-file", help="File with one device IP per line")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--device-profile", help="Also apply settings derived from this DeviceProfile")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("profiles", nargs="*", help=f"Profile names from {PROFILES_FILE.name}")
+    args = parser.parse_args()
+
+    hosts: List[str] = list(args.hosts)
+    if args.hosts_file:
+        with open(args.hosts_file) as f:
+            hosts += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not hosts:
+        parser.error("no hosts given")
+
+    selected: Sequence[SettingsProfile] = [get_profile(name) for name in args.profiles]
+    if args.device_profile:
+        device_profile = get_config().get_device_profile(args.device_profile)
+        if device_profile is None:
+            parser.error(f"unknown device profile '{args.device_profile}'")
+        selected = [SettingsProfile.from_device_profile(device_profile), *selected]
+    if not selected:
+        parser.error("no profile given")
+    profile = selected[0]
+    for other in selected[1:]:
+        profile = profile.merged(other)
+
+    fleet = run_fleet(hosts, lambda fleet: fleet.run(lambda c: apply_profile_async(c, profile, args.dry_run)),
+                      port=args.port, concurrency=args.concurrency)
+    for host in fleet.succeeded:
+        result = fleet.results[host]
+        print(result.summary())
+        for setting in result.applied:
+            print(f"    {setting} -> {profile.settings[setting]!r}")
+        for setting, message in {**result.failed, **result.unknown}.items():
+            print(f"    {setting}: {message}")
+    for host in fleet.failed:
+        print(f"{host}: FAILED: {fleet.errors[host]}")
+    print(fleet.summary())
+
+if __name__ == "__main__":
+    main()
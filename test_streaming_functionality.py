@@ -3,10 +3,15 @@
 Test Pigeonhole Streaming Functionality via HTTP API
 """
 
-import requests
 import json
-import base64
 import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_events import ADDON_EVENTS, PLAYER_STARTED, KodiEventListener
+from pigeonhole_gui_bench import NavigationBenchmark
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
 
 class StreamingTester:
     def __init__(self):
@@ -15,13 +20,8 @@ class StreamingTester:
         self.username = "kodi"
         self.password = "0000"
         
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
+        self.events = KodiEventListener(self.fire_tv_ip).start()
         
         self.base_url = f"http://{self.fire_tv_ip}:{self.http_port}/jsonrpc"
         
@@ -49,33 +49,19 @@ class StreamingTester:
             }
         ]
 
+    def close(self):
+        """Stop the notification listener"""
+        self.events.stop()
+
     def send_rpc_request(self, method, params=None, timeout=15):
         """Send JSON-RPC request to Kodi"""
-        payload = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "id": 1
-        }
-        if params:
-            payload["params"] = params
-            
         try:
-            response = requests.post(
-                self.base_url, 
-                json=payload, 
-                headers=self.headers,
-                timeout=timeout
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"HTTP Error {response.status_code}: {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
+            return self.rpc.request(method, params, timeout=timeout)
+        except KodiHTTPError as e:
+            print(f"HTTP Error {e.status}: {e.body}")
+        except KodiRPCError as e:
             print(f"Connection error: {e}")
-            return None
+        return None
 
     def test_addon_launch(self, addon_info):
         """Test launching a specific addon"""
@@ -93,6 +79,7 @@ class StreamingTester:
             "ui_navigation": False
         }
         
+        launched = self.events.expect(PLAYER_STARTED + ADDON_EVENTS)
         try:
             # Record start time
             start_time = time.time()
@@ -112,8 +99,8 @@ class StreamingTester:
                         print(f"  [OK] Launch successful ({response_time:.2f}s)")
                         test_result["launch_success"] = True
                         
-                        # Wait a moment for UI to load
-                        time.sleep(3)
+                        # Wait for Kodi to report the addon loading (at most 3s)
+                        launched.wait(timeout=3)
                         
                         # Test if we can get current window info (indicates UI loaded)
                         window_response = self.send_rpc_request("GUI.GetInfoLabels", {
@@ -147,40 +134,28 @@ class StreamingTester:
         except Exception as e:
             print(f"  [FAIL] Exception: {e}")
             test_result["error"] = str(e)
+        finally:
+            launched.cancel()
         
         return test_result
 
     def test_gui_navigation(self):
-        """Test basic GUI navigation"""
+        """Test GUI navigation through the Pigeonhole home menu, timing each step"""
         print("Testing GUI navigation...")
         
-        nav_tests = [
-            {
-                "action": "Input.Home",
-                "description": "Navigate to Home"
-            },
-            {
-                "action": "Input.Info", 
-                "description": "Show info dialog"
-            },
-            {
-                "action": "Input.Back",
-                "description": "Go back"
-            }
-        ]
+        try:
+            report = NavigationBenchmark(self.rpc, repetitions=3).run("streaming-test")
+        except KodiRPCError as e:
+            print(f"  [ISSUE] Navigation failed: {e}")
+            return False
         
-        nav_success = 0
-        for test in nav_tests:
-            response = self.send_rpc_request(test["action"])
-            if response and "result" in response and response["result"] == "OK":
-                print(f"  [OK] {test['description']}")
-                nav_success += 1
-                time.sleep(1)  # Brief pause between navigation actions
-            else:
-                print(f"  [ISSUE] {test['description']} failed")
+        for step, stats in report.percentiles().items():
+            print(f"  [OK] {step}: p50 {stats['p50'] * 1000:.0f}ms, p95 {stats['p95'] * 1000:.0f}ms")
+        for step, count in report.failures.items():
+            print(f"  [ISSUE] {step} not confirmed {count}x")
         
-        print(f"GUI navigation: {nav_success}/{len(nav_tests)} actions successful")
-        return nav_success > 0
+        print(f"GUI navigation: {report.summary()}")
+        return bool(report.latencies)
 
     def check_system_performance(self):
         """Check system performance during testing"""
@@ -312,7 +287,10 @@ def main():
     """Main execution function"""
     tester = StreamingTester()
     
-    success = tester.run_streaming_tests()
+    try:
+        success = tester.run_streaming_tests()
+    finally:
+        tester.close()
     
     if success:
         print("\nStreaming functionality validation completed successfully!")
@@ -3,14 +3,19 @@
 True Fire TV Cube Gold Build Debloater
 Remove ALL bloatware for pure Kodi experience
 """
-import subprocess
 import time
 from datetime import datetime
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_adb import ADBClient
 
 class TrueGoldDebloater:
     def __init__(self, fire_tv_ip="192.168.1.130"):
         self.fire_tv_ip = fire_tv_ip
         self.adb_path = "M:\\adb\\adb.exe"
+        self.adb = ADBClient(self.adb_path, serial=f"{fire_tv_ip}:5555", retries=1)
 
         # Major streaming service bloatware (complete removal)
         self.streaming_bloatware = [
@@ -72,13 +77,9 @@ class TrueGoldDebloater:
         timestamp = datetime.now().strftime("%H:%M:%S")
         print(f"[{timestamp}] [{level}] {message}")
 
-    def adb_cmd(self, command):
-        try:
-            full_cmd = f'"{self.adb_path}" -s {self.fire_tv_ip}:5555 {command}'
-            result = subprocess.run(full_cmd, shell=True, capture_output=True, text=True, timeout=30)
-            return result.returncode == 0, result.stdout.strip() if result.stdout else result.stderr.strip()
-        except Exception as e:
-            return False, str(e)
+    def adb_cmd(self, args):
+        result = self.adb.run(args)
+        return result.ok, result.output if result.stdout else result.stderr.strip()
 
     def remove_streaming_bloatware(self):
         self.log("Removing major streaming service bloatware...")
@@ -88,12 +89,12 @@ class TrueGoldDebloater:
             self.log(f"Removing {package}...")
 
             # Force stop first
-            self.adb_cmd(f"shell am force-stop {package}")
+            self.adb_cmd(["shell", "am", "force-stop", package])
 
             # Disable then uninstall
-            success1, _ = self.adb_cmd(f"shell pm disable-user --user 0 {package}")
-            success2, _ = self.adb_cmd(f"shell pm uninstall --user 0 {package}")
-            success3, _ = self.adb_cmd(f"shell pm clear {package}")
+            success1, _ = self.adb_cmd(["shell", "pm", "disable-user", "--user", "0", package])
+            success2, _ = self.adb_cmd(["shell", "pm", "uninstall", "--user", "0", package])
+            success3, _ = self.adb_cmd(["shell", "pm", "clear", package])
 
             if success1 or success2:
                 removed += 1
@@ -112,12 +113,12 @@ class TrueGoldDebloater:
             self.log(f"Removing {package}...")
 
             # Force stop first
-            self.adb_cmd(f"shell am force-stop {package}")
+            self.adb_cmd(["shell", "am", "force-stop", package])
 
             # Disable and uninstall
-            success1, _ = self.adb_cmd(f"shell pm disable-user --user 0 {package}")
-            success2, _ = self.adb_cmd(f"shell pm uninstall --user 0 {package}")
-            success3, _ = self.adb_cmd(f"shell pm clear {package}")
+            success1, _ = self.adb_cmd(["shell", "pm", "disable-user", "--user", "0", package])
+            success2, _ = self.adb_cmd(["shell", "pm", "uninstall", "--user", "0", package])
+            success3, _ = self.adb_cmd(["shell", "pm", "clear", package])
 
             if success1 or success2:
                 removed += 1
@@ -136,8 +137,8 @@ class TrueGoldDebloater:
             self.log(f"Disabling {package}...")
 
             # Force stop and disable
-            self.adb_cmd(f"shell am force-stop {package}")
-            success, _ = self.adb_cmd(f"shell pm disable-user --user 0 {package}")
+            self.adb_cmd(["shell", "am", "force-stop", package])
+            success, _ = self.adb_cmd(["shell", "pm", "disable-user", "--user", "0", package])
 
             if success:
                 disabled += 1
@@ -152,19 +153,19 @@ class TrueGoldDebloater:
         self.log("Setting up Kodi as primary launcher...")
 
         # Stop Amazon launcher completely
-        self.adb_cmd("shell am force-stop com.amazon.tv.launcher")
+        self.adb_cmd(["shell", "am", "force-stop", "com.amazon.tv.launcher"])
 
         # Clear Amazon launcher as default
-        success, _ = self.adb_cmd("shell pm clear com.amazon.tv.launcher")
+        success, _ = self.adb_cmd(["shell", "pm", "clear", "com.amazon.tv.launcher"])
 
         # Start Kodi
-        success, output = self.adb_cmd("shell am start -n org.xbmc.kodi/.Splash")
+        success, output = self.adb_cmd(["shell", "am", "start", "-n", "org.xbmc.kodi/.Splash"])
 
         if success:
             self.log("✓ Kodi launched successfully")
 
             # Try to set as default home activity (may fail due to Android restrictions)
-            self.adb_cmd("shell cmd package set-home-activity org.xbmc.kodi/.Splash")
+            self.adb_cmd(["shell", "cmd", "package", "set-home-activity", "org.xbmc.kodi/.Splash"])
 
             return True
         else:
@@ -175,7 +176,7 @@ class TrueGoldDebloater:
         self.log("Validating bloatware removal...")
 
         # Check if major bloatware is still present
-        success, packages = self.adb_cmd("shell pm list packages")
+        success, packages = self.adb_cmd(["shell", "pm", "list", "packages"])
 
         if success:
             remaining_bloat = []
@@ -7,31 +7,34 @@ Comprehensive validation of optimized Kodi v22 system
 import subprocess
 import requests
 import json
-import base64
+import os
 import time
 import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from pigeonhole_kodi_rpc import KodiHTTPError, KodiRPCClient, KodiRPCError
+from pigeonhole_gui_bench import NavigationBenchmark
+from pigeonhole_playback_bench import benchmark_device, percentile
 
 class GoldBuildValidator:
-    def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080):
+    def __init__(self, fire_tv_ip="192.168.1.130", http_port=8080, test_media=None):
         self.fire_tv_ip = fire_tv_ip
         self.http_port = http_port
+        # LAN or local media played by the playback benchmark; skipped when unset
+        self.test_media = test_media or os.getenv("PIGEONHOLE_TEST_MEDIA")
         self.username = "kodi"
         self.password = "0000"
         self.base_url = f"http://{fire_tv_ip}:{http_port}/jsonrpc"
 
-        # Create auth header
-        credentials = f"{self.username}:{self.password}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        self.headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {encoded_credentials}"
-        }
+        self.rpc = KodiRPCClient(self.fire_tv_ip, self.http_port, self.username, self.password)
 
         # Expected performance benchmarks
         self.performance_targets = {
             "api_response_time": 1.0,  # seconds
             "startup_time": 15.0,      # seconds
+            "first_frame_time": 5.0,   # seconds, p95 from Player.Open to first frame
             "memory_threshold": 512,   # MB minimum free
             "cpu_threshold": 80,       # max CPU usage %
         }
@@ -83,27 +86,16 @@ class GoldBuildValidator:
         """Execute Kodi JSON-RPC call with timing"""
         try:
             start_time = time.time()
-
-            payload = {
-                "jsonrpc": "2.0",
-                "method": method,
-                "id": 1
-            }
-            if params:
-                payload["params"] = params
-
-            response = requests.post(self.base_url, json=payload, headers=self.headers, timeout=15)
+            envelope = self.rpc.request(method, params)
             response_time = time.time() - start_time
 
             if method == "JSONRPC.Ping":
                 self.results["performance_metrics"]["api_response_time"] = response_time
 
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("result", result)
-            else:
-                return None
-        except Exception as e:
+            return envelope.get("result", envelope)
+        except KodiHTTPError:
+            return None
+        except KodiRPCError as e:
             self.log(f"Kodi API error: {e}", "ERROR")
             return None
 
@@ -261,17 +253,22 @@ class GoldBuildValidator:
         """Test system performance benchmarks"""
         self.log("Running performance benchmarks...")
 
-        # Test navigation performance
-        start_time = time.time()
-        result = self.kodi_jsonrpc("GUI.ActivateWindow", {"window": "home"})
-        nav_time = time.time() - start_time
+        # Test navigation performance: home menu script, until Kodi reports each window change
+        try:
+            report = NavigationBenchmark(self.rpc, repetitions=3).run("gold-validation")
+        except KodiRPCError as e:
+            self.log(f"⚠️ Navigation benchmark failed: {e}", "WARN")
+            report = None
 
-        if result:
+        if report and report.latencies:
+            nav_time = percentile(report.all_steps(), 95)
             self.results["performance_metrics"]["navigation_time"] = nav_time
-            if nav_time <= 2.0:
-                self.log(f"✅ Navigation responsive: {nav_time:.2f}s", "SUCCESS")
+            self.results["performance_metrics"]["navigation_steps"] = report.percentiles()
+            if nav_time <= 2.0 and not report.failures:
+                self.log(f"✅ Navigation responsive: {nav_time:.2f}s per step (p95)", "SUCCESS")
             else:
-                self.log(f"⚠️ Navigation slow: {nav_time:.2f}s", "WARN")
+                self.log(f"⚠️ Navigation slow: {nav_time:.2f}s per step (p95), "
+                         f"{sum(report.failures.values())} steps unconfirmed", "WARN")
 
         # Test addon execution
         start_time = time.time()
@@ -288,6 +285,23 @@ class GoldBuildValidator:
             else:
                 self.log(f"⚠️ Addon execution slow: {addon_time:.2f}s", "WARN")
 
+        # Playback startup, when test media is configured
+        if self.test_media:
+            try:
+                report = benchmark_device(self.fire_tv_ip, self.test_media, port=self.http_port, repetitions=3)
+            except KodiRPCError as e:
+                self.log(f"⚠️ Playback benchmark unavailable: {e}", "WARN")
+                return True
+            stats = report.percentiles()
+            self.results["performance_metrics"]["playback"] = stats
+            first_frame = stats["time_to_first_frame"]["p95"]
+            if first_frame is None:
+                self.log(f"❌ Test media did not play: {report.samples[0].error}", "ERROR")
+            elif first_frame <= self.performance_targets["first_frame_time"]:
+                self.log(f"✅ Playback starts fast: {first_frame:.2f}s to first frame (p95)", "SUCCESS")
+            else:
+                self.log(f"⚠️ Playback start slow: {first_frame:.2f}s to first frame (p95)", "WARN")
+
         return True
 
     def test_streaming_readiness(self):